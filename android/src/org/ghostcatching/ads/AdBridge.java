@@ -0,0 +1,88 @@
+package org.ghostcatching.ads;
+
+import android.app.Activity;
+
+import com.google.android.gms.ads.AdError;
+import com.google.android.gms.ads.AdRequest;
+import com.google.android.gms.ads.FullScreenContentCallback;
+import com.google.android.gms.ads.LoadAdError;
+import com.google.android.gms.ads.MobileAds;
+import com.google.android.gms.ads.interstitial.InterstitialAd;
+import com.google.android.gms.ads.interstitial.InterstitialAdLoadCallback;
+import com.google.android.gms.ads.rewarded.RewardedAd;
+import com.google.android.gms.ads.rewarded.RewardedAdLoadCallback;
+
+/**
+ * AdMob calls for src/admob_provider.py. The SDK's load callbacks are
+ * abstract classes, which pyjnius cannot subclass, so they are bridged
+ * here to the Listener interface. Every call hops to the UI thread.
+ */
+public class AdBridge {
+    public interface Listener {
+        void onLoaded(Object ad);
+        void onFailed(String message);
+        void onClosed(boolean earned);
+    }
+
+    public static void initialize(final Activity activity) {
+        activity.runOnUiThread(() -> MobileAds.initialize(activity));
+    }
+
+    public static void load(final Activity activity, final boolean rewarded, final String unitId,
+                            final Listener listener) {
+        activity.runOnUiThread(() -> {
+            AdRequest request = new AdRequest.Builder().build();
+            if (rewarded) {
+                RewardedAd.load(activity, unitId, request, new RewardedAdLoadCallback() {
+                    @Override
+                    public void onAdLoaded(RewardedAd ad) {
+                        listener.onLoaded(ad);
+                    }
+
+                    @Override
+                    public void onAdFailedToLoad(LoadAdError error) {
+                        listener.onFailed(error.getMessage());
+                    }
+                });
+            } else {
+                InterstitialAd.load(activity, unitId, request, new InterstitialAdLoadCallback() {
+                    @Override
+                    public void onAdLoaded(InterstitialAd ad) {
+                        listener.onLoaded(ad);
+                    }
+
+                    @Override
+                    public void onAdFailedToLoad(LoadAdError error) {
+                        listener.onFailed(error.getMessage());
+                    }
+                });
+            }
+        });
+    }
+
+    public static void show(final Activity activity, final Object ad, final Listener listener) {
+        activity.runOnUiThread(() -> {
+            final boolean[] earned = {false};
+            FullScreenContentCallback closed = new FullScreenContentCallback() {
+                @Override
+                public void onAdDismissedFullScreenContent() {
+                    listener.onClosed(earned[0]);
+                }
+
+                @Override
+                public void onAdFailedToShowFullScreenContent(AdError error) {
+                    listener.onClosed(false);
+                }
+            };
+            if (ad instanceof RewardedAd) {
+                RewardedAd rewardedAd = (RewardedAd) ad;
+                rewardedAd.setFullScreenContentCallback(closed);
+                rewardedAd.show(activity, reward -> earned[0] = true);
+            } else {
+                InterstitialAd interstitialAd = (InterstitialAd) ad;
+                interstitialAd.setFullScreenContentCallback(closed);
+                interstitialAd.show(activity);
+            }
+        });
+    }
+}
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the engine and renderer hot paths
+
+Runs the same workloads against main.py (original engine) and/or
+main_v2.py (src.engine) and prints a table, optionally writing the raw
+numbers as JSON so runs can be compared over time:
+
+    python3 benchmarks/run_benchmarks.py --target both --json bench.json
+
+Rendering runs under the SDL dummy video driver, so no display is needed.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+# Keep benchmark sessions out of the real save data
+os.environ.setdefault('GHOST_SAVE_DIR', tempfile.mkdtemp(prefix='ghost-bench-'))
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def measure(name: str, op: Callable[[], None], min_time: float = 0.2,
+            setup: Optional[Callable[[], None]] = None) -> Dict:
+    """
+    Time op until min_time has elapsed, then measure its memory churn
+
+    ops_per_sec and mean_us come from the timed run. peak_alloc_bytes is
+    the largest amount of memory op held at once above the baseline
+    (tracemalloc). net_blocks_per_op is the number of live objects each
+    call left behind (sys.getallocatedblocks).
+    """
+    if setup:
+        setup()
+    op()
+
+    iterations = 0
+    elapsed = 0.0
+    batch = 1
+    while elapsed < min_time:
+        start = time.perf_counter()
+        for _ in range(batch):
+            op()
+        elapsed += time.perf_counter() - start
+        iterations += batch
+        batch *= 2
+
+    samples = min(iterations, 1000)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    blocks = sys.getallocatedblocks()
+    for _ in range(samples):
+        op()
+    net_blocks = sys.getallocatedblocks() - blocks
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return {
+        'name': name,
+        'iterations': iterations,
+        'ops_per_sec': iterations / elapsed,
+        'mean_us': elapsed / iterations * 1e6,
+        'peak_alloc_bytes': peak,
+        'net_blocks_per_op': net_blocks / samples,
+    }
+
+
+class V1Adapter:
+    """Drives main.py, where Ghost.move_ai takes (grid, pot list)"""
+
+    module_name = 'main'
+
+    def __init__(self, module):
+        self.m = module
+
+    def new_level(self, level_num: int):
+        return self.m.Level(level_num)
+
+    def valid_moves(self, level):
+        return level.ghost.get_valid_moves(level.grid)
+
+    def move_ai(self, level):
+        level.ghost.move_ai(level.grid, level.pots)
+
+    def new_grid(self):
+        return self.m.GameGrid(self.m.GRID_COLS, self.m.GRID_ROWS)
+
+    def click(self, game, pos):
+        game.handle_game_click(pos)
+
+
+class V2Adapter:
+    """Drives main_v2.py, backed by src.engine"""
+
+    module_name = 'main_v2'
+
+    def __init__(self, module):
+        self.m = module
+
+    def new_level(self, level_num: int):
+        from src.engine import Level
+        return Level(level_num)
+
+    def valid_moves(self, level):
+        return level.ghost.get_valid_moves(level.board, level.blocked)
+
+    def move_ai(self, level):
+        level.ghost.move_ai(level.board, level.blocked, level.fields)
+
+    def new_grid(self):
+        from src.engine import GameGrid
+        return GameGrid(self.m.GRID_COLS, self.m.GRID_ROWS)
+
+    def click(self, game, pos):
+        # Turns resolve on a worker thread; count the round trip
+        game.handle_game_click(pos)
+        game.finish_turns(wait=1.0)
+
+
+ADAPTERS = {'main': V1Adapter, 'main_v2': V2Adapter}
+
+
+def run_target(target: str, min_time: float) -> List[Dict]:
+    module = importlib.import_module(target)
+    adapter = ADAPTERS[target](module)
+    results = []
+
+    levels = [adapter.new_level(n) for n in range(1, 100)]
+
+    def generate_all():
+        for level in levels:
+            level.generate_level()
+    results.append(measure('generate_level x99', generate_all, min_time))
+
+    level = adapter.new_level(50)
+    results.append(measure('get_valid_moves', lambda: adapter.valid_moves(level), min_time))
+    results.append(measure('move_ai', lambda: adapter.move_ai(level), min_time))
+
+    grid = adapter.new_grid()
+    results.append(measure('GameGrid.reset', grid.reset, min_time))
+
+    game = module.Game()
+    rng = random.Random(1)
+    clicks = [
+        (rng.randrange(module.SCREEN_WIDTH), rng.randrange(50, 50 + module.GRID_ROWS * module.GRID_SIZE))
+        for _ in range(4096)
+    ]
+    cursor = [0]
+
+    def click():
+        if game.state != module.GameState.PLAYING:
+            game.load_level(game.current_level)
+        adapter.click(game, clicks[cursor[0] & 4095])
+        cursor[0] += 1
+    results.append(measure('handle_game_click (incl. level restarts)', click, min_time))
+
+    game.load_level(1)
+    results.append(measure('draw_game', game.draw_game, min_time))
+
+    for result in results:
+        result['target'] = target
+    return results
+
+
+def print_table(results: List[Dict]):
+    print(f"{'target':<8} {'benchmark':<42} {'ops/sec':>12} {'mean us':>10} {'peak B':>9} {'blocks/op':>9}")
+    for r in results:
+        print(
+            f"{r['target']:<8} {r['name']:<42} {r['ops_per_sec']:>12.1f} {r['mean_us']:>10.2f} "
+            f"{r['peak_alloc_bytes']:>9} {r['net_blocks_per_op']:>9.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', choices=['main', 'main_v2', 'both'], default='main_v2')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per benchmark')
+    parser.add_argument('--json', metavar='PATH', help='write results as JSON ("-" for stdout)')
+    args = parser.parse_args(argv)
+
+    targets = ['main', 'main_v2'] if args.target == 'both' else [args.target]
+    results = []
+    for target in targets:
+        results.extend(run_target(target, args.min_time))
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,7 +13,7 @@ package.domain = org.ghostcatching
 source.dir = .
 
 # (list) Source includes patterns, e.g. ['images/*', 'data/*']
-source.include_exts = py,png,jpg,kv,atlas,json
+source.include_exts = py,png,jpg,kv,atlas,json,wav,mp3,ogg
 
 # (list) List of inclusions using pattern matching
 source.include_patterns = assets/*,levels/*,src/*
@@ -32,7 +32,7 @@ version = 1.0.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,pygame,requests
+requirements = python3,kivy,pygame,requests,pyjnius
 
 # (str) Supported orientation (landscape, portrait or all)
 orientation = portrait
@@ -73,6 +73,9 @@ android.use_legacy_toolchain = False
 # (str) Gradle dependencies (Google Play Services for AdMob)
 android.gradle_dependencies = com.google.android.gms:play-services-ads:20.6.0
 
+# (list) Java sources: the AdMob bridge used by src/admob_provider.py
+android.add_src = android/src
+
 # (str) Android logcat filters to use
 android.logcat_filters = *:S python:D
 
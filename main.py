@@ -13,9 +13,6 @@ from dataclasses import dataclass
 from typing import List, Tuple, Optional, Set
 import random
 
-# Initialize Pygame
-pygame.init()
-
 # Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 1000
@@ -220,6 +217,10 @@ class Level:
 
 class Game:
     def __init__(self):
+        # Just the subsystems the game uses; the level is generated when
+        # play starts, not behind the menu
+        pygame.display.init()
+        pygame.font.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Ghost Catching Game")
         self.clock = pygame.time.Clock()
@@ -231,8 +232,6 @@ class Game:
         self.current_level = 1
         self.level = None
         self.total_levels = 99
-        
-        self.load_level(self.current_level)
     
     def load_level(self, level_num: int):
         """Load a specific level"""
@@ -5,18 +5,31 @@ A turn-based puzzle game where players place talismans to catch ghosts
 Version 2.0 with improved UI, animations, and features
 """
 
+import time
+_STARTED = time.perf_counter()  # the startup breakdown includes imports
+
 import pygame
 import sys
 import json
 import os
 from enum import Enum
-from dataclasses import dataclass
-from typing import List, Tuple, Optional, Set
-import random
+from typing import Dict, List, Tuple, Optional, Set
 import math
 
-# Initialize Pygame
-pygame.init()
+from src.ad_manager import REWARDED, AdManager, platform_provider
+from src.analytics import Analytics
+from src.audio import AudioManager
+from src.board_view import BoardView, Camera
+from src.config import ADMOB_CONFIG, DEFAULT_LOCALE, MEGA_LEVEL_CONFIG, PERFORMANCE_CONFIG
+from src.engine import CellType, Ghost, Level, Position, Outcome, bit_indices, evaluate, level_score, level_seed, popcount
+from src.engine.journal import Journal
+from src.engine.replay import Replay, ReplayPlayer
+from src.level_pack import LevelPack
+from src.perf_hud import PerfHud, StartupTimer
+from src.persistence import ProgressStore
+from src.render_cache import RenderCache
+from src.scheduler import FrameScheduler, set_display_mode
+from src.turn_worker import TurnWorker
 
 # Constants
 SCREEN_WIDTH = 800
@@ -25,6 +38,17 @@ GRID_SIZE = 40
 GRID_COLS = SCREEN_WIDTH // GRID_SIZE
 GRID_ROWS = (SCREEN_HEIGHT - 100) // GRID_SIZE
 FPS = 60
+REPLAY_RATE = 4  # turns per second when watching a recorded session
+UPDATE_STEP = 1.0 / PERFORMANCE_CONFIG['update_hz']
+GHOST_MOVE_SECONDS = PERFORMANCE_CONFIG['ghost_move_seconds']
+DRAG_THRESHOLD = 8  # pixels a press may move on a mega board and still count as a tap
+AD_CLOSED = pygame.USEREVENT + 2  # posted from the ad network's thread; carries `earned`
+CAMERA_KEYS = {
+    pygame.K_LEFT: (-1, 0),
+    pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1),
+    pygame.K_DOWN: (0, 1),
+}
 
 # Colors
 COLOR_BG = (20, 20, 30)
@@ -48,211 +72,286 @@ class GameState(Enum):
     LEVEL_FAILED = 4
     GAME_OVER = 5
     PAUSE = 6
-
-class CellType(Enum):
-    EMPTY = 0
-    TALISMAN = 1
-    OBSTACLE = 2
-    POT = 3
-    GHOST = 4
-
-@dataclass
-class Position:
-    x: int
-    y: int
-    
-    def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
-    
-    def __hash__(self):
-        return hash((self.x, self.y))
-    
-    def distance_to(self, other: 'Position') -> int:
-        return abs(self.x - other.x) + abs(self.y - other.y)
-
-class Ghost:
-    def __init__(self, start_pos: Position):
-        self.pos = start_pos
-        self.start_pos = start_pos
-        self.animation_progress = 0.0
-        self.prev_pos = start_pos
-    
-    def reset(self):
-        self.pos = self.start_pos
-        self.prev_pos = self.start_pos
-        self.animation_progress = 0.0
-    
-    def get_valid_moves(self, grid: 'GameGrid') -> List[Position]:
-        """Get all valid adjacent positions the ghost can move to"""
-        valid_moves = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            new_x = self.pos.x + dx
-            new_y = self.pos.y + dy
-            
-            if 0 <= new_x < GRID_COLS and 0 <= new_y < GRID_ROWS:
-                new_pos = Position(new_x, new_y)
-                if grid.get_cell(new_pos) not in [CellType.TALISMAN, CellType.OBSTACLE]:
-                    valid_moves.append(new_pos)
-        
-        return valid_moves
-    
-    def move_ai(self, grid: 'GameGrid', pot_positions: List[Position]):
-        """AI logic: Ghost tries to escape from pots and reach the edge"""
-        valid_moves = self.get_valid_moves(grid)
-        
-        if not valid_moves:
-            return
-        
-        best_move = None
-        best_score = float('-inf')
-        
-        for move in valid_moves:
-            min_pot_distance = min([move.distance_to(pot) for pot in pot_positions])
-            center = Position(GRID_COLS // 2, GRID_ROWS // 2)
-            distance_from_center = move.distance_to(center)
-            distance_from_edge = min(
-                move.x,
-                move.y,
-                GRID_COLS - 1 - move.x,
-                GRID_ROWS - 1 - move.y
-            )
-            
-            score = (
-                min_pot_distance * 2 +
-                distance_from_edge * -1
-            )
-            
-            if score > best_score:
-                best_score = score
-                best_move = move
-        
-        if best_move:
-            self.prev_pos = self.pos
-            self.pos = best_move
-            self.animation_progress = 0.0
-
-class GameGrid:
-    def __init__(self, width: int, height: int):
-        self.width = width
-        self.height = height
-        self.grid = [[CellType.EMPTY for _ in range(width)] for _ in range(height)]
-    
-    def set_cell(self, pos: Position, cell_type: CellType):
-        if 0 <= pos.y < self.height and 0 <= pos.x < self.width:
-            self.grid[pos.y][pos.x] = cell_type
-    
-    def get_cell(self, pos: Position) -> CellType:
-        if 0 <= pos.y < self.height and 0 <= pos.x < self.width:
-            return self.grid[pos.y][pos.x]
-        return CellType.EMPTY
-    
-    def reset(self):
-        self.grid = [[CellType.EMPTY for _ in range(self.width)] for _ in range(self.height)]
-    
-    def is_valid_placement(self, pos: Position) -> bool:
-        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
-            return False
-        return self.get_cell(pos) == CellType.EMPTY
-
-class Level:
-    def __init__(self, level_num: int):
-        self.level_num = level_num
-        self.grid = GameGrid(GRID_COLS, GRID_ROWS)
-        self.ghost = None
-        self.pots: List[Position] = []
-        self.obstacles: List[Position] = []
-        self.talisman_count = 0
-        self.max_talismans = 0
-        self.generate_level()
-    
-    def generate_level(self):
-        """Generate level based on difficulty"""
-        self.grid.reset()
-        self.obstacles.clear()
-        self.pots.clear()
-        
-        if self.level_num <= 20:
-            num_pots = max(3, 5 - (self.level_num // 5))
-            num_obstacles = 8 - (self.level_num // 3)
-            self.max_talismans = 20 + (self.level_num * 2)
-        elif self.level_num <= 60:
-            num_pots = max(2, 4 - ((self.level_num - 20) // 10))
-            num_obstacles = 5 - ((self.level_num - 20) // 15)
-            self.max_talismans = 25 + ((self.level_num - 20) * 1.5)
-        else:
-            num_pots = 1
-            num_obstacles = 2 - ((self.level_num - 60) // 20)
-            self.max_talismans = 30 + ((self.level_num - 60) * 1.2)
-        
-        for _ in range(num_pots):
-            while True:
-                x = random.randint(0, GRID_COLS - 1)
-                y = random.randint(0, GRID_ROWS - 1)
-                pos = Position(x, y)
-                if pos not in self.pots:
-                    self.pots.append(pos)
-                    self.grid.set_cell(pos, CellType.POT)
-                    break
-        
-        for _ in range(num_obstacles):
-            while True:
-                x = random.randint(1, GRID_COLS - 2)
-                y = random.randint(1, GRID_ROWS - 2)
-                pos = Position(x, y)
-                if pos not in self.obstacles and pos not in self.pots:
-                    self.obstacles.append(pos)
-                    self.grid.set_cell(pos, CellType.OBSTACLE)
-                    break
-        
-        while True:
-            x = random.randint(0, GRID_COLS - 1)
-            y = random.randint(0, GRID_ROWS - 1)
-            ghost_pos = Position(x, y)
-            if ghost_pos not in self.pots and ghost_pos not in self.obstacles:
-                self.ghost = Ghost(ghost_pos)
-                self.grid.set_cell(ghost_pos, CellType.GHOST)
-                break
-        
-        self.talisman_count = 0
+    REPLAY = 7
 
 class Game:
     def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        # Only what the menu needs is set up here; fonts load on first use,
+        # saved progress and ads right after the first frame, and the level
+        # when play starts. pygame.init() would also bring up the mixer and
+        # joystick subsystems, which the game never uses.
+        self.startup = StartupTimer(_STARTED)
+        self.startup.mark('imports')
+        pygame.display.init()
+        pygame.font.init()
+        self.startup.mark('pygame init')
+        self.screen = set_display_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Ghost Catching Game")
-        self.clock = pygame.time.Clock()
-        self.font_large = pygame.font.Font(None, 48)
-        self.font_medium = pygame.font.Font(None, 36)
-        self.font_small = pygame.font.Font(None, 24)
+        self.startup.mark('display')
+        self.scheduler = FrameScheduler()
+        self.turns = TurnWorker()
+        self.fonts: Dict[int, pygame.font.Font] = {}
+        self.audio = AudioManager()
+        self.locale = DEFAULT_LOCALE
+        self.cache = RenderCache()
+        self.cache.set_context(self.locale, self.screen.get_size())
         
         self.state = GameState.MENU
         self.current_level = 1
+        self.progress_level = 1  # furthest level unlocked, as saved
         self.level = None
+        self.journal = None
+        self.replay = None
+        self.replay_player = None
+        self.replay_resume = None
+        self.replay_live_level = None
         self.total_levels = 99
         self.total_score = 0
         self.best_times = {}
-        
-        self.load_level(self.current_level)
+        self.level_started = 0.0
+        self.ad_manager = None
+        self.analytics = None
+        self.undo_credits = 0
+        self.reward_pending = False
+        
+        # The board is rasterized in chunks as they come into view;
+        # afterwards only cells touched by a turn are redrawn and pushed to
+        # the display. Standard levels fit the viewport, so their camera
+        # never moves; mega levels pan and zoom
+        self.mega = False
+        self.camera = None
+        self.board_view = None
+        self.drag_start = None
+        self.dragged = False
+        self.ghost_cells: Set[int] = set()
+        self.ghost_cells_mask = 0
+        self.dirty_rects: List[pygame.Rect] = []
+        self.full_redraw = True
+        self.drawn_state = None
+        self.hud_text = None
+        
+        # Game logic advances in fixed UPDATE_STEP steps, whatever the frame
+        # rate; a moving ghost is left out of the board chunks and drawn as
+        # a sprite between prev_pos and pos until its animation completes
+        self.update_clock = time.perf_counter()
+        self.update_lag = 0.0
+        self.animating: List[Ghost] = []
+        self.animating_cells: Set[int] = set()
+        self.sprite_rects: List[pygame.Rect] = []
+        
+        self.perf_hud = PerfHud()
+        self.perf_rect = None
+        
+        self.level_pack = None
+        self.store = None
+        self.resume = None
+    
+    def font(self, size: int) -> pygame.font.Font:
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
+    
+    @property
+    def font_large(self) -> pygame.font.Font:
+        return self.font(48)
+    
+    @property
+    def font_medium(self) -> pygame.font.Font:
+        return self.font(36)
     
-    def load_level(self, level_num: int):
-        """Load a specific level"""
+    @property
+    def font_small(self) -> pygame.font.Font:
+        return self.font(24)
+    
+    def finish_startup(self):
+        """Load saved progress, the level pack and ads; safe to call again"""
+        if self.store is not None:
+            return
+        self.store = ProgressStore()
+        progress = self.store.load()
+        self.store.start()
+        self.total_score = progress['total_score']
+        self.best_times = {int(level): seconds for level, seconds in progress['best_times'].items()}
+        self.progress_level = progress['unlocked_level']
+        self.current_level = self.progress_level
+        # Like START, the first start goes to the furthest level; a saved
+        # replay of an earlier level is not resumed
+        session = progress['session']
+        if session and session['level'] == self.progress_level:
+            self.resume = (self.progress_level, session['seed'], session['cells'])
+        else:
+            self.resume = (self.progress_level, None, ())
+        self.startup.mark('progress')
+        
+        self.level_pack = LevelPack.load()
+        self.startup.mark('level pack')
+        self.analytics = Analytics()
+        self.analytics.start(self.screen.get_size())
+        provider = platform_provider() if ADMOB_CONFIG['enabled'] else None
+        if provider is not None:
+            self.ad_manager = AdManager(provider, analytics=self.analytics)
+            self.ad_manager.start()
+        self.startup.mark('ads')
+        self.audio.start()
+    
+    def start_game(self):
+        """
+        Leave the menu: continue the saved session the first time, then
+        the level left for the menu, or the furthest level reached
+        """
+        self.finish_startup()
+        if self.replay_player is not None:
+            self.end_replay()
+        if self.resume is not None:
+            level_num, seed, cells = self.resume
+            self.resume = None
+            self.mega = False
+            self.load_level(level_num, seed, cells)
+        elif (not self.mega and self.level is not None and self.current_level == self.progress_level
+              and evaluate(self.level) == Outcome.IN_PROGRESS):
+            self.state = GameState.PLAYING
+        else:
+            self.mega = False
+            self.load_level(self.progress_level)
+    
+    def load_level(self, level_num: int, seed: Optional[int] = None, resume_cells: List[int] = ()):
+        """
+        Load a specific level
+        
+        With resume_cells (a saved, unfinished session of the same seed)
+        those turns are replayed so play continues where it stopped.
+        """
         if level_num > self.total_levels:
             self.state = GameState.GAME_OVER
             return
         
+        self.finish_startup()
+        self.resume = None
         self.current_level = level_num
-        self.level = Level(level_num)
+        self.level = self.new_level(level_num)
+        self.journal = Journal(self.level)
+        self.replay = Replay.for_level(self.level)
+        self.replay_player = None
         self.state = GameState.PLAYING
+        self.level_started = time.monotonic()
+        self.analytics.emit('level_start', level_num, self.level.seed, self.level.width, self.level.height)
+        
+        if resume_cells and seed == self.level.seed:
+            for index in resume_cells:
+                pos = self.level.grid.position(index)
+                if self.journal.play(pos).placed:
+                    self.replay.record(pos, self.level.ghost.pos)
+            outcome = evaluate(self.level)
+            if outcome == Outcome.LOST:
+                self.state = GameState.LEVEL_FAILED
+            elif outcome == Outcome.WON:
+                # Killed before the win was saved; award it now
+                self.check_game_state()
+        else:
+            self.save_turn('level', level=level_num, seed=self.level.seed)
+        
+        self.camera = Camera(pygame.Rect(0, 50, SCREEN_WIDTH, SCREEN_HEIGHT - 50),
+                             self.level.width, self.level.height, GRID_SIZE)
+        self.camera.center_on(self.level.grid.index(self.level.ghost.pos))
+        self.board_view = BoardView(self.camera, self.paint_cell, COLOR_BG,
+                                    lambda size: self.cell_tile('empty', size), self.occupied_cells)
+        self.finish_animations()
+        self.render_board()
+    
+    def new_level(self, level_num: int) -> Level:
+        """The board for level_num: the packed one, or a mega board in mega mode"""
+        if not self.mega:
+            return self.level_pack.new_level(level_num)
+        # Its own seed, so a saved standard session never resumes onto it
+        return Level(level_num, MEGA_LEVEL_CONFIG['width'], MEGA_LEVEL_CONFIG['height'],
+                     seed=level_seed(level_num, 'mega'), ghost_count=MEGA_LEVEL_CONFIG['ghost_count'])
+    
+    def save_turn(self, kind: str, **fields):
+        """Log the session for resuming; mega sessions are not saved"""
+        if not self.mega:
+            self.store.append(kind, **fields)
+    
+    def start_mega(self):
+        self.finish_startup()
+        # Keep the saved (or unfinished) standard session for the next START
+        saved = self.resume
+        if saved is None and not self.mega and self.level is not None and evaluate(self.level) == Outcome.IN_PROGRESS:
+            saved = (self.current_level, self.level.seed, [delta.index for delta in self.journal.undo_stack])
+        self.mega = True
+        self.load_level(self.current_level)
+        self.resume = saved
+    
+    def handle_camera_event(self, event: pygame.event.Event) -> bool:
+        """Pan/zoom input on a movable board; returns True if it was consumed"""
+        camera = self.camera
+        if camera is None or not camera.movable or self.state not in (GameState.PLAYING, GameState.REPLAY):
+            return False
+        moved = False
+        if event.type == pygame.MOUSEWHEEL:
+            step = max(1, camera.cell_size // 4)
+            moved = camera.zoom(camera.cell_size + step * event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.KEYDOWN and event.key in CAMERA_KEYS:
+            dx, dy = CAMERA_KEYS[event.key]
+            moved = camera.pan(dx * 4 * camera.cell_size, dy * 4 * camera.cell_size)
+        elif event.type == pygame.KEYDOWN and event.key in (pygame.K_EQUALS, pygame.K_MINUS):
+            step = max(1, camera.cell_size // 4)
+            direction = 1 if event.key == pygame.K_EQUALS else -1
+            moved = camera.zoom(camera.cell_size + step * direction, camera.viewport.center)
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            # On a movable board a press may start a drag; the talisman is
+            # placed on release if the pointer barely moved
+            self.drag_start = event.pos
+            self.dragged = False
+        elif event.type == pygame.MOUSEMOTION and self.drag_start is not None and event.buttons[0]:
+            if not self.dragged:
+                total = abs(event.pos[0] - self.drag_start[0]) + abs(event.pos[1] - self.drag_start[1])
+                self.dragged = total > DRAG_THRESHOLD
+            if self.dragged:
+                moved = camera.pan(-event.rel[0], -event.rel[1])
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1 and self.drag_start is not None:
+            if not self.dragged:
+                # A tap, as on a fixed board: place a talisman, or stop the replay
+                if self.state == GameState.PLAYING:
+                    self.handle_game_click(event.pos)
+                elif self.state == GameState.REPLAY:
+                    self.end_replay()
+            self.drag_start = None
+        else:
+            return False
+        if moved:
+            self.full_redraw = True
+        return True
     
-    def handle_events(self):
+    def handle_events(self, events: List[pygame.event.Event]):
         """Handle user input"""
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWSIZECHANGED):
+                self.cache.set_context(self.locale, self.screen.get_size())
+                self.full_redraw = True
+            
+            if event.type == AD_CLOSED:
+                self.reward_closed(event.earned)
+                continue
+            
+            if self.handle_camera_event(event):
+                continue
+            
+            # Input is locked only while a turn is being resolved
+            if self.turns.busy and event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                continue
+            
             if event.type == pygame.MOUSEBUTTONDOWN:
                 if self.state == GameState.PLAYING:
                     self.handle_game_click(event.pos)
                 elif self.state == GameState.LEVEL_COMPLETE:
+                    if self.ad_manager is not None and ADMOB_CONFIG['show_interstitial_after_level']:
+                        # Never waited for: skipped if none has loaded yet,
+                        # and the next level loads behind it while it shows
+                        self.ad_manager.show_interstitial_ad()
                     if self.current_level < self.total_levels:
                         self.load_level(self.current_level + 1)
                     else:
@@ -260,67 +359,398 @@ class Game:
                 elif self.state == GameState.LEVEL_FAILED:
                     self.load_level(self.current_level)
                 elif self.state == GameState.MENU:
-                    self.load_level(1)
+                    self.audio.play('ui_click')
+                    self.start_game()
                 elif self.state == GameState.GAME_OVER:
                     self.state = GameState.MENU
+                elif self.state == GameState.REPLAY:
+                    self.end_replay()
             
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     self.state = GameState.MENU
                 if event.key == pygame.K_r:
                     self.load_level(self.current_level)
+                if event.key == pygame.K_m and self.state == GameState.MENU:
+                    self.start_mega()
                 if event.key == pygame.K_p:
                     if self.state == GameState.PLAYING:
                         self.state = GameState.PAUSE
                     elif self.state == GameState.PAUSE:
                         self.state = GameState.PLAYING
+                if event.key == pygame.K_u:
+                    if self.state in (GameState.PLAYING, GameState.LEVEL_FAILED):
+                        self.undo_move()
+                if event.key == pygame.K_y:
+                    if self.state == GameState.PLAYING:
+                        self.redo_move()
+                if event.key == pygame.K_v:
+                    if self.state in (GameState.PLAYING, GameState.PAUSE,
+                                      GameState.LEVEL_COMPLETE, GameState.LEVEL_FAILED):
+                        self.start_replay(self.replay)
         
         return True
     
     def handle_game_click(self, pos: Tuple[int, int]):
-        """Handle click on game grid"""
-        mouse_x, mouse_y = pos
-        
-        grid_x = mouse_x // GRID_SIZE
-        grid_y = (mouse_y - 50) // GRID_SIZE
-        
-        if not (0 <= grid_x < GRID_COLS and 0 <= grid_y < GRID_ROWS):
+        """Send a click on the grid to the turn worker; finish_turns() applies the result"""
+        index = self.camera.cell_at(pos)
+        if index is None or self.turns.busy:
             return
         
-        click_pos = Position(grid_x, grid_y)
-        
-        if self.level.grid.is_valid_placement(click_pos):
-            self.level.grid.set_cell(click_pos, CellType.TALISMAN)
-            self.level.talisman_count += 1
-            
-            self.level.ghost.move_ai(self.level.grid, self.level.pots)
+        # The worker is about to move the ghosts; settle the last move first
+        self.finish_animations()
+        self.turns.submit(self.journal, self.level.grid.position(index))
+    
+    def finish_turns(self, wait: Optional[float] = None):
+        """Apply turns the worker has resolved (waiting up to wait seconds for one)"""
+        for turn in self.turns.completed(wait):
+            if turn.error is not None:
+                raise turn.error
+            if turn.journal is not self.journal:
+                continue
+            result = turn.result
+            if self.perf_hud.enabled:
+                self.perf_hud.record('turn (move_ai)', turn.seconds)
+                if self.perf_hud.show_ai:
+                    self.update_ai_debug()
             
-            self.check_game_state()
+            if result.placed:
+                self.replay.record(turn.pos, self.level.ghost.pos)
+                self.save_turn('turn', cell=self.level.grid.index(turn.pos))
+                self.audio.play('talisman_place')
+                if result.ghost_moves:
+                    self.audio.play('ghost_move')
+                self.invalidate_turn(turn.pos, result)
+                self.check_game_state()
+    
+    def invalidate_turn(self, placed: Position, result):
+        """Queue the cells and status bar a resolved turn changed"""
+        self.start_animations()
+        self.invalidate_cell(placed)
+        for ghost_from, ghost_to in result.ghost_moves:
+            self.invalidate_cell(ghost_from)
+            self.invalidate_cell(ghost_to)
+        self.dirty_rects.append(pygame.Rect(0, 0, SCREEN_WIDTH, 50))
+        if result.ghost_moves and self.level.ghost_mask:
+            # Keep the ghost on screen on boards larger than the viewport
+            ghost = self.level.ghosts[0].pos if len(self.level.ghosts) == 1 else result.ghost_moves[0][1]
+            if self.camera.follow(self.level.grid.index(ghost)):
+                self.full_redraw = True
+    
+    def undo_move(self):
+        """Take back the last talisman, paying for undos with a rewarded ad"""
+        if not self.journal.can_undo():
+            return
+        if self.undo_credits == 0:
+            if self.ad_manager is not None:
+                # The credits, and this undo, come with the reward once the ad closes
+                if not self.reward_pending:
+                    self.reward_pending = self.ad_manager.show_rewarded_video_ad(self.post_ad_closed)
+                return
+            self.undo_credits = ADMOB_CONFIG['rewarded_undo_moves']
+        
+        delta = self.journal.undo()
+        self.finish_animations()
+        self.undo_credits -= 1
+        self.replay.pop()
+        self.save_turn('undo')
+        self.invalidate_cell(self.level.grid.position(delta.index))
+        for (before, _), (after, _) in zip(delta.ghosts_before, delta.ghosts_after):
+            if before != after:
+                self.invalidate_cell(after)
+                self.invalidate_cell(before)
+        self.dirty_rects.append(pygame.Rect(0, 0, SCREEN_WIDTH, 50))
+        self.state = GameState.PLAYING
+    
+    def post_ad_closed(self, earned: bool):
+        """Ad callback, on the ad network's thread: hand the result to the main loop"""
+        pygame.event.post(pygame.event.Event(AD_CLOSED, earned=earned))
+    
+    def reward_closed(self, earned: bool):
+        """A rewarded ad closed: grant the undos it paid for and take the first one"""
+        self.reward_pending = False
+        if not earned:
+            return
+        self.undo_credits += ADMOB_CONFIG['rewarded_undo_moves']
+        if self.state in (GameState.PLAYING, GameState.LEVEL_FAILED) and not self.turns.busy:
+            self.undo_move()
+    
+    def redo_move(self):
+        """Put back the last undone talisman, refunding its undo"""
+        self.finish_animations()
+        result = self.journal.redo()
+        if result is None:
+            return
+        placed = self.level.grid.position(self.journal.undo_stack[-1].index)
+        self.undo_credits += 1
+        self.replay.record(placed, self.level.ghost.pos)
+        self.save_turn('turn', cell=self.level.grid.index(placed))
+        self.invalidate_turn(placed, result)
+        self.check_game_state()
+    
+    def start_replay(self, replay: Replay, rate: float = REPLAY_RATE):
+        """Watch a recorded session of the current level from its first turn"""
+        self.finish_animations()
+        self.replay_resume = self.state
+        self.replay_live_level = self.level
+        self.replay_player = ReplayPlayer(replay, rate)
+        self.level = self.replay_player.level
+        self.state = GameState.REPLAY
+        self.render_board()
+        self.scheduler.animate(1.0)
+    
+    def advance_replay(self, seconds: float):
+        """Play the replay turns that come due in another seconds of playback"""
+        player = self.replay_player
+        first = player.turn
+        for offset, result in enumerate(player.advance(seconds)):
+            self.invalidate_turn(player.positions[first + offset], result)
+        if not player.finished:
+            self.scheduler.animate(1.0)
+    
+    def end_replay(self):
+        """
+        Stop the replay and hand control back to the player
+        
+        The live level (and its undo history) was left untouched while the
+        replay ran on its own copy, so play simply continues on it; the
+        turns the replay had not reached yet are dropped, not played.
+        """
+        self.finish_animations()
+        self.replay_player = None
+        self.level = self.replay_live_level
+        self.replay_live_level = None
+        self.state = self.replay_resume
+        self.render_board()
+    
+    def run_updates(self):
+        """Advance the game in fixed steps for the time since the last frame"""
+        now = time.perf_counter()
+        # A long idle wait or a stalled frame is not caught up in full
+        self.update_lag = min(self.update_lag + now - self.update_clock, PERFORMANCE_CONFIG['max_update_lag'])
+        self.update_clock = now
+        while self.update_lag >= UPDATE_STEP:
+            self.update(UPDATE_STEP)
+            self.update_lag -= UPDATE_STEP
+    
+    def update(self, dt: float):
+        """One simulation step: replay playback and ghost movement"""
+        if self.state == GameState.REPLAY:
+            self.advance_replay(dt)
+        if not self.animating or self.state == GameState.PAUSE or self.turns.busy:
+            return
+        
+        finished = []
+        for ghost in self.animating:
+            ghost.animation_progress = min(1.0, ghost.animation_progress + dt / GHOST_MOVE_SECONDS)
+            if ghost.animation_progress >= 1.0:
+                finished.append(ghost)
+        if finished:
+            self.animating = [ghost for ghost in self.animating if ghost.animation_progress < 1.0]
+            self.animating_cells = {self.level.grid.index(ghost.pos) for ghost in self.animating
+                                    if self.level.grid.in_bounds(ghost.pos)}
+            for ghost in finished:
+                # Back into the chunk (unless the ghost went into a pot)
+                self.invalidate_cell(ghost.pos)
+        if self.state not in (GameState.PLAYING, GameState.REPLAY):
+            # Moving under an overlay; those screens have no dirty-rect path
+            self.full_redraw = True
+    
+    def start_animations(self):
+        """Animate every ghost that has just moved from prev_pos to pos"""
+        moved = [ghost for ghost in self.level.ghosts
+                 if ghost.animation_progress < 1.0 and ghost.prev_pos != ghost.pos]
+        if not PERFORMANCE_CONFIG['enable_animations']:
+            for ghost in moved:
+                ghost.animation_progress = 1.0
+            return
+        for ghost in moved:
+            if ghost not in self.animating:
+                self.animating.append(ghost)
+        self.animating_cells = {self.level.grid.index(ghost.pos) for ghost in self.animating
+                                if self.level.grid.in_bounds(ghost.pos)}
+        if moved:
+            self.scheduler.animate(GHOST_MOVE_SECONDS + 0.1)
+    
+    def finish_animations(self):
+        """Put every ghost straight onto its square (before the level changes hands)"""
+        for ghost in self.level.ghosts:
+            ghost.animation_progress = 1.0
+        ghosts, self.animating = self.animating, []
+        self.animating_cells = set()
+        for ghost in ghosts:
+            self.invalidate_cell(ghost.pos)
+        self.dirty_rects.extend(self.sprite_rects)
+        self.sprite_rects = []
+    
+    def ghost_sprites(self) -> List[pygame.Rect]:
+        """Where the moving ghosts are on screen this frame"""
+        # Render between simulation steps: extrapolate by the unsimulated time
+        ahead = self.update_lag / GHOST_MOVE_SECONDS
+        rects = []
+        for ghost in self.animating:
+            t = min(1.0, ghost.animation_progress + ahead)
+            x = ghost.prev_pos.x + (ghost.pos.x - ghost.prev_pos.x) * t
+            y = ghost.prev_pos.y + (ghost.pos.y - ghost.prev_pos.y) * t
+            rects.append(self.camera.rect_at(x, y))
+        return rects
+    
+    def draw_ghost_sprites(self, rects: List[pygame.Rect]):
+        previous_clip = self.screen.get_clip()
+        self.screen.set_clip(self.camera.viewport)
+        sprite = self.cache.tile('ghost_sprite', self.camera.cell_size, self.draw_ghost)
+        for rect in rects:
+            self.screen.blit(sprite, rect)
+        self.screen.set_clip(previous_clip)
+        self.sprite_rects = [rect.clip(self.camera.viewport) for rect in rects]
+    
+    def draw_ghost(self, tile: pygame.Surface):
+        rect = tile.get_rect()
+        pygame.draw.circle(tile, COLOR_GHOST, rect.center, rect.width // 3)
+        pygame.draw.circle(tile, COLOR_TEXT, rect.center, rect.width // 3, 1)
+    
+    def update_ai_debug(self):
+        """Publish the ghost's candidate move scores to the performance HUD"""
+        level = self.level
+        ghost_index = level.grid.index(level.ghost.pos)
+        names = {level.width: 'down', -level.width: 'up', 1: 'right', -1: 'left'}
+        scores = [
+            f"{names[move - ghost_index]} {level.fields.score[move]:.1f} (path {level.fields.pot_path[move]})"
+            for move in level.board.moves(ghost_index, level.blocked)
+        ]
+        self.perf_hud.set_ai_scores(["AI: " + ", ".join(scores) if scores else "AI: trapped"])
     
     def check_game_state(self):
         """Check if level is won or lost"""
-        ghost_pos = self.level.ghost.pos
+        outcome = evaluate(self.level)
         
-        if ghost_pos in self.level.pots:
+        if outcome == Outcome.WON:
             self.state = GameState.LEVEL_COMPLETE
-            self.total_score += max(0, self.level.max_talismans - self.level.talisman_count)
-            return
-        
-        if (ghost_pos.x < 0 or ghost_pos.x >= GRID_COLS or
-            ghost_pos.y < 0 or ghost_pos.y >= GRID_ROWS):
+            self.audio.play('level_complete')
+            seconds = round(time.monotonic() - self.level_started, 2)
+            
+            # Mega boards are played outside the campaign: no score,
+            # best time or unlocked level comes from them
+            if not self.mega:
+                self.total_score += level_score(self.level)
+                best = self.best_times.get(self.current_level)
+                if best is None or seconds < best:
+                    self.best_times[self.current_level] = seconds
+                    self.store.append('best', level=self.current_level, seconds=seconds)
+                self.progress_level = max(self.progress_level, min(self.current_level + 1, self.total_levels))
+                self.store.append('progress', level=self.progress_level, score=self.total_score)
+            self.analytics.emit('level_complete', self.current_level, self.level.talisman_count,
+                                seconds, self.total_score)
+        elif outcome == Outcome.LOST:
             self.state = GameState.LEVEL_FAILED
-            return
+            self.audio.play('level_failed')
+            self.analytics.emit('level_failed', self.current_level, self.level.talisman_count,
+                                round(time.monotonic() - self.level_started, 2))
+    
+    def render_board(self):
+        """Drop every rasterized chunk; they are repainted as they come into view"""
+        self.board_view.reset()
+        self.full_redraw = True
+    
+    def loose_ghost_cells(self) -> Set[int]:
+        """Cells holding a loose ghost, rebuilt only when ghost_mask changes"""
+        mask = self.level.ghost_mask
+        if mask != self.ghost_cells_mask:
+            self.ghost_cells = set(bit_indices(mask))
+            self.ghost_cells_mask = mask
+        return self.ghost_cells
+    
+    def occupied_cells(self, start: int, count: int) -> List[int]:
+        """Cells in [start, start + count) that are not plain empty squares"""
+        row = self.level.grid.cells[start:start + count]
+        found = [start + i for i, cell in enumerate(row) if cell] if row.count(0) != count else []
+        for index in self.loose_ghost_cells():
+            if start <= index < start + count and self.level.grid.cells[index] == CellType.EMPTY:
+                found.append(index)
+        return found
+    
+    def paint_cell(self, surface: pygame.Surface, index: int, rect: pygame.Rect):
+        """Draw a single cell onto a board chunk"""
+        cell = self.level.grid.cells[index]
+        
+        if cell == CellType.TALISMAN:
+            name = 'talisman'
+        elif cell == CellType.OBSTACLE:
+            name = 'obstacle'
+        elif cell == CellType.POT:
+            name = 'pot'
+        elif index in self.loose_ghost_cells() and index not in self.animating_cells:
+            name = 'ghost'
+        else:
+            name = 'empty'
+        surface.blit(self.cell_tile(name, rect.width), rect)
         
-        if self.level.talisman_count >= self.level.max_talismans:
-            self.state = GameState.LEVEL_FAILED
+        if self.perf_hud.show_grid_numbers:
+            # Rendered directly so 440 labels do not evict the cached tiles
+            surface.blit(self.font_small.render(str(index), True, COLOR_GRID), rect.move(2, 2))
+    
+    def cell_tile(self, name: str, size: int = GRID_SIZE) -> pygame.Surface:
+        """Cached sprite for one kind of cell, grid outline included"""
+        def draw(tile: pygame.Surface):
+            rect = tile.get_rect()
+            tile.fill(COLOR_BG)
+            pygame.draw.rect(tile, COLOR_GRID, rect, 1)
+            if name == 'talisman':
+                pygame.draw.rect(tile, COLOR_TALISMAN, rect)
+                pygame.draw.rect(tile, COLOR_TEXT, rect, 1)
+            elif name == 'obstacle':
+                pygame.draw.rect(tile, COLOR_OBSTACLE, rect)
+            elif name == 'pot':
+                pygame.draw.circle(tile, COLOR_POT, rect.center, size // 3)
+                pygame.draw.circle(tile, COLOR_TEXT, rect.center, size // 3, 1)
+            elif name == 'ghost':
+                self.draw_ghost(tile)
+        return self.cache.tile(name, size, draw)
+    
+    def invalidate_cell(self, pos: Position):
+        """Redraw a cell and queue its screen area for the next update"""
+        if not self.level.grid.in_bounds(pos):
+            return
+        rect = self.board_view.invalidate(self.level.grid.index(pos))
+        if rect is not None:
+            self.dirty_rects.append(rect)
     
     def draw(self):
-        """Draw the game"""
+        """Draw the game, pushing only what changed since the last frame"""
+        if self.board_view is not None:
+            # The worker owns the level mid-turn: draw only what is already built
+            self.board_view.frozen = self.turns.busy
+        if self.state != self.drawn_state:
+            self.full_redraw = True
+        
+        if not self.full_redraw:
+            if self.state in (GameState.PLAYING, GameState.REPLAY) and (self.animating or self.sprite_rects):
+                # Wipe the sprites where they were, draw them where they are
+                sprites = self.ghost_sprites()
+                self.dirty_rects.extend(self.sprite_rects)
+                self.dirty_rects.extend(sprites)
+            else:
+                sprites = None
+            if self.dirty_rects and self.state in (GameState.PLAYING, GameState.REPLAY):
+                for rect in self.dirty_rects:
+                    if rect.top < 50:
+                        self.draw_hud()
+                    else:
+                        self.board_view.draw(self.screen, rect)
+                if sprites is not None:
+                    self.draw_ghost_sprites(sprites)
+                pygame.display.update(self.dirty_rects)
+            self.dirty_rects.clear()
+            return
+        
+        self.full_redraw = False
+        self.dirty_rects.clear()
+        self.drawn_state = self.state
         self.screen.fill(COLOR_BG)
         
         if self.state == GameState.MENU:
             self.draw_menu()
-        elif self.state == GameState.PLAYING:
+        elif self.state in (GameState.PLAYING, GameState.REPLAY):
             self.draw_game()
         elif self.state == GameState.PAUSE:
             self.draw_game()
@@ -337,79 +767,74 @@ class Game:
     def draw_menu(self):
         """Draw main menu"""
         # Draw title
-        title = self.font_large.render("Ghost Catching Game", True, COLOR_TEXT)
+        title = self.cache.text(self.font_large, "Ghost Catching Game", COLOR_TEXT)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 150))
         self.screen.blit(title, title_rect)
         
         # Draw subtitle
-        subtitle = self.font_medium.render("Turn-Based Puzzle Game", True, COLOR_TEXT)
+        subtitle = self.cache.text(self.font_medium, "Turn-Based Puzzle Game", COLOR_TEXT)
         subtitle_rect = subtitle.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         self.screen.blit(subtitle, subtitle_rect)
         
         # Draw instructions
-        instr1 = self.font_small.render("Place talismans to catch the ghost", True, COLOR_TEXT)
+        instr1 = self.cache.text(self.font_small, "Place talismans to catch the ghost", COLOR_TEXT)
         instr1_rect = instr1.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
         self.screen.blit(instr1, instr1_rect)
         
-        instr2 = self.font_small.render("Guide it into the sacred pot", True, COLOR_TEXT)
+        instr2 = self.cache.text(self.font_small, "Guide it into the sacred pot", COLOR_TEXT)
         instr2_rect = instr2.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
         self.screen.blit(instr2, instr2_rect)
         
+        instr3 = self.cache.text(self.font_small, "Press M for a mega level", COLOR_TEXT)
+        instr3_rect = instr3.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 140))
+        self.screen.blit(instr3, instr3_rect)
+        
         # Draw start button
         button_rect = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 200, 200, 50)
         pygame.draw.rect(self.screen, COLOR_BUTTON, button_rect)
         pygame.draw.rect(self.screen, COLOR_TEXT, button_rect, 2)
         
-        start_text = self.font_medium.render("START", True, COLOR_TEXT)
+        start_text = self.cache.text(self.font_medium, "START", COLOR_TEXT)
         start_rect = start_text.get_rect(center=button_rect.center)
         self.screen.blit(start_text, start_rect)
     
     def draw_game(self):
         """Draw game screen"""
-        # Draw UI bar
+        self.draw_hud()
+        self.board_view.draw(self.screen)
+        self.draw_ghost_sprites(self.ghost_sprites())
+        if self.board_view.pending:
+            # Chunks still to rasterize; they are spread over the next frames
+            self.full_redraw = True
+            self.scheduler.animate(0.1)
+    
+    def draw_hud(self):
+        """Draw the status bar above the board"""
         pygame.draw.rect(self.screen, COLOR_UI_BG, (0, 0, SCREEN_WIDTH, 50))
         
-        ui_text = self.font_small.render(
-            f"Level: {self.current_level}/99 | Talismans: {self.level.talisman_count}/{self.level.max_talismans} | Score: {self.total_score}",
-            True,
-            COLOR_TEXT
-        )
-        self.screen.blit(ui_text, (10, 10))
-        
-        # Draw grid
-        grid_start_y = 50
-        for y in range(GRID_ROWS):
-            for x in range(GRID_COLS):
-                rect = pygame.Rect(x * GRID_SIZE, grid_start_y + y * GRID_SIZE, GRID_SIZE, GRID_SIZE)
-                pygame.draw.rect(self.screen, COLOR_GRID, rect, 1)
-                
-                pos = Position(x, y)
-                cell = self.level.grid.get_cell(pos)
-                
-                if cell == CellType.TALISMAN:
-                    pygame.draw.rect(self.screen, COLOR_TALISMAN, rect)
-                    pygame.draw.rect(self.screen, COLOR_TEXT, rect, 1)
-                elif cell == CellType.OBSTACLE:
-                    pygame.draw.rect(self.screen, COLOR_OBSTACLE, rect)
-                elif cell == CellType.POT:
-                    pygame.draw.circle(self.screen, COLOR_POT, rect.center, GRID_SIZE // 3)
-                    pygame.draw.circle(self.screen, COLOR_TEXT, rect.center, GRID_SIZE // 3, 1)
-                elif pos == self.level.ghost.pos:
-                    pygame.draw.circle(self.screen, COLOR_GHOST, rect.center, GRID_SIZE // 3)
-                    pygame.draw.circle(self.screen, COLOR_TEXT, rect.center, GRID_SIZE // 3, 1)
+        prefix = "Replay | " if self.state == GameState.REPLAY else ""
+        if self.mega:
+            prefix += f"Mega {self.level.width}x{self.level.height} | "
+        if self.hud_text is None or not self.turns.busy:
+            # Mid-turn the counts are being changed; keep the last text
+            ghosts = len(self.level.ghosts)
+            suffix = f" | Ghosts: {popcount(self.level.ghost_mask)}/{ghosts}" if ghosts > 1 else ""
+            self.hud_text = self.cache.text(
+                self.font_small,
+                f"{prefix}Level: {self.current_level}/99 | Talismans: {self.level.talisman_count}/{self.level.max_talismans} | Score: {self.total_score}{suffix}",
+                COLOR_TEXT
+            )
+        self.screen.blit(self.hud_text, (10, 10))
     
     def draw_pause(self):
         """Draw pause overlay"""
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(150)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.cache.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), 150), (0, 0))
         
-        text = self.font_large.render("PAUSED", True, COLOR_TEXT)
+        text = self.cache.text(self.font_large, "PAUSED", COLOR_TEXT)
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         self.screen.blit(text, text_rect)
         
-        resume_text = self.font_small.render("Press P to resume", True, COLOR_TEXT)
+        resume_text = self.cache.text(self.font_small, "Press P to resume", COLOR_TEXT)
         resume_rect = resume_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
         self.screen.blit(resume_text, resume_rect)
     
@@ -417,23 +842,20 @@ class Game:
         """Draw level complete screen"""
         self.draw_game()
         
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.cache.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), 200), (0, 0))
         
-        text = self.font_large.render("Level Complete!", True, COLOR_SUCCESS)
+        text = self.cache.text(self.font_large, "Level Complete!", COLOR_SUCCESS)
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 100))
         self.screen.blit(text, text_rect)
         
-        score_text = self.font_medium.render(f"Score: +{max(0, self.level.max_talismans - self.level.talisman_count)}", True, COLOR_SUCCESS)
+        score_text = self.cache.text(self.font_medium, f"Score: +{level_score(self.level)}", COLOR_SUCCESS)
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         self.screen.blit(score_text, score_rect)
         
         if self.current_level < self.total_levels:
-            next_text = self.font_small.render("Click to continue to next level...", True, COLOR_TEXT)
+            next_text = self.cache.text(self.font_small, "Click to continue to next level...", COLOR_TEXT)
         else:
-            next_text = self.font_small.render("All levels complete! Click to restart...", True, COLOR_SUCCESS)
+            next_text = self.cache.text(self.font_small, "All levels complete! Click to restart...", COLOR_SUCCESS)
         
         next_rect = next_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
         self.screen.blit(next_text, next_rect)
@@ -442,45 +864,89 @@ class Game:
         """Draw level failed screen"""
         self.draw_game()
         
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.cache.overlay((SCREEN_WIDTH, SCREEN_HEIGHT), 200), (0, 0))
         
-        text = self.font_large.render("Ghost Escaped!", True, COLOR_FAILURE)
+        text = self.cache.text(self.font_large, "Ghost Escaped!", COLOR_FAILURE)
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         self.screen.blit(text, text_rect)
         
-        retry_text = self.font_small.render("Click to retry... (R to reset, ESC for menu)", True, COLOR_TEXT)
+        retry_text = self.cache.text(self.font_small, "Click to retry... (R to reset, ESC for menu)", COLOR_TEXT)
         retry_rect = retry_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
         self.screen.blit(retry_text, retry_rect)
+        
+        if self.journal.can_undo() and (self.undo_credits or self.ad_manager is None
+                                        or self.ad_manager.is_ready(REWARDED)):
+            undo_text = self.cache.text(self.font_small, "Press U to undo your last talisman", COLOR_TEXT)
+            undo_rect = undo_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 90))
+            self.screen.blit(undo_text, undo_rect)
     
     def draw_game_over(self):
         """Draw game over screen"""
-        title = self.font_large.render("Game Complete!", True, COLOR_SUCCESS)
+        title = self.cache.text(self.font_large, "Game Complete!", COLOR_SUCCESS)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 150))
         self.screen.blit(title, title_rect)
         
-        score_text = self.font_medium.render(f"Final Score: {self.total_score}", True, COLOR_SUCCESS)
+        score_text = self.cache.text(self.font_medium, f"Final Score: {self.total_score}", COLOR_SUCCESS)
         score_rect = score_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         self.screen.blit(score_text, score_rect)
         
-        congrats_text = self.font_small.render("Congratulations! You caught all 99 ghosts!", True, COLOR_TEXT)
+        congrats_text = self.cache.text(self.font_small, "Congratulations! You caught all 99 ghosts!", COLOR_TEXT)
         congrats_rect = congrats_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 100))
         self.screen.blit(congrats_text, congrats_rect)
         
-        restart_text = self.font_small.render("Click to return to menu", True, COLOR_TEXT)
+        restart_text = self.cache.text(self.font_small, "Click to return to menu", COLOR_TEXT)
         restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 200))
         self.screen.blit(restart_text, restart_rect)
     
+    def draw_perf_hud(self):
+        """Overlay the performance HUD and push just its area"""
+        rect = self.perf_hud.draw(self.screen, self.scheduler.get_fps())
+        if rect is None:
+            return
+        if self.perf_rect is not None and not rect.contains(self.perf_rect):
+            # The panel shrank or moved; repaint what it used to cover
+            self.full_redraw = True
+        self.perf_rect = rect
+        pygame.display.update(rect)
+    
     def run(self):
         """Main game loop"""
+        self.draw()
+        self.startup.mark('first frame')
+        self.finish_startup()
+        self.startup.report()
+        
         running = True
         while running:
-            running = self.handle_events()
+            events = self.scheduler.wait()
+            self.finish_turns()
+            if not self.perf_hud.enabled:
+                running = self.handle_events(events)
+                self.run_updates()
+                self.draw()
+                continue
+            
+            frame_start = time.perf_counter()
+            running = self.handle_events(events)
+            events_done = time.perf_counter()
+            self.run_updates()
+            update_done = time.perf_counter()
             self.draw()
-            self.clock.tick(FPS)
-        
+            draw_done = time.perf_counter()
+            self.perf_hud.record('handle_events', events_done - frame_start)
+            self.perf_hud.record('update', update_done - events_done)
+            self.perf_hud.record('draw', draw_done - update_done)
+            self.draw_perf_hud()
+            self.perf_hud.end_frame(time.perf_counter() - frame_start)
+        
+        if self.store is not None:
+            self.store.close()
+        self.turns.close()
+        if self.ad_manager is not None:
+            self.ad_manager.close()
+        if self.analytics is not None:
+            self.analytics.close()
+        self.audio.close()
         pygame.quit()
         sys.exit()
 
@@ -1,8 +1,109 @@
 """
 Ad Manager - Handles Google AdMob integration
-Supports Interstitial Ads and Rewarded Video Ads
+Supports Interstitial Ads and Rewarded Video Ads, prefetched in the
+background so that showing one never waits on the network
 """
 
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.config import ADMOB_CONFIG
+
+INTERSTITIAL = 'interstitial'
+REWARDED = 'rewarded'
+AD_KINDS = (INTERSTITIAL, REWARDED)
+
+
+class AdLoadError(Exception):
+    """Raised (or passed to on_failed) when a provider cannot fill an ad"""
+
+
+class AdProvider:
+    """
+    Interface to an ad network
+
+    load() must return at once and later call exactly one of
+    on_loaded(ad) or on_failed(error), from any thread. A callback that
+    arrives after AdManager gave up on the request is ignored. show() is
+    only called with an ad that finished loading; it must not wait for
+    the ad either, and calls on_closed(earned) exactly once, from any
+    thread, when the user closes it.
+    """
+
+    def load(self, kind: str, ad_unit_id: str,
+             on_loaded: Callable[[object], None], on_failed: Callable[[Exception], None]):
+        raise NotImplementedError
+
+    def show(self, kind: str, ad: object, on_closed: Callable[[bool], None]):
+        raise NotImplementedError
+
+
+class FakeAdProvider(AdProvider):
+    """
+    Local stand-in for AdMob, for desktop builds and tests
+
+    Each load completes on a timer thread after load_delay seconds, or
+    never if load_delay is None (to exercise timeouts). fail_next makes
+    that many upcoming loads fail, and fail_rate fails loads at random.
+    Shown ads close at once, with the reward earned for rewarded ones.
+    """
+
+    def __init__(self, load_delay: Optional[float] = 0.0, fail_rate: float = 0.0,
+                 fail_next: int = 0, seed: Optional[int] = None):
+        self.load_delay = load_delay
+        self.fail_rate = fail_rate
+        self.fail_next = fail_next
+        self.rng = random.Random(seed)
+        self.loads = 0
+        self.shown = 0
+
+    def load(self, kind, ad_unit_id, on_loaded, on_failed):
+        self.loads += 1
+        if self.load_delay is None:
+            return
+        if self.fail_next > 0 or self.rng.random() < self.fail_rate:
+            self.fail_next = max(0, self.fail_next - 1)
+            result = lambda: on_failed(AdLoadError(f'no fill for {kind}'))  # noqa: E731
+        else:
+            result = lambda: on_loaded({'kind': kind, 'unit': ad_unit_id, 'serial': self.loads})  # noqa: E731
+        timer = threading.Timer(self.load_delay, result)
+        timer.daemon = True
+        timer.start()
+
+    def show(self, kind, ad, on_closed):
+        self.shown += 1
+        on_closed(kind == REWARDED)
+
+
+def platform_provider(config: dict = ADMOB_CONFIG) -> Optional[AdProvider]:
+    """
+    The ad network for this platform: AdMob on Android; elsewhere the
+    fake in test_mode, so the ad flow can be tried on desktop, and None
+    (no ads) otherwise
+    """
+    if 'ANDROID_ARGUMENT' in os.environ:
+        from src.admob_provider import AdMobProvider
+        return AdMobProvider()
+    if config['test_mode']:
+        return FakeAdProvider(load_delay=1.0)
+    return None
+
+
+class _Slot:
+    """One ad kind: the ad kept warm, or the request filling it"""
+
+    def __init__(self):
+        self.ad: Optional[object] = None
+        self.loaded_at = 0.0
+        self.request = 0  # id of the request in flight, 0 if none
+        self.deadline = 0.0
+        self.retry_at = 0.0
+        self.failures = 0
+
+
 class AdManager:
     """
     Manages advertisement display and tracking
@@ -10,14 +111,31 @@ class AdManager:
     For Android deployment with AdMob:
     - Interstitial Ads: Full-screen ads shown after level completion
     - Rewarded Video Ads: Short video ads that give in-game rewards
+
+    One ad of each kind is kept loaded by a worker thread. The show_*
+    methods never wait, neither for a load nor for the ad to close: with
+    an ad ready they start showing it and the worker loads the next one,
+    otherwise they return False and the game carries on. The outcome
+    arrives later through on_closed, on the provider's thread. Loads that take longer than load_timeout are
+    abandoned, and failed or timed-out loads are retried with
+    exponential backoff. Ads older than ad_max_age are replaced, as the
+    network stops honouring them.
     """
     
-    def __init__(self):
+    def __init__(self, provider: AdProvider, config: dict = ADMOB_CONFIG, analytics=None):
         self.interstitial_ad_unit_id = "ca-app-pub-1477667343771195/8396722467"  # Interstitial Ad (Level Complete)
         self.rewarded_ad_unit_id = "ca-app-pub-1477667343771195/8089600709"      # Rewarded Ad (Retry)
-        self.is_ad_loaded = False
+        self.provider = provider
+        self.config = config
+        self.analytics = analytics
+        self.slots: Dict[str, _Slot] = {kind: _Slot() for kind in AD_KINDS}
+        self.lock = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+        self.next_request = 0
         self.ad_shown_count = 0
         self.reward_earned = False
+        self.stats = {'loaded': 0, 'failed': 0, 'timed_out': 0, 'expired': 0, 'not_ready': 0}
     
     def set_ad_unit_ids(self, interstitial_id: str, rewarded_id: str):
         """
@@ -30,107 +148,159 @@ class AdManager:
         self.interstitial_ad_unit_id = interstitial_id
         self.rewarded_ad_unit_id = rewarded_id
     
-    def load_interstitial_ad(self):
-        """Load an interstitial ad (full-screen ad)"""
-        # This will be implemented in the Android/Kivy version
-        # For now, this is a placeholder
-        self.is_ad_loaded = True
+    def start(self):
+        """Start prefetching in the background; safe to call again"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._worker, name='ad-prefetch', daemon=True)
+            self.thread.start()
+    
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+    
+    def is_ready(self, kind: str) -> bool:
+        """True if an ad of this kind can be shown right now"""
+        return self.slots[kind].ad is not None
+    
+    def _unit_id(self, kind: str) -> str:
+        return self.interstitial_ad_unit_id if kind == INTERSTITIAL else self.rewarded_ad_unit_id
+    
+    def _worker(self):
+        with self.lock:
+            while not self.closed:
+                now = time.monotonic()
+                wake = now + self.config['ad_max_age']
+                for kind, slot in self.slots.items():
+                    if slot.ad is not None and now - slot.loaded_at > self.config['ad_max_age']:
+                        slot.ad = None
+                        self.stats['expired'] += 1
+                    if slot.request and now >= slot.deadline:
+                        slot.request = 0
+                        self.stats['timed_out'] += 1
+                        self._back_off(slot, now)
+                    if slot.ad is None and not slot.request and now >= slot.retry_at:
+                        self._request(kind, slot, now)
+                    if slot.ad is not None:
+                        wake = min(wake, slot.loaded_at + self.config['ad_max_age'])
+                    elif slot.request:
+                        wake = min(wake, slot.deadline)
+                    else:
+                        wake = min(wake, slot.retry_at)
+                self.lock.wait(max(0.0, wake - now))
+    
+    def _back_off(self, slot: _Slot, now: float):
+        slot.failures += 1
+        delay = self.config['ad_retry_backoff'] * 2 ** (slot.failures - 1)
+        slot.retry_at = now + min(delay, self.config['ad_max_retry_backoff'])
+    
+    def _request(self, kind: str, slot: _Slot, now: float):
+        self.next_request += 1
+        request = self.next_request
+        slot.request = request
+        slot.deadline = now + self.config['ad_load_timeout']
+
+        def loaded(ad):
+            with self.lock:
+                if slot.request != request:
+                    return
+                slot.request = 0
+                slot.ad = ad
+                slot.loaded_at = time.monotonic()
+                slot.failures = 0
+                self.stats['loaded'] += 1
+                self.lock.notify_all()
+
+        def failed(error):
+            with self.lock:
+                if slot.request != request:
+                    return
+                slot.request = 0
+                self.stats['failed'] += 1
+                self._back_off(slot, time.monotonic())
+                self.lock.notify_all()
+
+        try:
+            # The provider only queues the request, so holding the lock is fine
+            self.provider.load(kind, self._unit_id(kind), loaded, failed)
+        except Exception:
+            slot.request = 0
+            self.stats['failed'] += 1
+            self._back_off(slot, now)
+    
+    def _take(self, kind: str) -> Optional[object]:
+        with self.lock:
+            slot = self.slots[kind]
+            ad, slot.ad = slot.ad, None
+            if ad is None:
+                self.stats['not_ready'] += 1
+                if self.analytics is not None:
+                    self.analytics.emit('ad_not_ready', kind)
+            else:
+                self.lock.notify_all()
+            return ad
+    
+    def _show(self, kind: str, on_closed: Optional[Callable[[bool], None]]) -> bool:
+        ad = self._take(kind)
+        if ad is None:
+            return False
+
+        def closed(earned):
+            earned = kind == REWARDED and bool(earned)
+            with self.lock:
+                self.ad_shown_count += 1
+                self.reward_earned = self.reward_earned or earned
+            if self.analytics is not None:
+                self.analytics.emit('ad_shown', kind, earned)
+            if on_closed is not None:
+                on_closed(earned)
+
+        self.provider.show(kind, ad, closed)
+        return True
     
-    def show_interstitial_ad(self):
+    def show_interstitial_ad(self, on_closed: Optional[Callable[[bool], None]] = None) -> bool:
         """
-        Show an interstitial ad after level completion
+        Start an interstitial ad after level completion, if one is ready
         
-        In the actual Android app, this will:
-        1. Display a full-screen advertisement
-        2. Wait for the user to close it or for it to finish
-        3. Return control to the game
+        The game does not wait for it: on Android the ad covers the
+        screen until the user closes it, then on_closed(False) is called.
+        
+        Returns:
+            bool: True if an ad was shown
         """
-        if self.is_ad_loaded:
-            self.ad_shown_count += 1
-            self.is_ad_loaded = False
-            self.load_interstitial_ad()
-            return True
-        return False
+        return self._show(INTERSTITIAL, on_closed)
     
-    def load_rewarded_video_ad(self):
-        """Load a rewarded video ad"""
-        self.is_ad_loaded = True
-    
-    def show_rewarded_video_ad(self):
+    def show_rewarded_video_ad(self, on_closed: Optional[Callable[[bool], None]] = None) -> bool:
         """
-        Show a rewarded video ad
+        Start a rewarded video ad, if one is ready
+        
+        on_closed(earned) is called once the ad closes; earned is True if
+        the user watched the full video.
         
         Returns:
-            bool: True if reward was earned (user watched the full video)
+            bool: True if an ad was shown
         """
-        if self.is_ad_loaded:
-            self.reward_earned = True
-            self.is_ad_loaded = False
-            self.load_rewarded_video_ad()
-            return True
-        return False
+        return self._show(REWARDED, on_closed)
     
     def get_ad_stats(self) -> dict:
-        """Get statistics about ads shown"""
+        """Get statistics about ads shown and loaded"""
         return {
             "ads_shown": self.ad_shown_count,
-            "rewards_earned": self.reward_earned
+            "rewards_earned": self.reward_earned,
+            **self.stats,
         }
 
 # Configuration for AdMob integration in buildozer.spec
-ADMOB_CONFIG = """
+BUILDOZER_ADMOB_CONFIG = """
 # Google Play Services and AdMob
 android.permissions = INTERNET, ACCESS_NETWORK_STATE
 
 # Required for AdMob
 android.gradle_dependencies = com.google.android.gms:play-services-ads:20.6.0
 
-# AdMob initialization code (to be added in main app)
-"""
-
-# Example implementation for Kivy (which will be used for Android build)
-KIVY_ADMOB_EXAMPLE = """
-from kivy.garden.mapview import MapView
-from jnius import autoclass, cast
-
-# Load AdMob classes
-PythonJavaClass = autoclass('org.renpy.android.PythonJavaClass')
-AdRequest = autoclass('com.google.android.gms.ads.AdRequest')
-InterstitialAd = autoclass('com.google.android.gms.ads.interstitial.InterstitialAd')
-RewardedAd = autoclass('com.google.android.gms.ads.rewarded.RewardedAd')
-MobileAds = autoclass('com.google.android.gms.ads.MobileAds')
-
-class AdManagerKivy:
-    def __init__(self):
-        # Initialize Mobile Ads SDK
-        MobileAds.initialize(None)
-        
-        self.interstitial_ad = None
-        self.rewarded_ad = None
-    
-    def load_interstitial(self, ad_unit_id):
-        ad_request = AdRequest.Builder().build()
-        InterstitialAd.load(
-            self.context,
-            ad_unit_id,
-            ad_request,
-            self.on_interstitial_loaded
-        )
-    
-    def show_interstitial(self):
-        if self.interstitial_ad:
-            self.interstitial_ad.show(self.activity)
-    
-    def load_rewarded(self, ad_unit_id):
-        ad_request = AdRequest.Builder().build()
-        RewardedAd.load(
-            self.context,
-            ad_unit_id,
-            ad_request,
-            self.on_rewarded_loaded
-        )
-    
-    def show_rewarded(self):
-        if self.rewarded_ad:
-            self.rewarded_ad.show(self.activity, self.on_user_earned_reward)
+# Java bridge used by src/admob_provider.py
+android.add_src = android/src
 """
@@ -0,0 +1,65 @@
+"""
+AdMob Provider - The real ad network on Android
+Talks to Google Mobile Ads through pyjnius and the Java bridge in
+android/src (AdBridge), which turns the SDK's load callbacks into a
+plain interface that Python can implement
+"""
+
+from typing import Set
+
+from jnius import PythonJavaClass, autoclass, java_method
+
+from src.ad_manager import REWARDED, AdLoadError, AdProvider
+
+AdBridge = autoclass('org.ghostcatching.ads.AdBridge')
+PythonActivity = autoclass('org.kivy.android.PythonActivity')
+
+
+class _Listener(PythonJavaClass):
+    __javainterfaces__ = ['org/ghostcatching/ads/AdBridge$Listener']
+    __javacontext__ = 'app'
+
+    def __init__(self, owner: Set['_Listener'], on_loaded=None, on_failed=None, on_closed=None):
+        super().__init__()
+        # Java only holds a weak reference, so keep one until the callback
+        self.owner = owner
+        self.owner.add(self)
+        self.on_loaded = on_loaded
+        self.on_failed = on_failed
+        self.on_closed = on_closed
+
+    @java_method('(Ljava/lang/Object;)V')
+    def onLoaded(self, ad):
+        self.owner.discard(self)
+        self.on_loaded(ad)
+
+    @java_method('(Ljava/lang/String;)V')
+    def onFailed(self, message):
+        self.owner.discard(self)
+        self.on_failed(AdLoadError(message))
+
+    @java_method('(Z)V')
+    def onClosed(self, earned):
+        self.owner.discard(self)
+        self.on_closed(earned)
+
+
+class AdMobProvider(AdProvider):
+    """
+    Google Mobile Ads for AdManager
+
+    load() and show() only queue the call on the UI thread; the bridge
+    reports the result back through a listener on that thread.
+    """
+
+    def __init__(self):
+        self.activity = PythonActivity.mActivity
+        self.listeners: Set[_Listener] = set()
+        AdBridge.initialize(self.activity)
+
+    def load(self, kind, ad_unit_id, on_loaded, on_failed):
+        listener = _Listener(self.listeners, on_loaded=on_loaded, on_failed=on_failed)
+        AdBridge.load(self.activity, kind == REWARDED, ad_unit_id, listener)
+
+    def show(self, kind, ad, on_closed):
+        AdBridge.show(self.activity, ad, _Listener(self.listeners, on_closed=on_closed))
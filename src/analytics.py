@@ -0,0 +1,171 @@
+"""
+Analytics - Buffered gameplay events
+Events go into a fixed-size ring buffer and a worker thread writes them
+in batches to a local spool file and an optional sink (HTTP endpoint)
+"""
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from src.config import ANALYTICS_CONFIG
+from src.persistence import default_save_dir
+
+SPOOL_NAME = 'analytics.jsonl'
+
+# Field names per event kind; emit() takes the values positionally
+EVENT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    'session_start': ('platform', 'python', 'screen'),
+    'session_end': ('seconds',),
+    'level_start': ('level', 'seed', 'width', 'height'),
+    'level_complete': ('level', 'talismans', 'seconds', 'score'),
+    'level_failed': ('level', 'talismans', 'seconds'),
+    'ad_shown': ('ad', 'rewarded'),
+    'ad_not_ready': ('ad',),
+}
+
+# Which ANALYTICS_CONFIG switch turns each kind on
+EVENT_SWITCHES = {
+    'session_start': 'track_device_info',
+    'session_end': 'track_game_duration',
+    'level_start': 'track_level_completion',
+    'level_complete': 'track_level_completion',
+    'level_failed': 'track_level_completion',
+    'ad_shown': 'track_ads_shown',
+    'ad_not_ready': 'track_ads_shown',
+}
+
+
+class MemorySink:
+    """Keeps every record in a list (tests, local inspection)"""
+
+    def __init__(self):
+        self.records: List[Dict] = []
+
+    def send(self, records: List[Dict]):
+        self.records.extend(records)
+
+
+class HttpSink:
+    """POSTs each batch as a JSON array, e.g. to tools/analytics_server.py"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, records: List[Dict]):
+        body = json.dumps(records, separators=(',', ':')).encode('utf-8')
+        request = urllib.request.Request(self.url, body, {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class Analytics:
+    """
+    Bounded, non-blocking event recorder
+
+    emit() appends one (time, kind, values) tuple to a deque with maxlen,
+    which is atomic under the GIL and drops the oldest entry when full,
+    so memory stays fixed however far the writer falls behind. Kinds
+    switched off in the config are discarded on the spot. The stamp is
+    time.monotonic(), the cheapest clock, and only becomes wall-clock
+    time when the worker turns it into a record. Every
+    flush_interval seconds the worker turns up to batch_size records
+    into dicts, appends them to the spool file (rotated past
+    spool_max_bytes) and hands them to the sink. A failing sink only
+    bumps sink_errors; the spool keeps the batch either way.
+    """
+
+    def __init__(self, config: dict = ANALYTICS_CONFIG, directory: Optional[str] = None, sink=None):
+        self.config = config
+        self.directory = directory or default_save_dir()
+        self.spool_path = os.path.join(self.directory, SPOOL_NAME)
+        if sink is None and config.get('sink_url'):
+            sink = HttpSink(config['sink_url'])
+        self.sink = sink
+        self.tracked = frozenset(
+            kind for kind, switch in EVENT_SWITCHES.items() if config['enabled'] and config[switch]
+        )
+        self.buffer: deque = deque(maxlen=config['buffer_size'])
+        # Bound once, so emit() does no module or method lookups
+        self._append = self.buffer.append
+        self._clock = time.monotonic
+        self.epoch = time.time() - time.monotonic()
+        self.emitted = 0
+        self.written = 0
+        self.sink_errors = 0
+        self.spool_errors = 0
+        self.started = time.monotonic()
+        self.wake = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+
+    def emit(self, kind: str, *values):
+        """Record one event; constant time, never blocks"""
+        if kind in self.tracked:
+            self._append((self._clock(), kind, values))
+            self.emitted += 1
+
+    @property
+    def dropped(self) -> int:
+        """Events overwritten in the ring before the worker got to them"""
+        return max(0, self.emitted - self.written - len(self.buffer))
+
+    def start(self, screen_size: Tuple[int, int] = (0, 0)):
+        """Start the writer thread; safe to call again"""
+        if self.thread is not None or not self.tracked:
+            return
+        self.emit('session_start', sys.platform, platform.python_version(), list(screen_size))
+        self.thread = threading.Thread(target=self._writer, name='analytics-writer', daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Record the session length, write what is buffered and stop"""
+        if self.thread is None:
+            return
+        self.emit('session_end', round(time.monotonic() - self.started, 1))
+        self.closed = True
+        self.wake.set()
+        self.thread.join(timeout=2.0)
+        self.thread = None
+
+    def _writer(self):
+        while True:
+            self.wake.wait(self.config['flush_interval'])
+            while self.buffer:
+                self._flush(self._drain())
+            if self.closed:
+                return
+
+    def _drain(self) -> List[Dict]:
+        batch = []
+        buffer = self.buffer
+        epoch = self.epoch
+        for _ in range(min(len(buffer), self.config['batch_size'])):
+            stamp, kind, values = buffer.popleft()
+            record = {'ts': round(epoch + stamp, 3), 'event': kind}
+            record.update(zip(EVENT_FIELDS[kind], values))
+            batch.append(record)
+        self.written += len(batch)
+        return batch
+
+    def _flush(self, batch: List[Dict]):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.spool_path) and os.path.getsize(self.spool_path) > self.config['spool_max_bytes']:
+                os.replace(self.spool_path, self.spool_path + '.1')
+            with open(self.spool_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(record, separators=(',', ':')) + '\n' for record in batch)
+        except OSError:
+            self.spool_errors += 1
+        if self.sink is not None:
+            try:
+                self.sink.send(batch)
+            except Exception:
+                self.sink_errors += 1
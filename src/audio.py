@@ -0,0 +1,103 @@
+"""
+Audio - Background-loaded sound effects and streamed music
+Driven by AUDIO_CONFIG in src/config.py; every call is a no-op until
+its asset is ready, and a missing file or audio device just stays silent
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+from src.config import AUDIO_CONFIG
+
+ASSET_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class AudioManager:
+    """
+    Sound effects decoded into memory on a worker thread, music streamed
+
+    start() returns at once. The worker opens the mixer, starts the
+    background music (pygame.mixer.music decodes it in small chunks as it
+    plays, so it is never held whole in memory) and then decodes each
+    effect. An effect is published together with a channel reserved for
+    it, so play() is one dict lookup and a Channel.play: nothing is
+    allocated per call, and an effect that fires every turn cuts off its
+    own previous instance instead of piling up on free channels.
+    """
+
+    def __init__(self, config: dict = AUDIO_CONFIG, root: str = ASSET_ROOT):
+        self.config = config
+        self.root = root
+        self.enabled = config['enabled']
+        self.ready: Dict[str, Tuple[pygame.mixer.Channel, pygame.mixer.Sound]] = {}
+        self.music_playing = False
+        self.failed: Dict[str, str] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+
+    def start(self):
+        """Begin loading in the background; safe to call again"""
+        if not self.enabled or self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._load, name='audio-loader', daemon=True)
+        self.thread.start()
+
+    def _path(self, relative: str) -> str:
+        return os.path.join(self.root, relative)
+
+    def _load(self):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(buffer=512)
+            pygame.mixer.set_reserved(len(self.config['sound_effects']))
+        except pygame.error as e:
+            self.failed['mixer'] = str(e)
+            return
+
+        self._start_music()
+        volume = self.config['sfx_volume']
+        for channel_id, (name, relative) in enumerate(self.config['sound_effects'].items()):
+            if self.closed:
+                return
+            path = self._path(relative)
+            if not os.path.exists(path):
+                self.failed[name] = 'missing'
+                continue
+            try:
+                sound = pygame.mixer.Sound(path)
+                sound.set_volume(volume)
+                self.ready[name] = (pygame.mixer.Channel(channel_id), sound)
+            except pygame.error as e:
+                self.failed[name] = str(e)
+
+    def _start_music(self):
+        path = self._path(self.config['background_music'])
+        if not os.path.exists(path):
+            self.failed['music'] = 'missing'
+            return
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(self.config['music_volume'])
+            pygame.mixer.music.play(-1)
+            self.music_playing = True
+        except pygame.error as e:
+            self.failed['music'] = str(e)
+
+    def play(self, name: str):
+        """Play an effect if it has finished loading; never blocks"""
+        entry = self.ready.get(name)
+        if entry is not None:
+            entry[0].play(entry[1])
+
+    def close(self):
+        self.closed = True
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        if pygame.mixer.get_init():
+            pygame.mixer.music.stop()
+            pygame.mixer.quit()
+        self.ready.clear()
+        self.music_playing = False
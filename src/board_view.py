@@ -0,0 +1,246 @@
+"""
+Board View - Camera and chunked rasterization for boards of any size
+Only the chunks that intersect the viewport are rasterized and blitted,
+so frame time follows the screen size rather than the board size
+"""
+
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+import pygame
+
+from src.config import MEGA_LEVEL_CONFIG
+
+
+class Camera:
+    """
+    Viewport onto a board of width x height cells
+
+    x, y is the board pixel (at the current cell_size) shown at the
+    viewport's top-left corner. A board that fits the viewport is pinned
+    to the top-left and cannot be panned or zoomed, which is exactly the
+    fixed layout of standard levels.
+    """
+
+    def __init__(self, viewport: pygame.Rect, width: int, height: int, cell_size: int,
+                 min_cell_size: int = MEGA_LEVEL_CONFIG['min_cell_size'],
+                 max_cell_size: int = MEGA_LEVEL_CONFIG['max_cell_size']):
+        self.viewport = pygame.Rect(viewport)
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.movable = width * cell_size > self.viewport.width or height * cell_size > self.viewport.height
+        self.min_cell_size = min_cell_size if self.movable else cell_size
+        self.max_cell_size = max_cell_size if self.movable else cell_size
+        self.x = 0
+        self.y = 0
+
+    def clamp(self):
+        board_w = self.width * self.cell_size
+        board_h = self.height * self.cell_size
+        self.x = max(0, min(self.x, board_w - self.viewport.width))
+        self.y = max(0, min(self.y, board_h - self.viewport.height))
+
+    def pan(self, dx: int, dy: int) -> bool:
+        """Scroll by dx, dy screen pixels; returns True if the view moved"""
+        before = (self.x, self.y)
+        self.x += dx
+        self.y += dy
+        self.clamp()
+        return (self.x, self.y) != before
+
+    def zoom(self, cell_size: int, anchor: Tuple[int, int]) -> bool:
+        """Change the cell size, keeping the board point under anchor still"""
+        cell_size = max(self.min_cell_size, min(self.max_cell_size, cell_size))
+        if cell_size == self.cell_size:
+            return False
+        ax = anchor[0] - self.viewport.x
+        ay = anchor[1] - self.viewport.y
+        scale = cell_size / self.cell_size
+        self.x = round((self.x + ax) * scale - ax)
+        self.y = round((self.y + ay) * scale - ay)
+        self.cell_size = cell_size
+        self.clamp()
+        return True
+
+    def center_on(self, index: int):
+        y, x = divmod(index, self.width)
+        self.x = x * self.cell_size + self.cell_size // 2 - self.viewport.width // 2
+        self.y = y * self.cell_size + self.cell_size // 2 - self.viewport.height // 2
+        self.clamp()
+
+    def follow(self, index: int, margin: int = 2) -> bool:
+        """Recenter if the cell is within margin cells of leaving the view"""
+        rect = self.cell_rect(index).inflate(margin * 2 * self.cell_size, margin * 2 * self.cell_size)
+        if self.viewport.contains(rect) or not self.movable:
+            return False
+        self.center_on(index)
+        return True
+
+    def cell_at(self, screen_pos: Tuple[int, int]) -> Optional[int]:
+        """Index of the cell under a screen position, or None"""
+        if not self.viewport.collidepoint(screen_pos):
+            return None
+        x = (screen_pos[0] - self.viewport.x + self.x) // self.cell_size
+        y = (screen_pos[1] - self.viewport.y + self.y) // self.cell_size
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+
+    def cell_rect(self, index: int) -> pygame.Rect:
+        """Screen rectangle of a cell (possibly outside the viewport)"""
+        y, x = divmod(index, self.width)
+        return self.rect_at(x, y)
+
+    def rect_at(self, x: float, y: float) -> pygame.Rect:
+        """Screen rectangle of a cell-sized square at fractional cell x, y"""
+        size = self.cell_size
+        return pygame.Rect(round(self.viewport.x + x * size - self.x), round(self.viewport.y + y * size - self.y),
+                           size, size)
+
+    def visible_chunks(self, chunk_cells: int) -> Iterator[Tuple[int, int]]:
+        span = chunk_cells * self.cell_size
+        first_x = self.x // span
+        first_y = self.y // span
+        last_x = min((self.x + self.viewport.width - 1) // span, (self.width - 1) // chunk_cells)
+        last_y = min((self.y + self.viewport.height - 1) // span, (self.height - 1) // chunk_cells)
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                yield cx, cy
+
+
+class BoardView:
+    """
+    LRU cache of board chunks rasterized at the camera's cell size
+
+    paint_cell(surface, index, rect) draws one cell. A chunk is painted
+    the first time it becomes visible: with blank_tile(size) and
+    occupied(start, count) given, it starts as a copy of an all-blank
+    chunk and only the cells occupied() reports in each row span are
+    painted, since most of a big board is empty. invalidate() repaints a
+    single cell inside its chunk only if that chunk is cached.
+    Chunk surfaces are capped by total pixel count, and at most
+    builds_per_frame chunks are rasterized per draw(): the rest show as
+    background until a later frame, with `pending` set so the caller
+    keeps frames coming. While `frozen` (another thread is changing the
+    level) none are rasterized at all, so no chunk is cached from a
+    half-played turn; cached chunks are still drawn.
+    """
+
+    def __init__(self, camera: Camera, paint_cell: Callable[[pygame.Surface, int, pygame.Rect], None],
+                 background: Tuple[int, int, int],
+                 blank_tile: Optional[Callable[[int], pygame.Surface]] = None,
+                 occupied: Optional[Callable[[int, int], Iterable[int]]] = None,
+                 chunk_cells: int = MEGA_LEVEL_CONFIG['chunk_cells'],
+                 builds_per_frame: int = MEGA_LEVEL_CONFIG['chunk_builds_per_frame'],
+                 max_pixels: Optional[int] = None):
+        self.camera = camera
+        self.paint_cell = paint_cell
+        self.background = background
+        self.blank_tile = blank_tile
+        self.occupied = occupied
+        self.blank: Optional[pygame.Surface] = None
+        self.chunk_cells = chunk_cells
+        self.builds_per_frame = builds_per_frame
+        # Room for the visible chunks a few times over, whatever the zoom
+        self.max_pixels = max_pixels or 4 * camera.viewport.width * camera.viewport.height
+        self.chunks: 'OrderedDict[Tuple[int, int], pygame.Surface]' = OrderedDict()
+        self.pixels = 0
+        self.limit = self.max_pixels
+        self.cell_size = camera.cell_size
+        self.pending = False
+        self.frozen = False
+
+    def reset(self):
+        """Forget every chunk (new level, or a different cell size)"""
+        self.chunks.clear()
+        self.pixels = 0
+        if self.cell_size != self.camera.cell_size:
+            self.blank = None
+        self.cell_size = self.camera.cell_size
+
+    def _blank_chunk(self) -> pygame.Surface:
+        if self.blank is None:
+            n = self.chunk_cells
+            size = self.camera.cell_size
+            tile = self.blank_tile(size)
+            self.blank = pygame.Surface((n * size, n * size))
+            for row in range(n):
+                for col in range(n):
+                    self.blank.blit(tile, (col * size, row * size))
+        return self.blank
+
+    def _build(self, cx: int, cy: int) -> pygame.Surface:
+        camera = self.camera
+        n = self.chunk_cells
+        size = camera.cell_size
+        x0, y0 = cx * n, cy * n
+        cols = min(n, camera.width - x0)
+        rows = min(n, camera.height - y0)
+        surface = pygame.Surface((cols * size, rows * size))
+        if self.occupied is None:
+            surface.fill(self.background)
+            for row in range(rows):
+                base = (y0 + row) * camera.width + x0
+                for col in range(cols):
+                    self.paint_cell(surface, base + col, pygame.Rect(col * size, row * size, size, size))
+        else:
+            surface.blit(self._blank_chunk(), (0, 0))
+            for row in range(rows):
+                base = (y0 + row) * camera.width + x0
+                for index in self.occupied(base, cols):
+                    self.paint_cell(surface, index, pygame.Rect((index - base) * size, row * size, size, size))
+        self.chunks[cx, cy] = surface
+        self.pixels += surface.get_width() * surface.get_height()
+        while self.pixels > self.limit and len(self.chunks) > 1:
+            _, evicted = self.chunks.popitem(last=False)
+            self.pixels -= evicted.get_width() * evicted.get_height()
+        return surface
+
+    def invalidate(self, index: int) -> Optional[pygame.Rect]:
+        """Repaint one cell in its cached chunk; returns its visible screen rect"""
+        camera = self.camera
+        n = self.chunk_cells
+        y, x = divmod(index, camera.width)
+        surface = self.chunks.get((x // n, y // n))
+        if surface is not None and self.cell_size == camera.cell_size:
+            size = camera.cell_size
+            rect = pygame.Rect((x % n) * size, (y % n) * size, size, size)
+            surface.fill(self.background, rect)
+            self.paint_cell(surface, index, rect)
+        rect = camera.cell_rect(index).clip(camera.viewport)
+        return rect if rect.width and rect.height else None
+
+    def draw(self, screen: pygame.Surface, clip: Optional[pygame.Rect] = None):
+        """Blit the visible part of the board, limited to clip if given"""
+        camera = self.camera
+        if self.cell_size != camera.cell_size:
+            self.reset()
+        area = camera.viewport if clip is None else camera.viewport.clip(clip)
+        previous_clip = screen.get_clip()
+        screen.set_clip(area)
+        screen.fill(self.background, area)
+
+        span = self.chunk_cells * camera.cell_size
+        origin_x = camera.viewport.x - camera.x
+        origin_y = camera.viewport.y - camera.y
+        visible: List[Tuple[int, int]] = list(camera.visible_chunks(self.chunk_cells))
+        # Never evict a chunk this frame still needs, whatever the zoom
+        self.limit = max(self.max_pixels, (len(visible) + 1) * span * span)
+        builds = 0
+        self.pending = False
+        for cx, cy in visible:
+            top_left = (origin_x + cx * span, origin_y + cy * span)
+            if clip is not None and not area.colliderect(pygame.Rect(top_left, (span, span))):
+                continue
+            surface = self.chunks.get((cx, cy))
+            if surface is None:
+                if self.frozen or builds >= self.builds_per_frame:
+                    self.pending = True
+                    continue
+                builds += 1
+                surface = self._build(cx, cy)
+            else:
+                self.chunks.move_to_end((cx, cy))
+            screen.blit(surface, top_left)
+        screen.set_clip(previous_clip)
@@ -33,6 +33,11 @@ COLORS = {
 }
 
 # Level Configuration
+# Tiers get harder through fewer pots and obstacles, a tighter talisman
+# budget and the ghosts themselves. 'ghost_ai_depth' is the lookahead of
+# a lone ghost (1 = greedy); it does not apply with several ghosts, which
+# always move greedily as one batch, so the hard tier's difficulty comes
+# from its 'ghost_count' instead.
 LEVEL_CONFIG = {
     'easy': {
         'range': (1, 20),
@@ -42,6 +47,8 @@ LEVEL_CONFIG = {
         'max_obstacles': 8,
         'base_talismans': 20,
         'talisman_per_level': 2,
+        'ghost_ai_depth': 1,
+        'ghost_count': 1,
     },
     'medium': {
         'range': (21, 60),
@@ -51,6 +58,8 @@ LEVEL_CONFIG = {
         'max_obstacles': 5,
         'base_talismans': 25,
         'talisman_per_level': 1.5,
+        'ghost_ai_depth': 2,
+        'ghost_count': 1,
     },
     'hard': {
         'range': (61, 99),
@@ -60,6 +69,8 @@ LEVEL_CONFIG = {
         'max_obstacles': 2,
         'base_talismans': 30,
         'talisman_per_level': 1.2,
+        'ghost_ai_depth': 1,
+        'ghost_count': 2,
     },
 }
 
@@ -73,6 +84,21 @@ ADMOB_CONFIG = {
     'show_rewarded_on_failure': True,
     'rewarded_undo_moves': 3,
     'rewarded_skip_after_failures': 3,
+    'ad_load_timeout': 10.0,  # seconds before a load is abandoned
+    'ad_retry_backoff': 2.0,  # first retry delay, doubled after each failure ...
+    'ad_max_retry_backoff': 120.0,  # ... up to this
+    'ad_max_age': 3600.0,  # loaded ads are replaced after an hour
+}
+
+# Mega levels: boards far larger than the screen, viewed through a camera
+MEGA_LEVEL_CONFIG = {
+    'width': 256,
+    'height': 256,
+    'min_cell_size': 8,  # pixels per cell, fully zoomed out
+    'max_cell_size': 64,
+    'chunk_cells': 16,  # board is rasterized in chunks of this many cells square
+    'chunk_builds_per_frame': 8,  # the rest are drawn on following frames
+    'ghost_count': 24,  # the talisman budget grows with it
 }
 
 # Audio Configuration
@@ -109,6 +135,11 @@ ANALYTICS_CONFIG = {
     'track_ads_shown': True,
     'track_game_duration': True,
     'track_device_info': True,
+    'buffer_size': 4096,  # events held in memory; the oldest are dropped past this
+    'batch_size': 256,
+    'flush_interval': 5.0,  # seconds between background writes
+    'spool_max_bytes': 1_000_000,  # analytics.jsonl is rotated to .1 past this
+    'sink_url': None,  # e.g. 'http://127.0.0.1:8765/events' for tools/analytics_server.py
 }
 
 # Difficulty Multipliers
@@ -125,7 +156,8 @@ GHOST_AI_CONFIG = {
     'pot_avoidance_weight': 2.0,
     'edge_attraction_weight': 1.0,
     'obstacle_awareness': True,
-    'pathfinding_depth': 3,
+    'pathfinding_depth': 3,  # cap on LEVEL_CONFIG 'ghost_ai_depth'
+    'node_budget': 2000,  # search nodes per ghost move, before falling back to a shallower search
 }
 
 # Performance Configuration
@@ -134,6 +166,9 @@ PERFORMANCE_CONFIG = {
     'max_fps': 60,
     'enable_particle_effects': True,
     'enable_animations': True,
+    'update_hz': 120,  # fixed simulation step, independent of the frame rate
+    'max_update_lag': 0.25,  # seconds of simulation caught up at most per frame
+    'ghost_move_seconds': 0.15,
     'cache_level_data': True,
 }
 
@@ -144,6 +179,7 @@ DEBUG_CONFIG = {
     'show_ghost_ai_debug': False,
     'show_fps': False,
     'show_memory_usage': False,
+    'show_startup_timing': False,
 }
 
 # Localization
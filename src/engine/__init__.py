@@ -0,0 +1,53 @@
+"""
+Ghost Catching Game - Simulation Engine
+Pure-Python game rules with no pygame dependency, so turns can be
+simulated headless (CI, analysis scripts, solvers)
+"""
+
+from src.engine.grid import CellType, Position, GameGrid
+from src.engine.bitboard import Bitboard, bit_indices, iter_bits, popcount
+from src.engine.ghost import Ghost
+from src.engine.level import Level, level_seed
+from src.engine.lookahead import LookaheadAI
+from src.engine.rules import Outcome, TurnResult, evaluate, level_score, step
+from src.engine.journal import Journal, TurnDelta
+from src.engine.replay import (
+    Replay, ReplayError, ReplayPlayer, ReplayResult, replay_headless, replay_many,
+)
+from src.engine.swarm import MoveTable
+from src.engine.solver import Solver, SolveResult, SolveStatus, solve
+from src.engine.win_search import WinSearch, find_win
+
+__all__ = [
+    'CellType',
+    'Position',
+    'GameGrid',
+    'Bitboard',
+    'bit_indices',
+    'iter_bits',
+    'popcount',
+    'Ghost',
+    'Level',
+    'level_seed',
+    'LookaheadAI',
+    'Outcome',
+    'TurnResult',
+    'evaluate',
+    'level_score',
+    'step',
+    'Journal',
+    'TurnDelta',
+    'Replay',
+    'ReplayError',
+    'ReplayPlayer',
+    'ReplayResult',
+    'replay_headless',
+    'replay_many',
+    'MoveTable',
+    'Solver',
+    'SolveResult',
+    'SolveStatus',
+    'solve',
+    'WinSearch',
+    'find_win',
+]
@@ -0,0 +1,155 @@
+"""
+Bitboard board representation
+
+Each cell is one bit of a Python int (bit y * width + x, the same order
+as GameGrid.cells), so a 20x22 board fits in a single 440-bit integer.
+Neighbourhoods are shifts and masks, flood fills are repeated dilation,
+and a set of cells is its own hash key.
+"""
+
+from functools import lru_cache
+from typing import Iterator, List
+
+from src.engine.grid import CellType, GameGrid, Position
+
+
+class Bitboard:
+    """Board geometry: masks and shift helpers for one width x height"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.full = (1 << self.size) - 1
+
+        row = (1 << width) - 1
+        rows = 0
+        for y in range(height):
+            rows |= row << (y * width)
+        left_column = 0
+        for y in range(height):
+            left_column |= 1 << (y * width)
+        right_column = left_column << (width - 1)
+        self.not_left = rows & ~left_column
+        self.not_right = rows & ~right_column
+        self.window = (1 << (2 * width + 1)) - 1  # a cell's row and the rows either side
+
+    def bit(self, pos: Position) -> int:
+        return 1 << (pos.y * self.width + pos.x)
+
+    def position(self, index: int) -> Position:
+        return Position(index % self.width, index // self.width)
+
+    # Single-direction shifts, in the ghost's move order
+
+    def down(self, mask: int) -> int:
+        return (mask << self.width) & self.full
+
+    def up(self, mask: int) -> int:
+        return mask >> self.width
+
+    def right(self, mask: int) -> int:
+        return (mask << 1) & self.not_left
+
+    def left(self, mask: int) -> int:
+        return (mask >> 1) & self.not_right
+
+    def neighbours(self, mask: int) -> int:
+        """Every cell orthogonally adjacent to a cell in mask"""
+        width = self.width
+        return (
+            ((mask << width) & self.full) | (mask >> width) |
+            ((mask << 1) & self.not_left) | ((mask >> 1) & self.not_right)
+        )
+
+    def moves(self, index: int, blocked: int) -> List[int]:
+        """Open neighbours of one cell as indices, in the ghost's move order"""
+        width = self.width
+        x = index % width
+        # One shift cuts the rows above and below out of blocked; testing
+        # four bits of the full mask would copy the whole int four times,
+        # which is what turn time on mega boards is made of
+        base = index - width if index >= width else 0
+        near = (blocked >> base) & self.window
+        i = index - base
+        result = []
+        if index + width < self.size and not near >> (i + width) & 1:
+            result.append(index + width)
+        if index >= width and not near & 1:
+            result.append(index - width)
+        if x < width - 1 and not near >> (i + 1) & 1:
+            result.append(index + 1)
+        if x > 0 and not near >> (i - 1) & 1:
+            result.append(index - 1)
+        return result
+
+    def flood_fill(self, seed: int, blocked: int) -> int:
+        """All cells reachable from seed without crossing blocked cells"""
+        open_cells = self.full & ~blocked
+        region = seed & open_cells
+        while True:
+            grown = (region | self.neighbours(region)) & open_cells
+            if grown == region:
+                return region
+            region = grown
+
+    def distance_layers(self, seed: int, blocked: int) -> Iterator[int]:
+        """Yield the BFS frontier at distance 0, 1, 2, ... from seed"""
+        open_cells = self.full & ~blocked
+        frontier = seed & open_cells
+        seen = frontier
+        while frontier:
+            yield frontier
+            frontier = self.neighbours(frontier) & open_cells & ~seen
+            seen |= frontier
+
+    def from_grid(self, grid: GameGrid, *cell_types: CellType) -> int:
+        """Mask of every cell in grid holding one of cell_types"""
+        # One translate to '0'/'1' digits and one base-2 parse, both
+        # linear, instead of OR-ing in each bit (quadratic on big boards)
+        table = bytearray(b'0' * 256)
+        for cell_type in cell_types:
+            table[cell_type] = ord('1')
+        digits = grid.cells.translate(table)
+        digits.reverse()
+        return int(digits, 2) if digits else 0
+
+    def to_grid(self, grid: GameGrid, mask: int, cell_type: CellType):
+        """Write cell_type into grid at every cell set in mask"""
+        for index in iter_bits(mask):
+            grid.cells[index] = cell_type
+
+
+@lru_cache(maxsize=8)
+def geometry(width: int, height: int) -> Bitboard:
+    """Shared Bitboard for a board size (its masks are read-only)"""
+    return Bitboard(width, height)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Indices of the set bits of mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def bit_indices(mask: int) -> List[int]:
+    """
+    Indices of the set bits of mask, lowest first, in one linear pass
+
+    iter_bits clears one bit per step, which copies the whole int each
+    time; this reads the binary digits once instead, so it is the one to
+    use on wide masks of large boards.
+    """
+    digits = bin(mask)[:1:-1]
+    found = []
+    i = digits.find('1')
+    while i != -1:
+        found.append(i)
+        i = digits.find('1', i + 1)
+    return found
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count('1')
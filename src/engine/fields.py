@@ -0,0 +1,155 @@
+"""
+Per-level distance fields used to score ghost moves by table lookup
+"""
+
+import heapq
+from collections import deque
+from functools import lru_cache
+from typing import List, Tuple
+
+from src.config import GHOST_AI_CONFIG
+from src.engine.bitboard import Bitboard, bit_indices, geometry
+from src.engine.grid import BLOCKED_TABLE, CellType, GameGrid
+
+UNREACHABLE = -1
+
+
+def _layered(board: Bitboard, sources: int, blocked: int, default: int) -> List[int]:
+    dist = [default] * board.size
+    for distance, layer in enumerate(board.distance_layers(sources, blocked)):
+        for index in bit_indices(layer):
+            dist[index] = distance
+    return dist
+
+
+@lru_cache(maxsize=8)
+def edge_distances(width: int, height: int) -> List[int]:
+    """Per-cell distance to the nearest board edge (shared, read-only)"""
+    return [
+        min(x, y, width - 1 - x, height - 1 - y)
+        for y in range(height) for x in range(width)
+    ]
+
+
+@lru_cache(maxsize=128)
+def pot_tables(width: int, height: int, pots: int) -> Tuple[List[int], List[float]]:
+    """
+    Per-cell Manhattan distance to the nearest pot and static move score
+    for one pot layout (shared, read-only)
+    """
+    # Multi-source BFS on an open board is exactly Manhattan distance
+    manhattan = _layered(geometry(width, height), pots, 0, 0)
+    pot_weight = GHOST_AI_CONFIG['pot_avoidance_weight']
+    edge_weight = GHOST_AI_CONFIG['edge_attraction_weight']
+    score = [
+        pot * pot_weight - edge * edge_weight
+        for pot, edge in zip(manhattan, edge_distances(width, height))
+    ]
+    return manhattan, score
+
+
+@lru_cache(maxsize=128)
+def _walking(width: int, height: int, pots: int, blocked: int) -> List[int]:
+    return _layered(geometry(width, height), pots, blocked, UNREACHABLE)
+
+
+class DistanceFields:
+    """
+    Flat per-cell tables, indexed like GameGrid.cells
+    
+    pot_manhattan, score and edge depend only on where the pots are, so
+    they are shared by every level with that layout, like the starting
+    pot_path of a layout; restarts, replays and solver runs rebuild the
+    same boards over and over. pot_path is the true walking distance to
+    the nearest pot around blocked cells; block() repairs this level's
+    copy in place when a talisman lands instead of re-running the whole
+    BFS.
+    """
+    
+    def __init__(self, grid: GameGrid, pot_indices: List[int]):
+        self.grid = grid
+        self.pot_indices = list(pot_indices)
+        board = geometry(grid.width, grid.height)
+        
+        self.edge = edge_distances(grid.width, grid.height)
+        
+        pots = 0
+        for index in self.pot_indices:
+            pots |= 1 << index
+        self.pots = pots
+        self.pot_manhattan, self.score = pot_tables(grid.width, grid.height, pots)
+        
+        blocked = board.from_grid(grid, CellType.TALISMAN, CellType.OBSTACLE)
+        self.pot_path = list(_walking(grid.width, grid.height, pots, blocked))
+    
+    def reset_path(self, blocked: int):
+        """Recompute pot_path in place for an arbitrary blocked bitboard"""
+        board = geometry(self.grid.width, self.grid.height)
+        self.pot_path[:] = _layered(board, self.pots, blocked, UNREACHABLE)
+    
+    def block(self, index: int) -> List[Tuple[int, int]]:
+        """
+        Update pot_path after the cell at index became impassable
+        
+        Returns (cell, previous distance) for every entry that may have
+        changed, so the update can be reverted with swap().
+        """
+        grid = self.grid
+        cells = grid.cells
+        dist = self.pot_path
+        old = dist[index]
+        if old == UNREACHABLE:
+            return []
+        dist[index] = UNREACHABLE
+        
+        # Collect cells that lost every neighbour one step closer to a pot.
+        # Candidates are visited in increasing old distance, so a cell's
+        # possible supporters have already been classified.
+        old_dist = {index: old}
+        queue = deque(n for n in grid.neighbours(index) if dist[n] == old + 1)
+        while queue:
+            cell = queue.popleft()
+            d = dist[cell]
+            if cell in old_dist or d == UNREACHABLE:
+                continue
+            if any(dist[n] == d - 1 for n in grid.neighbours(cell)):
+                continue
+            old_dist[cell] = d
+            dist[cell] = UNREACHABLE
+            queue.extend(n for n in grid.neighbours(cell) if dist[n] == d + 1)
+        
+        changes = list(old_dist.items())
+        del old_dist[index]
+        if not old_dist:
+            return changes
+        
+        # Re-seed the orphaned region from its still-valid border
+        heap = []
+        for cell in old_dist:
+            best = UNREACHABLE
+            for n in grid.neighbours(cell):
+                if dist[n] != UNREACHABLE and (best == UNREACHABLE or dist[n] < best):
+                    best = dist[n]
+            if best != UNREACHABLE:
+                heap.append((best + 1, cell))
+        heapq.heapify(heap)
+        
+        while heap:
+            d, cell = heapq.heappop(heap)
+            if dist[cell] != UNREACHABLE and dist[cell] <= d:
+                continue
+            dist[cell] = d
+            for n in grid.neighbours(cell):
+                if n in old_dist and not BLOCKED_TABLE[cells[n]]:
+                    if dist[n] == UNREACHABLE or dist[n] > d + 1:
+                        heapq.heappush(heap, (d + 1, n))
+        return changes
+    
+    def swap(self, changes: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Write (cell, distance) pairs into pot_path; returns the values they replaced"""
+        dist = self.pot_path
+        replaced = []
+        for cell, value in changes:
+            replaced.append((cell, dist[cell]))
+            dist[cell] = value
+        return replaced
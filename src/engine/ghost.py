@@ -0,0 +1,47 @@
+"""
+Ghost entity and its movement policy
+"""
+
+from typing import List
+
+from src.engine.bitboard import Bitboard
+from src.engine.fields import DistanceFields
+from src.engine.grid import Position
+
+
+class Ghost:
+    def __init__(self, start_pos: Position):
+        self.pos = start_pos
+        self.start_pos = start_pos
+        self.animation_progress = 0.0
+        self.prev_pos = start_pos
+    
+    def reset(self):
+        self.pos = self.start_pos
+        self.prev_pos = self.start_pos
+        self.animation_progress = 0.0
+    
+    def get_valid_moves(self, board: Bitboard, blocked: int) -> List[Position]:
+        """Get all valid adjacent positions the ghost can move to"""
+        index = self.pos.y * board.width + self.pos.x
+        return [board.position(move) for move in board.moves(index, blocked)]
+    
+    def move_ai(self, board: Bitboard, blocked: int, fields: DistanceFields):
+        """AI logic: Ghost tries to escape from pots and reach the edge"""
+        score = fields.score
+        best_index = -1
+        best_score = float('-inf')
+        
+        for index in board.moves(self.pos.y * board.width + self.pos.x, blocked):
+            if score[index] > best_score:
+                best_score = score[index]
+                best_index = index
+        
+        if best_index != -1:
+            self.move_to(board.position(best_index))
+    
+    def move_to(self, pos: Position):
+        """Step to pos, keeping where the ghost came from for animation"""
+        self.prev_pos = self.pos
+        self.pos = pos
+        self.animation_progress = 0.0
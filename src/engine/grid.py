@@ -0,0 +1,138 @@
+"""
+Grid primitives shared by the engine and the renderer
+"""
+
+from enum import IntEnum
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+
+
+class CellType(IntEnum):
+    EMPTY = 0
+    TALISMAN = 1
+    OBSTACLE = 2
+    POT = 3
+    GHOST = 4
+
+
+# Cell codes indexed by byte value, so lookups skip the Enum constructor
+_CELL_TYPES = tuple(CellType)
+
+# Boards up to this many cells share a precomputed neighbour table; on
+# mega boards the table would cost more memory than the board itself, so
+# neighbours are worked out per call instead
+NEIGHBOUR_TABLE_LIMIT = 1 << 14
+
+# 256-entry translation tables (byte code -> 0/1) for bulk masks
+BLOCKED_TABLE = bytes(
+    1 if code in (CellType.TALISMAN, CellType.OBSTACLE) else 0 for code in range(256)
+)
+
+
+@dataclass
+class Position:
+    x: int
+    y: int
+    
+    def __eq__(self, other):
+        return self.x == other.x and self.y == other.y
+    
+    def __hash__(self):
+        return hash((self.x, self.y))
+    
+    def distance_to(self, other: 'Position') -> int:
+        return abs(self.x - other.x) + abs(self.y - other.y)
+
+
+class GameGrid:
+    """
+    Board stored as a flat bytearray of CellType codes, row-major
+    
+    Cell (x, y) lives at index y * width + x. The byte buffer is reused
+    across resets, and whole-board questions ("which cells are blocked?")
+    are answered with a single bytes.translate instead of a Python loop.
+    """
+    
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.cells = bytearray(self.size)
+        self._blank = bytes(self.size)
+        self._neighbours = neighbour_table(width, height) if self.size <= NEIGHBOUR_TABLE_LIMIT else None
+    
+    def index(self, pos: Position) -> int:
+        return pos.y * self.width + pos.x
+    
+    def position(self, index: int) -> Position:
+        return Position(index % self.width, index // self.width)
+    
+    def in_bounds(self, pos: Position) -> bool:
+        return 0 <= pos.x < self.width and 0 <= pos.y < self.height
+    
+    def set_cell(self, pos: Position, cell_type: CellType):
+        if 0 <= pos.y < self.height and 0 <= pos.x < self.width:
+            self.cells[pos.y * self.width + pos.x] = cell_type
+    
+    def get_cell(self, pos: Position) -> CellType:
+        if 0 <= pos.y < self.height and 0 <= pos.x < self.width:
+            return _CELL_TYPES[self.cells[pos.y * self.width + pos.x]]
+        return CellType.EMPTY
+    
+    def reset(self):
+        self.cells[:] = self._blank
+    
+    def is_valid_placement(self, pos: Position) -> bool:
+        if not (0 <= pos.x < self.width and 0 <= pos.y < self.height):
+            return False
+        return self.cells[pos.y * self.width + pos.x] == CellType.EMPTY
+    
+    def blocked_mask(self) -> bytes:
+        """One byte per cell: 1 where the ghost cannot enter"""
+        return self.cells.translate(BLOCKED_TABLE)
+    
+    def mask(self, *cell_types: CellType) -> bytes:
+        """One byte per cell: 1 where the cell is any of cell_types"""
+        table = bytearray(256)
+        for cell_type in cell_types:
+            table[cell_type] = 1
+        return self.cells.translate(table)
+    
+    def indices_of(self, cell_type: CellType) -> List[int]:
+        """Flat indices of every cell holding cell_type"""
+        cells = self.cells
+        code = bytes((cell_type,))
+        found = []
+        i = cells.find(code)
+        while i != -1:
+            found.append(i)
+            i = cells.find(code, i + 1)
+        return found
+    
+    def neighbours(self, index: int) -> List[int]:
+        """In-bounds orthogonal neighbours in the ghost's move order"""
+        if self._neighbours is not None:
+            return self._neighbours[index]
+        return _neighbours_of(index, self.width, self.size)
+
+
+@lru_cache(maxsize=8)
+def neighbour_table(width: int, height: int) -> tuple:
+    """Per-cell neighbour index lists for a board size, shared by all grids"""
+    size = width * height
+    return tuple(_neighbours_of(index, width, size) for index in range(size))
+
+
+def _neighbours_of(index: int, width: int, size: int) -> tuple:
+    x = index % width
+    result = []
+    if index + width < size:
+        result.append(index + width)
+    if index >= width:
+        result.append(index - width)
+    if x + 1 < width:
+        result.append(index + 1)
+    if x > 0:
+        result.append(index - 1)
+    return tuple(result)
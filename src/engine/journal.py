@@ -0,0 +1,105 @@
+"""
+Move journal: reversible turn deltas for undo and redo
+
+Each accepted turn is stored as the few facts it changed (one cell, one
+bit, the ghosts' before/after squares and the pot_path entries the
+placement overwrote), never as a copy of the board. Undo and redo just
+write those facts back, so their cost does not depend on board size or
+on how deep the history is, only on how many ghosts the level has.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from src.engine.grid import CellType, Position
+from src.engine.level import Level
+from src.engine.rules import TurnResult, evaluate, step
+
+
+@dataclass
+class TurnDelta:
+    index: int
+    ghosts_before: List[Tuple[Position, Position]]
+    ghosts_after: List[Tuple[Position, Position]]
+    mask_before: int
+    mask_after: int
+    field_changes: List[Tuple[int, int]]
+
+
+def _ghost_state(level: Level) -> List[Tuple[Position, Position]]:
+    return [(ghost.pos, ghost.prev_pos) for ghost in level.ghosts]
+
+
+def _restore_ghosts(level: Level, ghosts: List[Tuple[Position, Position]], mask: int):
+    for ghost, (pos, prev_pos) in zip(level.ghosts, ghosts):
+        ghost.pos = pos
+        ghost.prev_pos = prev_pos
+        ghost.animation_progress = 0.0
+    level.ghost_mask = mask
+
+
+class Journal:
+    """
+    Do/undo/redo for one Level
+
+    play() resolves a turn with rules.step and records its delta; a new
+    turn discards the redo history. The journal must see every turn
+    played on the level for undo to be exact.
+    """
+
+    def __init__(self, level: Level):
+        self.level = level
+        self.undo_stack: List[TurnDelta] = []
+        self.redo_stack: List[TurnDelta] = []
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def play(self, pos: Position) -> TurnResult:
+        level = self.level
+        before = _ghost_state(level)
+        mask_before = level.ghost_mask
+        result = step(level, pos)
+        if result.placed:
+            self.undo_stack.append(TurnDelta(
+                level.grid.index(pos), before, _ghost_state(level), mask_before, level.ghost_mask,
+                level.field_changes
+            ))
+            self.redo_stack.clear()
+        return result
+
+    def undo(self) -> Optional[TurnDelta]:
+        """Take back the last turn; returns its delta, or None if there is none"""
+        if not self.undo_stack:
+            return None
+        delta = self.undo_stack.pop()
+        level = self.level
+        level.grid.cells[delta.index] = CellType.EMPTY
+        level.blocked &= ~(1 << delta.index)
+        level.talisman_count -= 1
+        delta.field_changes = level.fields.swap(delta.field_changes)
+        _restore_ghosts(level, delta.ghosts_before, delta.mask_before)
+        self.redo_stack.append(delta)
+        return delta
+
+    def redo(self) -> Optional[TurnResult]:
+        """Replay the last undone turn without re-running the ghost AI"""
+        if not self.redo_stack:
+            return None
+        delta = self.redo_stack.pop()
+        level = self.level
+        level.grid.cells[delta.index] = CellType.TALISMAN
+        level.blocked |= 1 << delta.index
+        level.talisman_count += 1
+        delta.field_changes = level.fields.swap(delta.field_changes)
+        _restore_ghosts(level, delta.ghosts_after, delta.mask_after)
+        self.undo_stack.append(delta)
+        moves = [
+            (before[0], after[0])
+            for before, after in zip(delta.ghosts_before, delta.ghosts_after)
+            if before[0] != after[0]
+        ]
+        return TurnResult(True, evaluate(level), delta.ghosts_before[0][0], delta.ghosts_after[0][0], moves)
@@ -0,0 +1,165 @@
+"""
+Level layout and difficulty progression
+"""
+
+import hashlib
+import random
+from typing import List, Optional
+
+from src.config import GHOST_AI_CONFIG, GRID_COLS, GRID_ROWS, get_level_config
+from src.engine.bitboard import Bitboard
+from src.engine.fields import DistanceFields
+from src.engine.grid import CellType, Position, GameGrid
+from src.engine.ghost import Ghost
+from src.engine.lookahead import LookaheadAI
+from src.engine.swarm import move_table
+
+
+def level_seed(level_num: int, user_seed: Optional[int] = None) -> int:
+    """
+    Stable 64-bit seed for a level
+    
+    The same (level_num, user_seed) pair always yields the same seed on
+    every platform and Python version, so levels can be cached, shared
+    and regenerated. Pass a user or daily seed to get a different board
+    set for the same level numbers.
+    """
+    key = f"{level_num}:{'' if user_seed is None else user_seed}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'big')
+
+
+class Level:
+    def __init__(self, level_num: int, width: int = GRID_COLS, height: int = GRID_ROWS,
+                 seed: Optional[int] = None, ghost_count: Optional[int] = None):
+        self.level_num = level_num
+        self.seed = level_seed(level_num) if seed is None else seed
+        self.ghost_count = get_level_config(level_num)['ghost_count'] if ghost_count is None else ghost_count
+        self.width = width
+        self.height = height
+        self.grid = GameGrid(width, height)
+        self.board = Bitboard(width, height)
+        self.blocked = 0
+        self.pot_mask = 0
+        self.ghosts: List[Ghost] = []
+        self.ghost_mask = 0  # ghosts still loose (not yet in a pot)
+        self.move_table = None
+        self.pots: List[Position] = []
+        self.obstacles: List[Position] = []
+        self.talisman_count = 0
+        self.max_talismans = 0
+        self.fields = None
+        self.ai = None
+        self.field_changes = []  # pot_path entries the last placement overwrote
+        self.generate_level()
+    
+    def generate_level(self):
+        """Generate level based on difficulty"""
+        self.grid.reset()
+        self.obstacles.clear()
+        self.pots.clear()
+        
+        if self.level_num <= 20:
+            num_pots = max(3, 5 - (self.level_num // 5))
+            num_obstacles = 8 - (self.level_num // 3)
+            self.max_talismans = 20 + (self.level_num * 2)
+        elif self.level_num <= 60:
+            num_pots = max(2, 4 - ((self.level_num - 20) // 10))
+            num_obstacles = 5 - ((self.level_num - 20) // 15)
+            self.max_talismans = 25 + ((self.level_num - 20) * 1.5)
+        else:
+            num_pots = 1
+            num_obstacles = 2 - ((self.level_num - 60) // 20)
+            self.max_talismans = 30 + ((self.level_num - 60) * 1.2)
+        
+        # Mega boards keep the standard board's pot and obstacle density,
+        # so distances stay comparable, and its talisman budget per ghost
+        scale = self.grid.size / (GRID_COLS * GRID_ROWS)
+        if scale > 1:
+            num_pots = round(num_pots * scale)
+            num_obstacles = round(num_obstacles * scale)
+            self.max_talismans *= max(1, self.ghost_count / get_level_config(self.level_num)['ghost_count'])
+        
+        # Sample distinct flat indices without replacement: pots anywhere,
+        # obstacles off the border, then the ghost on any cell left over
+        rng = random.Random(self.seed)
+        width = self.width
+        
+        # Tiny boards get what fits, keeping a cell free for a ghost
+        pot_indices = rng.sample(range(self.grid.size), max(0, min(num_pots, self.grid.size - 1)))
+        taken = set(pot_indices)
+        
+        interior = [
+            y * width + x
+            for y in range(1, self.height - 1)
+            for x in range(1, width - 1)
+            if y * width + x not in taken
+        ]
+        room = min(len(interior), self.grid.size - len(pot_indices) - 1)
+        obstacle_indices = rng.sample(interior, max(0, min(num_obstacles, room)))
+        taken.update(obstacle_indices)
+        
+        free = [index for index in range(self.grid.size) if index not in taken]
+        if self.ghost_count == 1:
+            ghost_indices = [free[rng.randrange(len(free))]]
+        else:
+            ghost_indices = rng.sample(free, min(self.ghost_count, len(free)))
+        
+        for index in pot_indices:
+            pos = self.grid.position(index)
+            self.pots.append(pos)
+            self.grid.set_cell(pos, CellType.POT)
+        
+        for index in obstacle_indices:
+            pos = self.grid.position(index)
+            self.obstacles.append(pos)
+            self.grid.set_cell(pos, CellType.OBSTACLE)
+        
+        self.ghosts = []
+        self.ghost_mask = 0
+        for index in ghost_indices:
+            ghost_pos = self.grid.position(index)
+            self.ghosts.append(Ghost(ghost_pos))
+            self.grid.set_cell(ghost_pos, CellType.GHOST)
+            self.ghost_mask |= 1 << index
+        
+        self.blocked = self.board.from_grid(self.grid, CellType.TALISMAN, CellType.OBSTACLE)
+        self.pot_mask = self.board.from_grid(self.grid, CellType.POT)
+        self.fields = DistanceFields(self.grid, [self.grid.index(pot) for pot in self.pots])
+        self.talisman_count = 0
+        
+        # Easy levels keep the greedy ghost; later tiers think ahead. With
+        # several ghosts they all move greedily, as one batch
+        self.ai = None
+        self.move_table = None
+        depth = min(get_level_config(self.level_num)['ghost_ai_depth'], GHOST_AI_CONFIG['pathfinding_depth'])
+        if len(self.ghosts) > 1:
+            self.move_table = move_table(self.width, self.height, self.pot_mask)
+        elif depth > 1:
+            placeable = self.board.from_grid(self.grid, CellType.EMPTY)
+            self.ai = LookaheadAI(self.board, self.fields, self.pot_mask, placeable, depth)
+    
+    @property
+    def ghost(self) -> Ghost:
+        """The first ghost; the only one on single-ghost levels"""
+        return self.ghosts[0]
+    
+    def state_key(self) -> tuple:
+        """Hashable position key: ghost cell(s) plus the blocked-cell bitboard"""
+        if len(self.ghosts) == 1:
+            return (self.ghost.pos.y * self.width + self.ghost.pos.x, self.blocked)
+        return (tuple(ghost.pos.y * self.width + ghost.pos.x for ghost in self.ghosts), self.blocked)
+    
+    def layout_bytes(self) -> bytes:
+        """Snapshot of the board cells, for caching and verifying levels"""
+        return bytes(self.grid.cells)
+    
+    def place_talisman(self, pos: Position) -> bool:
+        """Place a talisman if the cell is free; returns True if placed"""
+        if not self.grid.is_valid_placement(pos):
+            return False
+        index = self.grid.index(pos)
+        self.grid.set_cell(pos, CellType.TALISMAN)
+        self.blocked |= 1 << index
+        self.field_changes = self.fields.block(index)
+        self.talisman_count += 1
+        return True
@@ -0,0 +1,234 @@
+"""
+Lookahead ghost AI: depth-limited search against an adversarial player
+
+The greedy policy in Ghost.move_ai only looks at the next square. This
+one plays out several ghost moves, assuming that after each of them the
+player puts a talisman on whichever open neighbour hurts the ghost most
+(or somewhere irrelevant, if that is worse for the ghost). A talisman
+anywhere else cannot change the ghost's next options, so the player has
+at most five replies per ply and depth 3 stays in the low thousands of
+nodes.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from src.config import GHOST_AI_CONFIG
+from src.engine.bitboard import Bitboard
+from src.engine.fields import UNREACHABLE, DistanceFields
+
+CAUGHT = -1e9
+ESCAPED = 1e9
+MOBILITY_WEIGHT = 0.5  # per open neighbour, so the ghost shies away from dead ends
+DECISION_LIMIT = 200000
+
+_EXACT = 0
+_LOWER = 1
+_UPPER = 2
+
+
+class _OutOfNodes(Exception):
+    pass
+
+
+class LookaheadAI:
+    """
+    Iterative-deepening alpha-beta over ghost moves and player replies
+
+    Ghost moves are tried best static score first and replies that take
+    away the ghost's best square first, which is what makes the cut-offs
+    bite. Root moves are searched with a full window so ties still go to
+    the earlier move in the greedy policy's order.
+    The move must be a pure function of the position, or replays, resumed
+    sessions and the level pack's verified solutions stop matching what
+    the player saw. So each choose() call gets a fixed node_budget rather
+    than a time budget: if it runs out, the ghost plays the move from the
+    deepest search that finished (the greedy move if not even depth 1
+    did), on every device alike. The transposition table is cleared per
+    call, since leaf values use the walking distances of that call's
+    root. The chosen moves themselves are memoized on (ghost cell,
+    blocked bitboard, turn budget), which undo, redo and replays of the
+    same level hit.
+    """
+
+    def __init__(self, board: Bitboard, fields: DistanceFields, pot_mask: int, placeable: int,
+                 depth: int, node_budget: int = GHOST_AI_CONFIG['node_budget']):
+        self.board = board
+        self.score = fields.score
+        self.pot_path = fields.pot_path
+        self.pot_manhattan = fields.pot_manhattan
+        self.pot_mask = pot_mask
+        self.placeable = placeable
+        self.depth = depth
+        self.node_budget = node_budget
+        self.use_path = GHOST_AI_CONFIG['obstacle_awareness']
+        self.pot_weight = GHOST_AI_CONFIG['pot_avoidance_weight']
+        self.table: Dict[tuple, Tuple[float, int]] = {}
+        # Per blocked bitboard: each cell's ordered moves and leaf value
+        self.memo: Dict[int, Tuple[Dict[int, List[int]], Dict[int, float]]] = {}
+        self.decisions: Dict[Tuple[int, int, int], Optional[int]] = {}
+        self.nodes = 0
+        self.node_limit = 0
+        self.fallbacks = 0
+        self.completed_depth = 0
+
+    def greedy(self, ghost: int, blocked: int) -> Optional[int]:
+        """The one-step policy of Ghost.move_ai, by cell index"""
+        score = self.score
+        best = None
+        best_score = float('-inf')
+        for move in self.board.moves(ghost, blocked):
+            if score[move] > best_score:
+                best_score = score[move]
+                best = move
+        return best
+
+    def decided(self, ghost: int, blocked: int, turns_left: int) -> bool:
+        """True if choose() can answer without searching (no use of pot_path)"""
+        if len(self.board.moves(ghost, blocked)) <= 1:
+            return True
+        return (ghost, blocked, min(turns_left, self.depth + 1)) in self.decisions
+
+    def choose(self, ghost: int, blocked: int, turns_left: int) -> Optional[int]:
+        """
+        Best move for the ghost, or None if it is boxed in
+
+        turns_left is how many more talismans the player may place after
+        this move before running out.
+        """
+        self.completed_depth = 0
+        moves = self.board.moves(ghost, blocked)
+        if len(moves) <= 1:
+            return moves[0] if moves else None
+
+        # The search never looks further than depth + 1 turns ahead
+        key = (ghost, blocked, min(turns_left, self.depth + 1))
+        if key in self.decisions:
+            return self.decisions[key]
+        if len(self.decisions) > DECISION_LIMIT:
+            self.decisions.clear()
+
+        self.table.clear()
+        self.memo.clear()
+        self.node_limit = self.nodes + self.node_budget
+        best = None
+        try:
+            for depth in range(1, self.depth + 1):
+                best = self._root(moves, blocked, depth, turns_left)
+                self.completed_depth = depth
+        except _OutOfNodes:
+            pass
+        if best is None:
+            self.fallbacks += 1
+            best = self.greedy(ghost, blocked)
+        self.decisions[key] = best
+        return best
+
+    def _cells(self, blocked: int) -> Tuple[Dict[int, List[int]], Dict[int, float]]:
+        cells = self.memo.get(blocked)
+        if cells is None:
+            cells = self.memo[blocked] = ({}, {})
+        return cells
+
+    def _ordered(self, ghost: int, blocked: int) -> List[int]:
+        """Open neighbours of ghost, best static score first"""
+        moves_by_cell = self._cells(blocked)[0]
+        moves = moves_by_cell.get(ghost)
+        if moves is None:
+            # reverse keeps ties in move order, like sorting on -score
+            moves = moves_by_cell[ghost] = sorted(self.board.moves(ghost, blocked),
+                                                  key=self.score.__getitem__, reverse=True)
+        return moves
+
+    def _root(self, moves: List[int], blocked: int, depth: int, turns_left: int) -> int:
+        best = None
+        best_value = float('-inf')
+        for move in moves:
+            value = self._after_move(move, blocked, depth - 1, turns_left, float('-inf'), float('inf'))
+            if best is None or value > best_value:
+                best_value = value
+                best = move
+        return best
+
+    def _evaluate(self, ghost: int, blocked: int) -> float:
+        values = self._cells(blocked)[1]
+        value = values.get(ghost)
+        if value is not None:
+            return value
+        score = self.score[ghost]
+        if self.use_path:
+            # Swap crow-flies pot distance for walking distance around walls
+            path = self.pot_path[ghost]
+            if path == UNREACHABLE:
+                # Walled off from every pot for good; blocks only add walls
+                values[ghost] = ESCAPED / 2
+                return ESCAPED / 2
+            score += (path - self.pot_manhattan[ghost]) * self.pot_weight
+        mobility = len(self._ordered(ghost, blocked))
+        value = values[ghost] = score + mobility * MOBILITY_WEIGHT
+        return value
+
+    def _after_move(self, ghost: int, blocked: int, plies: int, turns_left: int,
+                    alpha: float, beta: float) -> float:
+        """Value once the ghost has stepped onto ghost; the player replies next"""
+        if self.pot_mask >> ghost & 1:
+            return CAUGHT
+        if turns_left <= 0:
+            return ESCAPED
+        if plies == 0:
+            return self._evaluate(ghost, blocked)
+
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise _OutOfNodes()
+
+        key = (ghost, blocked, plies, min(turns_left, plies + 1))
+        entry = self.table.get(key)
+        if entry is not None:
+            value, flag = entry
+            if flag == _EXACT:
+                return value
+            if flag == _LOWER and value >= beta:
+                return value
+            if flag == _UPPER and value <= alpha:
+                return value
+        alpha_in, beta_in = alpha, beta
+
+        # Player replies: block one of the ghost's open neighbours, or pass
+        # (a talisman far away leaves the ghost's options unchanged)
+        replies = [blocked | (1 << cell) for cell in self._ordered(ghost, blocked)
+                   if self.placeable >> cell & 1]
+        replies.append(blocked)
+        best = float('inf')
+        for after in replies:
+            value = self._ghost_turn(ghost, after, plies, turns_left - 1, alpha, beta)
+            if value < best:
+                best = value
+                beta = min(beta, value)
+                if best <= alpha:
+                    break
+
+        if best <= alpha_in:
+            flag = _UPPER
+        elif best >= beta_in:
+            flag = _LOWER
+        else:
+            flag = _EXACT
+        self.table[key] = (best, flag)
+        return best
+
+    def _ghost_turn(self, ghost: int, blocked: int, plies: int, turns_left: int,
+                    alpha: float, beta: float) -> float:
+        """Value with the ghost to move from ghost"""
+        moves = self._ordered(ghost, blocked)
+        if not moves:
+            # Boxed in: the ghost stays put and the player keeps placing
+            return self._after_move(ghost, blocked, plies - 1, turns_left, alpha, beta)
+        best = float('-inf')
+        for move in moves:
+            value = self._after_move(move, blocked, plies - 1, turns_left, alpha, beta)
+            if value > best:
+                best = value
+                alpha = max(alpha, value)
+                if best >= beta:
+                    break
+        return best
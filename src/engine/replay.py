@@ -0,0 +1,377 @@
+"""
+Compact replay log and deterministic replay
+
+A level is fully determined by (level_num, seed, width, height, ghost
+count) and the ghosts are deterministic, so a session is just that
+header plus the cells the player placed talismans on, in order.
+Everything is packed as unsigned LEB128 varints:
+
+    b'GR' version level_num seed width height ghost_count count index...
+        path_count ghost_index...
+
+Version 1 replays have no ghost_count; the level's default applies, and
+versions before 3 have no ghost path. The path is the lookahead ghost's
+cell after each turn. Headless replay checks every step against the
+search (whose decisions are memoized per layout, so repeated audits of
+a level are cheap); only trusted sources, such as the game's own
+recordings, may skip that and just check that each step was legal.
+
+A 30-turn session on the default board packs into under 80 bytes, or
+about 140 with a ghost path.
+"""
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+from src.config import GRID_COLS, GRID_ROWS, MEGA_LEVEL_CONFIG, get_level_config
+from src.engine.grid import CellType, Position
+from src.engine.level import Level
+from src.engine.rules import Outcome, TurnResult, evaluate, level_score, step
+
+MAGIC = b'GR'
+FORMAT_VERSION = 3
+# No board the game makes is larger than a mega board
+MAX_WIDTH = max(GRID_COLS, MEGA_LEVEL_CONFIG['width'])
+MAX_HEIGHT = max(GRID_ROWS, MEGA_LEVEL_CONFIG['height'])
+
+
+class ReplayError(ValueError):
+    """Raised for data that is not a valid replay"""
+
+
+def encode_varint(value: int, out: bytearray):
+    """Append value as an unsigned LEB128 varint"""
+    if value < 0:
+        raise ReplayError(f"cannot encode negative value {value}")
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Read one varint at offset; returns (value, next offset)"""
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ReplayError("truncated replay")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+@dataclass
+class Replay:
+    level_num: int
+    seed: int
+    width: int
+    height: int
+    placements: List[int] = field(default_factory=list)
+    ghost_count: Optional[int] = None
+    ghost_path: Optional[List[int]] = None
+
+    @classmethod
+    def for_level(cls, level: Level) -> 'Replay':
+        """Empty replay for a freshly generated level; lookahead levels also get a ghost path"""
+        return cls(level.level_num, level.seed, level.width, level.height, ghost_count=level.ghost_count,
+                   ghost_path=[] if level.ai is not None else None)
+
+    def record(self, pos: Position, ghost: Optional[Position] = None):
+        """Append a placement that the rules accepted, and where the ghost went"""
+        self.placements.append(pos.y * self.width + pos.x)
+        if self.ghost_path is not None and ghost is not None:
+            self.ghost_path.append(ghost.y * self.width + ghost.x)
+
+    def pop(self):
+        """Drop the last turn (it was undone)"""
+        self.placements.pop()
+        if self.ghost_path and len(self.ghost_path) > len(self.placements):
+            self.ghost_path.pop()
+
+    @property
+    def has_ghost_path(self) -> bool:
+        return self.ghost_path is not None and len(self.ghost_path) == len(self.placements)
+
+    def positions(self) -> List[Position]:
+        width = self.width
+        return [Position(index % width, index // width) for index in self.placements]
+
+    def new_level(self) -> Level:
+        return Level(self.level_num, self.width, self.height, seed=self.seed, ghost_count=self.ghost_count)
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(MAGIC)
+        ghost_count = self.ghost_count
+        if ghost_count is None:
+            ghost_count = get_level_config(self.level_num)['ghost_count']
+        for value in (FORMAT_VERSION, self.level_num, self.seed, self.width, self.height,
+                      ghost_count, len(self.placements)):
+            encode_varint(value, out)
+        for index in self.placements:
+            encode_varint(index, out)
+        path = self.ghost_path if self.has_ghost_path else []
+        encode_varint(len(path), out)
+        for index in path:
+            encode_varint(index, out)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        if data[:2] != MAGIC:
+            raise ReplayError("not a replay")
+        version, offset = decode_varint(data, 2)
+        if version not in (1, 2, FORMAT_VERSION):
+            raise ReplayError(f"unsupported replay version {version}")
+        header = []
+        for _ in range(5 if version == 1 else 6):
+            value, offset = decode_varint(data, offset)
+            header.append(value)
+        if version == 1:
+            header.insert(4, None)
+        level_num, seed, width, height, ghost_count, count = header
+        if level_num < 1:
+            raise ReplayError(f"bad level number {level_num}")
+        if not (1 <= width <= MAX_WIDTH and 1 <= height <= MAX_HEIGHT):
+            raise ReplayError(f"bad board size {width}x{height}")
+        size = width * height
+        if ghost_count is not None and not 1 <= ghost_count <= size:
+            raise ReplayError(f"bad ghost count {ghost_count}")
+        placements = []
+        for _ in range(count):
+            index, offset = decode_varint(data, offset)
+            placements.append(index)
+        ghost_path = None
+        if version >= 3:
+            path_count, offset = decode_varint(data, offset)
+            if path_count not in (0, count):
+                raise ReplayError(f"ghost path has {path_count} steps for {count} turns")
+            if path_count:
+                ghost_path = []
+                for _ in range(path_count):
+                    index, offset = decode_varint(data, offset)
+                    ghost_path.append(index)
+        if any(index >= size for index in placements + (ghost_path or [])):
+            raise ReplayError(f"cell index outside the {width}x{height} board")
+        if offset != len(data):
+            raise ReplayError("trailing bytes after replay")
+        return cls(level_num, seed, width, height, placements, ghost_count, ghost_path)
+
+
+@dataclass
+class ReplayResult:
+    outcome: Outcome
+    talismans: int
+    score: int
+    ghost_index: int
+    rejected_turn: Optional[int] = None
+
+    @property
+    def valid(self) -> bool:
+        """True if the rules accepted every recorded placement"""
+        return self.rejected_turn is None
+
+
+@lru_cache(maxsize=128)
+def _layout(level_num: int, seed: int, width: int, height: int, ghost_count: Optional[int]) -> tuple:
+    """Static facts of a generated level that headless replay needs"""
+    level = Level(level_num, width, height, seed=seed, ghost_count=ghost_count)
+    open_cells = level.board.from_grid(level.grid, CellType.EMPTY)
+    ghost_index = level.ghost.pos.y * width + level.ghost.pos.x
+    # A lookahead level keeps its AI (and distance fields) so audits share
+    # its memoized decisions
+    return (level.board, level.fields.score, level.blocked, level.pot_mask, open_cells,
+            ghost_index, level.ghost_mask, level.max_talismans, level if level.ai is not None else None,
+            level.move_table)
+
+
+def _lookahead_move(level: Level, ghost: int, blocked: int, turns_left: int) -> Optional[int]:
+    """The lookahead ghost's move in an arbitrary position of the cached level"""
+    ai = level.ai
+    if not ai.decided(ghost, blocked, turns_left):
+        # The search scores leaves with walking distances around blocked
+        level.fields.reset_path(blocked)
+    return ai.choose(ghost, blocked, turns_left)
+
+
+def replay_headless(replay: Replay, rerun_ai: bool = False, trusted: bool = False) -> ReplayResult:
+    """
+    Re-run a replay at full speed without building a Level per session
+
+    This mirrors rules.step turn for turn, but works on the cached layout
+    and bitboards directly: a turn is a mask test, a few ORs and the
+    ghost's move. The greedy ghost's move is a lookup of its static move
+    scores, several ghosts move as one MoveTable batch, and the
+    lookahead ghost's move comes from the level's search, memoized per
+    layout; a recorded ghost path must agree with it turn for turn.
+    Generated layouts are shared between replays of the same level, so
+    auditing a batch of sessions mostly costs the turns themselves.
+
+    trusted=True follows a recorded ghost path without asking the search,
+    checking only that each step was legal. It is for replays this game
+    recorded itself, never for scores sent in from elsewhere. rerun_ai
+    plays the lookahead levels through the rules instead.
+    """
+    layout = _layout(replay.level_num, replay.seed, replay.width, replay.height, replay.ghost_count)
+    lookahead, move_table = layout[-2:]
+    if move_table is not None:
+        return _replay_batch(replay, layout)
+    if lookahead is not None and rerun_ai:
+        return _replay_rules(replay)
+    board, score, blocked, pot_mask, open_cells, ghost, _, max_talismans = layout[:-2]
+    path = replay.ghost_path if lookahead is not None and replay.has_ghost_path else None
+    follow = path is not None and trusted
+    budget = math.ceil(max_talismans)
+    count = 0
+    outcome = Outcome.IN_PROGRESS
+    rejected_turn = None
+
+    for turn, index in enumerate(replay.placements):
+        if pot_mask >> ghost & 1:
+            outcome = Outcome.WON
+        elif count >= max_talismans:
+            outcome = Outcome.LOST
+        if outcome != Outcome.IN_PROGRESS or not open_cells >> index & 1:
+            rejected_turn = turn
+            break
+
+        bit = 1 << index
+        moves = board.moves(ghost, blocked | bit)
+        if follow:
+            # A boxed-in ghost stays put; otherwise it must take an open neighbour
+            move = path[turn]
+            if move not in moves if moves else move != ghost:
+                rejected_turn = turn
+                break
+        elif lookahead is not None:
+            move = _lookahead_move(lookahead, ghost, blocked | bit, budget - count - 1)
+            if move is None:
+                move = ghost
+            if path is not None and path[turn] != move:
+                # The recorded ghost is not the one the search plays
+                rejected_turn = turn
+                break
+        else:
+            move = ghost
+            best_score = float('-inf')
+            for option in moves:
+                if score[option] > best_score:
+                    best_score = score[option]
+                    move = option
+        open_cells ^= bit
+        blocked |= bit
+        count += 1
+        ghost = move
+
+    if pot_mask >> ghost & 1:
+        outcome = Outcome.WON
+    elif count >= max_talismans:
+        outcome = Outcome.LOST
+    points = max(0, max_talismans - count) if outcome == Outcome.WON else 0
+    return ReplayResult(outcome, count, points, ghost, rejected_turn)
+
+
+def _replay_batch(replay: Replay, layout: tuple) -> ReplayResult:
+    """Headless replay of a level whose ghosts all move greedily as one batch"""
+    board, _, blocked, pot_mask, open_cells, lead, loose, max_talismans, _, table = layout
+    offsets = table.offsets
+    count = 0
+    outcome = Outcome.IN_PROGRESS
+    rejected_turn = None
+
+    for turn, index in enumerate(replay.placements):
+        if not loose:
+            outcome = Outcome.WON
+        elif count >= max_talismans:
+            outcome = Outcome.LOST
+        if outcome != Outcome.IN_PROGRESS or not open_cells >> index & 1:
+            rejected_turn = turn
+            break
+
+        bit = 1 << index
+        open_cells ^= bit
+        blocked |= bit
+        count += 1
+
+        moving = table.resolve(loose, blocked)
+        left = moving[0] | moving[1] | moving[2] | moving[3]
+        if left:
+            if left >> lead & 1:
+                for d in range(4):
+                    if moving[d] >> lead & 1:
+                        lead += offsets[d]
+                        break
+            loose = (loose & ~left | table.targets(moving)) & ~pot_mask
+
+    if not loose:
+        outcome = Outcome.WON
+    elif count >= max_talismans:
+        outcome = Outcome.LOST
+    points = max(0, max_talismans - count) if outcome == Outcome.WON else 0
+    return ReplayResult(outcome, count, points, lead, rejected_turn)
+
+
+def _replay_rules(replay: Replay) -> ReplayResult:
+    level = replay.new_level()
+    path = replay.ghost_path if replay.has_ghost_path else None
+    rejected_turn = None
+    for turn, pos in enumerate(replay.positions()):
+        if not step(level, pos).placed:
+            rejected_turn = turn
+            break
+        if path is not None and level.ghost.pos != level.grid.position(path[turn]):
+            # The search disagrees with the recorded ghost
+            rejected_turn = turn
+            break
+    outcome = evaluate(level)
+    points = level_score(level) if outcome == Outcome.WON else 0
+    ghost = level.ghost.pos.y * level.width + level.ghost.pos.x
+    return ReplayResult(outcome, level.talisman_count, points, ghost, rejected_turn)
+
+
+def replay_many(blobs: Iterable[bytes], rerun_ai: bool = False, trusted: bool = False) -> List[ReplayResult]:
+    """Decode and re-run a batch of serialized replays"""
+    return [replay_headless(Replay.from_bytes(blob), rerun_ai, trusted) for blob in blobs]
+
+
+class ReplayPlayer:
+    """
+    Steps a replay through the real rules at a chosen playback rate
+
+    rate is in turns per second; 0 or less plays everything on the first
+    advance(). The level is rebuilt from the replay header, so callers can
+    render player.level exactly as they would a live game.
+    """
+
+    def __init__(self, replay: Replay, rate: float = 4.0):
+        self.replay = replay
+        self.rate = rate
+        self.level = replay.new_level()
+        self.positions = replay.positions()
+        self.turn = 0
+        self.elapsed = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.turn >= len(self.positions)
+
+    def advance(self, seconds: float) -> List[TurnResult]:
+        """Play every turn that is due after another seconds of playback"""
+        self.elapsed += seconds
+        due = len(self.positions) if self.rate <= 0 else int(self.elapsed * self.rate)
+        results = []
+        while self.turn < min(due, len(self.positions)):
+            results.append(step(self.level, self.positions[self.turn]))
+            self.turn += 1
+        return results
+
+    def finish(self) -> List[TurnResult]:
+        """Play all remaining turns immediately"""
+        results = [step(self.level, pos) for pos in self.positions[self.turn:]]
+        self.turn = len(self.positions)
+        return results
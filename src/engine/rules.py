@@ -0,0 +1,101 @@
+"""
+Turn resolution and win/lose evaluation
+"""
+
+import math
+from enum import Enum
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from src.engine.grid import Position
+from src.engine.level import Level
+
+
+class Outcome(Enum):
+    IN_PROGRESS = 0
+    WON = 1
+    LOST = 2
+
+
+@dataclass
+class TurnResult:
+    placed: bool
+    outcome: Outcome
+    ghost_from: Position
+    ghost_to: Position
+    ghost_moves: List[Tuple[Position, Position]] = field(default_factory=list)
+
+
+def evaluate(state: Level) -> Outcome:
+    """Check if the level is won (every ghost in a pot) or lost"""
+    ghost_pos = state.ghost.pos
+    
+    if not state.ghost_mask:
+        return Outcome.WON
+    
+    if (ghost_pos.x < 0 or ghost_pos.x >= state.width or
+        ghost_pos.y < 0 or ghost_pos.y >= state.height):
+        return Outcome.LOST
+    
+    if state.talisman_count >= state.max_talismans:
+        return Outcome.LOST
+    
+    return Outcome.IN_PROGRESS
+
+
+def level_score(state: Level) -> int:
+    """Points awarded for completing the level"""
+    return max(0, state.max_talismans - state.talisman_count)
+
+
+def step(state: Level, placement: Position) -> TurnResult:
+    """
+    Play one turn: place a talisman, then let the ghosts respond
+    
+    The placement is ignored (placed=False) if the level is already
+    decided or the cell is not free.
+    """
+    ghost_from = state.ghost.pos
+    outcome = evaluate(state)
+    if outcome != Outcome.IN_PROGRESS or not state.place_talisman(placement):
+        return TurnResult(False, outcome, ghost_from, ghost_from)
+    
+    if state.move_table is not None:
+        moves = _move_batch(state)
+    else:
+        ghost = state.ghost
+        if state.ai is None:
+            ghost.move_ai(state.board, state.blocked, state.fields)
+        else:
+            turns_left = math.ceil(state.max_talismans) - state.talisman_count
+            move = state.ai.choose(ghost.pos.y * state.width + ghost.pos.x, state.blocked, turns_left)
+            if move is not None:
+                ghost.move_to(state.board.position(move))
+        moves = [(ghost_from, ghost.pos)] if ghost.pos != ghost_from else []
+        index = ghost.pos.y * state.width + ghost.pos.x
+        state.ghost_mask = 0 if state.pot_mask >> index & 1 else 1 << index
+    return TurnResult(True, evaluate(state), ghost_from, state.ghost.pos, moves)
+
+
+def _move_batch(state: Level) -> List[Tuple[Position, Position]]:
+    """Move every loose ghost at once; a ghost that reaches a pot is caught"""
+    table = state.move_table
+    moving = table.resolve(state.ghost_mask, state.blocked)
+    left = moving[0] | moving[1] | moving[2] | moving[3]
+    if not left:
+        return []
+    
+    moves = []
+    width = state.width
+    for ghost in state.ghosts:
+        index = ghost.pos.y * width + ghost.pos.x
+        if not left >> index & 1:
+            continue
+        for d in range(4):
+            if moving[d] >> index & 1:
+                ghost_from = ghost.pos
+                ghost.move_to(state.board.position(index + table.offsets[d]))
+                moves.append((ghost_from, ghost.pos))
+                break
+    state.ghost_mask = (state.ghost_mask & ~left | table.targets(moving)) & ~state.pot_mask
+    return moves
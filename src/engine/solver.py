@@ -0,0 +1,275 @@
+"""
+Exact solver: fewest talismans needed to catch the ghost
+
+The ghost policy is deterministic and its move scores never change
+during a level, so a turn is fully described by which neighbour the
+ghost steps to. Sending it to its k-th preferred neighbour requires the
+k better-ranked open neighbours to be blocked by that turn. The search
+therefore walks ghost paths, turning each forced move into "block cell c
+no later than turn D" jobs. A job for a cell the ghost stood on at turn
+m can only be placed from turn m + 1 on. Jobs are packed into turns with
+earliest-deadline-first, which keeps the latest possible turns free for
+jobs discovered later. Turns that no job needs get a talisman on a cell
+the ghost never comes near.
+
+The search is exact only for one greedy ghost, so Solver takes no other
+level (see Solver.supports): a lookahead ghost re-plans against every
+placement and several ghosts block each other. Those levels, and greedy
+ones whose search runs out of nodes (UNKNOWN), are left to the
+heuristic engine.win_search, which finds wins but proves no minimum.
+"""
+
+import copy
+import math
+from enum import Enum
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.engine.fields import UNREACHABLE
+from src.engine.bitboard import iter_bits
+from src.engine.grid import CellType, Position
+from src.engine.level import Level
+from src.engine.rules import Outcome, step
+
+DEFAULT_NODE_LIMIT = 100000
+
+
+class SolveStatus(Enum):
+    SOLVED = 1  # placements is a shortest win
+    UNSOLVABLE = 2
+    UNKNOWN = 3  # no win found within the limits
+    BOUNDED = 4  # placements wins, but a shorter win was not ruled out (win_search only)
+
+
+@dataclass
+class SolveResult:
+    status: SolveStatus
+    placements: List[Position] = field(default_factory=list)
+    nodes: int = 0
+    lower_bound: int = 0  # no win uses fewer talismans than this
+
+    @property
+    def talismans(self) -> int:
+        return len(self.placements)
+
+
+class _SearchLimit(Exception):
+    pass
+
+
+class Solver:
+    """Exact iterative-deepening search over ghost paths, for one greedy ghost"""
+
+    def __init__(self, level: Level, node_limit: int = DEFAULT_NODE_LIMIT, budget: Optional[int] = None):
+        """budget caps the talismans a win may use, if not the level's own max_talismans"""
+        if not Solver.supports(level):
+            raise ValueError(f"level {level.level_num} has a lookahead or several ghosts; use win_search")
+        self.level = level
+        self.node_limit = node_limit
+        self.budget = math.ceil(level.max_talismans) if budget is None else budget
+        grid = level.grid
+        board = level.board
+        score = level.fields.score
+
+        self.pots = set(iter_bits(level.pot_mask))
+        # Cells a talisman can never occupy but the ghost can walk through
+        self.unblockable = self.pots | set(grid.indices_of(CellType.GHOST))
+        # Static walking distance to the nearest pot, split by parity: the
+        # board is bipartite, so the ghost can only land on a pot after an
+        # odd or an even number of moves, never both
+        self.pot_path = level.fields.pot_path
+        self.reach = self._parity_distances()
+
+        self.ranked = []
+        for index in range(grid.size):
+            neighbours = board.moves(index, level.blocked)
+            order = sorted(range(len(neighbours)), key=lambda k: (-score[neighbours[k]], k))
+            self.ranked.append([neighbours[k] for k in order])
+
+        self.nodes = 0
+        self.table: Dict[tuple, int] = {}
+
+    @staticmethod
+    def supports(level: Level) -> bool:
+        """True for the levels the search is exact on: one ghost, moving greedily"""
+        return level.ai is None and len(level.ghosts) == 1
+
+    def solve(self) -> SolveResult:
+        """Return a shortest winning placement sequence, or prove there is none"""
+
+        level = self.level
+        if not level.ghost_mask:
+            return SolveResult(SolveStatus.SOLVED, [], 0)
+
+        # A turn is playable while talisman_count < max_talismans
+        budget = self.budget - level.talisman_count
+        # Every loose ghost has to walk into a pot
+        distances = [self.pot_path[index] for index in iter_bits(level.ghost_mask)]
+        lower = max(distances)
+        if min(distances) < 0 or lower > budget:
+            return SolveResult(SolveStatus.UNSOLVABLE, [], 0)
+
+        start = level.grid.index(level.ghost.pos)
+        depth = lower
+        try:
+            for depth in range(max(lower, 1), budget + 1):
+                if not self._can_reach(start, depth):
+                    continue
+                self.path = [start]
+                self.last_visit = {start: 0}
+                self.jobs: Dict[int, int] = {}
+                self.committed = 0
+                if self._search(0, start, 0, depth):
+                    placements = self._placements()
+                    if placements is not None:
+                        return SolveResult(SolveStatus.SOLVED, placements, self.nodes, len(placements))
+        except _SearchLimit:
+            # Every shorter depth was refuted before the limit hit
+            return SolveResult(SolveStatus.UNKNOWN, [], self.nodes, depth)
+        return SolveResult(SolveStatus.UNSOLVABLE, [], self.nodes)
+
+    def _search(self, turn: int, pos: int, free: int, depth: int) -> bool:
+        """
+        Extend the ghost path from pos at the end of turn
+
+        free is a bitmask of turns (bit t = turn t) that no job uses yet.
+        """
+        self.nodes += 1
+        if self.nodes > self.node_limit:
+            raise _SearchLimit()
+
+        remaining = depth - turn
+        key = self._key(turn, pos, free)
+        if self.table.get(key, -1) >= remaining:
+            return False
+
+        turn += 1
+        free |= 1 << turn
+        need = []
+        for target in self.ranked[pos]:
+            if self.committed >> target & 1:
+                continue
+            if self._can_reach(target, remaining - 1):
+                placed = self._assign(need, turn, free)
+                if placed is not None and self._descend(turn, target, placed, need, depth):
+                    return True
+            # Any lower-ranked target also needs this one blocked
+            if target in self.unblockable:
+                break
+            need.append(target)
+
+        self.table[key] = remaining
+        return False
+
+    def _can_reach(self, index: int, moves: int) -> bool:
+        """Could the ghost stand on a pot after exactly moves more moves?"""
+        distance = self.reach[moves & 1][index]
+        return 0 <= distance <= moves
+
+    def _parity_distances(self) -> List[List[int]]:
+        level = self.level
+        board = level.board
+        reach = [[UNREACHABLE] * board.size, [UNREACHABLE] * board.size]
+        for colour in (0, 1):
+            sources = 0
+            for pot in self.pots:
+                if (pot % board.width + pot // board.width) & 1 == colour:
+                    sources |= 1 << pot
+            for distance, layer in enumerate(board.distance_layers(sources, level.blocked)):
+                parity = reach[distance & 1]
+                for index in iter_bits(layer):
+                    if parity[index] == UNREACHABLE:
+                        parity[index] = distance
+        return reach
+
+    def _descend(self, turn: int, target: int, free: int, need: List[int], depth: int) -> bool:
+        jobs = self.jobs
+        committed = self.committed
+        for cell in need:
+            jobs[cell] = turn
+            self.committed |= 1 << cell
+        previous = self.last_visit.get(target)
+        self.last_visit[target] = turn
+        self.path.append(target)
+
+        if target in self.pots or self._search(turn, target, free, depth):
+            return True
+
+        self.path.pop()
+        if previous is None:
+            del self.last_visit[target]
+        else:
+            self.last_visit[target] = previous
+        for cell in need:
+            del jobs[cell]
+        self.committed = committed
+        return False
+
+    def _assign(self, need: List[int], turn: int, free: int) -> Optional[int]:
+        """Give each new job the earliest free turn it may use"""
+        for cell in need:
+            release = self.last_visit.get(cell, 0) + 1
+            usable = free >> release << release
+            if not usable:
+                return None
+            free &= ~(usable & -usable)
+        return free
+
+    def _key(self, turn: int, pos: int, free: int) -> tuple:
+        # Only cells visited at or after the oldest free turn have a
+        # release time that can still matter for future jobs
+        oldest = (free & -free).bit_length() - 1 if free else turn + 1
+        return (turn, pos, self.committed, free, tuple(self.path[oldest:]))
+
+    def _placements(self) -> Optional[List[Position]]:
+        """Turn the job table into a concrete, verified placement list"""
+        level = self.level
+        grid = level.grid
+        turns = len(self.path) - 1
+
+        by_deadline = sorted(self.jobs.items(), key=lambda item: (item[1], item[0]))
+        slots: List[Optional[int]] = [None] * (turns + 1)
+        for cell, deadline in by_deadline:
+            release = self.last_visit.get(cell, 0) + 1
+            for turn in range(release, deadline + 1):
+                if slots[turn] is None:
+                    slots[turn] = cell
+                    break
+
+        board = level.board
+        path = 0
+        for index in self.path:
+            path |= 1 << index
+        near = path | board.neighbours(path) | self.committed
+        empty = board.from_grid(grid, CellType.EMPTY)
+        spare = list(iter_bits(empty & ~near))
+        for turn in range(1, turns + 1):
+            if slots[turn] is None:
+                if not spare:
+                    return None
+                slots[turn] = spare.pop()
+
+        placements = [grid.position(index) for index in slots[1:]]
+        return placements if _replay(level_copy(level, self.budget), placements) else None
+
+
+def level_copy(level: Level, budget: int) -> Level:
+    """A copy of the level to search on, allowing budget talismans"""
+    state = copy.deepcopy(level)
+    state.max_talismans = budget
+    return state
+
+
+def _replay(state: Level, placements: List[Position]) -> bool:
+    """Check a placement sequence against the real rules, playing on state"""
+    result = None
+    for pos in placements:
+        result = step(state, pos)
+        if not result.placed:
+            return False
+    return result is not None and result.outcome == Outcome.WON
+
+
+def solve(level: Level, node_limit: int = DEFAULT_NODE_LIMIT) -> SolveResult:
+    """Find the minimum number of talismans that wins a one-ghost greedy level"""
+    return Solver(level, node_limit).solve()
@@ -0,0 +1,127 @@
+"""
+Batched moves for levels with many ghosts
+
+Every ghost uses the greedy policy: step to the open neighbour with the
+best static score, ties going down, up, right, left. Because the scores
+never change during a level, each cell's neighbours can be ranked once.
+A ghost then takes its best-ranked open neighbour, and that choice can
+be made for all ghosts at once with a fixed number of bitboard
+operations, however many ghosts there are.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+from src.engine.bitboard import Bitboard, bit_indices, geometry
+from src.engine.fields import pot_tables
+
+DOWN, UP, RIGHT, LEFT = range(4)
+
+
+class MoveTable:
+    """
+    Per-level bitboards: rank[k][d] holds the cells whose k-th preferred
+    neighbour lies in direction d
+    """
+
+    def __init__(self, board: Bitboard, score: List[float]):
+        self.board = board
+        width = board.width
+        self.offsets = (width, -width, 1, -1)
+
+        # Each cell's directions, in move order, then ranked by score; the
+        # masks are written as digit strings so big boards stay linear
+        options: List[List[int]] = [[] for _ in range(board.size)]
+        for d, mask in enumerate(self._inverse_shifts(board.full)):
+            for index in bit_indices(mask):
+                options[index].append(d)
+        digits = [[bytearray(b'0' * board.size) for _ in range(4)] for _ in range(4)]
+        last = board.size - 1
+        for index, directions in enumerate(options):
+            # sort is stable, so ties keep the move order
+            directions.sort(key=lambda d: -score[index + self.offsets[d]])
+            for k, d in enumerate(directions):
+                digits[k][d][last - index] = 49  # ord('1')
+        self.rank = [[int(row, 2) for row in by_rank] for by_rank in digits]
+
+    def _shift(self, mask: int, d: int) -> int:
+        """Move every bit of mask one step in direction d"""
+        board = self.board
+        return (board.down, board.up, board.right, board.left)[d](mask)
+
+    def _inverse_shift(self, mask: int, d: int) -> int:
+        """Cells whose d-neighbour is in mask"""
+        board = self.board
+        return (board.up, board.down, board.left, board.right)[d](mask)
+
+    def _inverse_shifts(self, mask: int) -> Tuple[int, int, int, int]:
+        """Per direction d: cells whose d-neighbour is in mask"""
+        board = self.board
+        return board.up(mask), board.down(mask), board.left(mask), board.right(mask)
+
+    def resolve(self, ghosts: int, blocked: int) -> List[int]:
+        """
+        Move every ghost in the ghosts mask simultaneously
+
+        Returns a mask per direction of the ghosts that actually step
+        that way; the rest stay put. Conflicts are settled so no two
+        ghosts end up on one square:
+        - two ghosts facing each other across an edge both stay,
+        - a contested square goes to the ghost moving in the earlier
+          direction (down, up, right, left) and the others stay,
+        - a ghost whose target is held by a ghost that stays, stays too.
+        """
+        open_towards = self._inverse_shifts(self.board.full & ~blocked)
+        moving = [0, 0, 0, 0]
+        undecided = ghosts
+        for by_direction in self.rank:
+            for d in range(4):
+                hit = undecided & by_direction[d] & open_towards[d]
+                if hit:
+                    moving[d] |= hit
+                    undecided &= ~hit
+            if not undecided:
+                break
+
+        board = self.board
+        swap = moving[DOWN] & board.up(moving[UP])
+        moving[DOWN] &= ~swap
+        moving[UP] &= ~board.down(swap)
+        swap = moving[RIGHT] & board.left(moving[LEFT])
+        moving[RIGHT] &= ~swap
+        moving[LEFT] &= ~board.right(swap)
+
+        claimed = 0
+        for d in range(4):
+            target = self._shift(moving[d], d)
+            contested = target & claimed
+            if contested:
+                moving[d] &= ~self._inverse_shift(contested, d)
+                target &= ~contested
+            claimed |= target
+
+        # Ghosts that stay block whoever wanted their square, which can
+        # in turn block the ghost behind them
+        stopped = ghosts & ~(moving[DOWN] | moving[UP] | moving[RIGHT] | moving[LEFT])
+        while stopped:
+            into = self._inverse_shifts(stopped)
+            stopped = 0
+            for d in range(4):
+                hit = moving[d] & into[d]
+                if hit:
+                    moving[d] &= ~hit
+                    stopped |= hit
+        return moving
+
+    def targets(self, moving: List[int]) -> int:
+        """Mask of the squares the moving ghosts land on"""
+        result = 0
+        for d in range(4):
+            result |= self._shift(moving[d], d)
+        return result
+
+
+@lru_cache(maxsize=128)
+def move_table(width: int, height: int, pots: int) -> MoveTable:
+    """Shared MoveTable for a pot layout, scored by pot_tables (read-only)"""
+    return MoveTable(geometry(width, height), pot_tables(width, height, pots)[1])
@@ -0,0 +1,155 @@
+"""
+Heuristic win search: a good placement sequence, not a proven minimum
+
+For the levels the exact Solver does not model: lookahead ghosts, which
+re-plan against every placement, and several ghosts, which block each
+other. It is a branch-and-bound playout through the real rules that
+only tries talismans next to a loose ghost, a square further out, or
+one far from all of them. A win it finds is real but only an upper bound
+on the fewest talismans needed: the result is BOUNDED unless it meets
+the lower bound (SOLVED), and UNKNOWN when it finds no win, which does
+not mean the level cannot be won.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+from src.engine.bitboard import iter_bits
+from src.engine.grid import CellType
+from src.engine.journal import Journal
+from src.engine.level import Level
+from src.engine.rules import Outcome, evaluate
+from src.engine.solver import SolveResult, SolveStatus, _replay, _SearchLimit, level_copy
+
+DEFAULT_PLAYOUT_LIMIT = 5000  # turns played through the rules
+
+
+class WinSearch:
+    """
+    Branch and bound through the real rules, on a copy of the level
+
+    Keeps the shortest win found; a branch is cut once its talismans
+    plus the farthest loose ghost's walk to a pot cannot beat it. The
+    first pass only blocks squares next to a ghost (or passes); the
+    second, with what is left of the limit, also blocks squares one
+    further out, for steps that need two squares blocked at once.
+    """
+
+    def __init__(self, level: Level, playout_limit: int = DEFAULT_PLAYOUT_LIMIT,
+                 budget: Optional[int] = None, lower_bound: int = 0):
+        """
+        budget caps the talismans a win may use, if not the level's own
+        max_talismans; a lookahead ghost plans against the real budget,
+        so on its levels the cap can only be lowered. lower_bound is a
+        known bound, e.g. from a Solver that ran out of nodes.
+        """
+        real = math.ceil(level.max_talismans)
+        if budget is not None and level.ai is not None and budget > real:
+            raise ValueError("a lookahead level cannot be searched past its own budget")
+        self.level = level
+        self.playout_limit = playout_limit
+        self.budget = real if budget is None else budget
+        self.lower_bound = lower_bound
+
+    def search(self) -> SolveResult:
+        """The shortest win found within the limit"""
+        level = self.level
+        if not level.ghost_mask:
+            return SolveResult(SolveStatus.SOLVED, [], 0)
+        budget = self.budget - level.talisman_count
+        distances = [level.fields.pot_path[index] for index in iter_bits(level.ghost_mask)]
+        lower = max(self.lower_bound, max(distances))
+        if min(distances) < 0 or lower > budget:
+            return SolveResult(SolveStatus.UNSOLVABLE, [], 0)
+
+        state = level_copy(level, self.budget)
+        journal = Journal(state)
+        grid = state.grid
+        board = state.board
+        pot_path = state.fields.pot_path
+        best: Optional[List[int]] = None
+        cap = budget
+        seen: Dict[tuple, int] = {}
+        path: List[int] = []
+        nodes = 0
+        limit = 0
+        wide = False
+
+        def distance(index: int) -> int:
+            d = pot_path[index]
+            return d if d >= 0 else grid.size
+
+        def visit():
+            nonlocal nodes, best, cap
+            nodes += 1
+            if nodes > limit:
+                raise _SearchLimit()
+            used = len(path)
+            outcome = evaluate(state)
+            if outcome == Outcome.WON:
+                best = list(path)
+                cap = used - 1
+                return
+            if outcome != Outcome.IN_PROGRESS:
+                return
+            ghosts = list(iter_bits(state.ghost_mask))
+            if used + max(distance(ghost) for ghost in ghosts) > cap:
+                return
+            key = state.state_key()
+            if seen.get(key, cap + 1) <= used:
+                return
+            seen[key] = used
+
+            # Block the square farthest from a pot first, so the ghosts get
+            # pushed towards one (in the wide pass, the squares one further
+            # out too); last, a talisman away from every ghost
+            near = state.ghost_mask | board.neighbours(state.ghost_mask)
+            if wide:
+                empty = board.from_grid(grid, CellType.EMPTY)
+                outer = board.neighbours(near) & empty & ~near
+                options = sorted(iter_bits(near & empty), key=lambda m: -distance(m))
+                options.extend(sorted(iter_bits(outer), key=lambda m: -distance(m)))
+                near |= outer
+            else:
+                options = []
+                for ghost in ghosts:
+                    options.extend(m for m in board.moves(ghost, state.blocked)
+                                   if grid.cells[m] == CellType.EMPTY and m not in options)
+                options.sort(key=lambda m: -distance(m))
+            for index in range(grid.size - 1, -1, -1):
+                if grid.cells[index] == CellType.EMPTY and not near >> index & 1:
+                    options.append(index)
+                    break
+            for index in options:
+                if not journal.play(grid.position(index)).placed:
+                    continue
+                path.append(index)
+                try:
+                    visit()
+                finally:
+                    path.pop()
+                    journal.undo()
+                if cap < lower:
+                    return
+
+        for wide, limit in ((False, self.playout_limit // 2), (True, self.playout_limit)):
+            seen.clear()
+            try:
+                visit()
+            except _SearchLimit:
+                pass
+            if cap < lower:
+                break
+        if best is None:
+            return SolveResult(SolveStatus.UNKNOWN, [], nodes, lower)
+        placements = [grid.position(index) for index in best]
+        if not _replay(level_copy(level, self.budget), placements):
+            return SolveResult(SolveStatus.UNKNOWN, [], nodes, lower)
+        status = SolveStatus.SOLVED if len(best) == lower else SolveStatus.BOUNDED
+        return SolveResult(status, placements, nodes, lower)
+
+
+def find_win(level: Level, playout_limit: int = DEFAULT_PLAYOUT_LIMIT,
+             budget: Optional[int] = None, lower_bound: int = 0) -> SolveResult:
+    """Search for a short win on any level; see WinSearch"""
+    return WinSearch(level, playout_limit, budget, lower_bound).search()
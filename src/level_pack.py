@@ -0,0 +1,97 @@
+"""
+Level Pack - Prebuilt, verified level seeds
+Loaded at startup so players get boards that tools/build_level_pack.py
+has checked are winnable and sit on the difficulty curve
+"""
+
+import base64
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from src.engine import Level
+
+PACK_VERSION = 1
+DEFAULT_PACK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'levels', 'levels.json')
+
+
+@dataclass
+class PackEntry:
+    level_num: int
+    seed: int
+    width: int
+    height: int
+    ghost_count: int
+    talismans: int  # talismans the verified solution used
+    exact: bool  # True if talismans is the proven minimum
+    layout: bytes  # GameGrid cells right after generation
+
+    def to_json(self) -> dict:
+        return {
+            'level': self.level_num,
+            'seed': self.seed,
+            'width': self.width,
+            'height': self.height,
+            'ghosts': self.ghost_count,
+            'talismans': self.talismans,
+            'exact': self.exact,
+            'layout': base64.b64encode(zlib.compress(self.layout, 9)).decode('ascii'),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'PackEntry':
+        return cls(
+            data['level'], data['seed'], data['width'], data['height'], data['ghosts'],
+            data['talismans'], data['exact'], zlib.decompress(base64.b64decode(data['layout'])),
+        )
+
+
+class LevelPack:
+    """
+    Level number -> verified seed, with the generated layout kept as a
+    checksum: if the generator ever changes, a seed no longer produces
+    the packed board and that level falls back to its default seed
+    """
+
+    def __init__(self, entries: Optional[Dict[int, PackEntry]] = None):
+        self.entries: Dict[int, PackEntry] = entries or {}
+        self.mismatches = 0
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PACK_PATH) -> 'LevelPack':
+        """Read a pack; a missing or unreadable file gives an empty pack"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != PACK_VERSION:
+                return cls()
+            entries = {}
+            for item in data['levels']:
+                entry = PackEntry.from_json(item)
+                entries[entry.level_num] = entry
+            return cls(entries)
+        except (OSError, ValueError, KeyError, TypeError, zlib.error):
+            return cls()
+
+    def save(self, path: str = DEFAULT_PACK_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        data = {
+            'version': PACK_VERSION,
+            'levels': [self.entries[n].to_json() for n in sorted(self.entries)],
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def new_level(self, level_num: int) -> Level:
+        """The packed board for level_num, or the default one if there is none"""
+        entry = self.entries.get(level_num)
+        if entry is not None:
+            level = Level(level_num, entry.width, entry.height, seed=entry.seed, ghost_count=entry.ghost_count)
+            if level.layout_bytes() == entry.layout:
+                return level
+            self.mismatches += 1
+        return Level(level_num)
@@ -0,0 +1,164 @@
+"""
+Performance HUD - On-device instrumentation overlay
+Driven by DEBUG_CONFIG in src/config.py, for builds where no profiler
+can be attached
+"""
+
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from src.config import DEBUG_CONFIG
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Current resident set size, or None where it cannot be read cheaply"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+class StartupTimer:
+    """
+    Named wall-clock intervals from process start to the first frame
+
+    mark() closes the interval since the previous mark. report() prints
+    the breakdown to stderr when DEBUG_CONFIG enables startup timing.
+    """
+
+    def __init__(self, started: Optional[float] = None):
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str):
+        now = time.perf_counter()
+        self.marks.append((name, now - self.last))
+        self.last = now
+
+    def total(self) -> float:
+        return self.last - self.started
+
+    def lines(self) -> List[str]:
+        lines = [f"{name:<14} {seconds * 1000:8.1f} ms" for name, seconds in self.marks]
+        lines.append(f"{'total':<14} {self.total() * 1000:8.1f} ms")
+        return lines
+
+    def report(self):
+        if DEBUG_CONFIG['enabled'] and DEBUG_CONFIG['show_startup_timing']:
+            print("\n".join(["Startup:"] + self.lines()), file=sys.stderr)
+
+
+class PerfHud:
+    """
+    Rolling-window frame statistics and a small text overlay
+
+    Recording a frame only appends a few floats to fixed-size deques.
+    Percentiles, memory and the overlay text are recomputed at most every
+    refresh_interval seconds, so the per-frame cost stays a couple of
+    blits while enabled and a single attribute check while disabled.
+    """
+
+    def __init__(self, window: int = 240, refresh_interval: float = 0.5):
+        self.enabled = DEBUG_CONFIG['enabled']
+        self.show_fps = self.enabled and DEBUG_CONFIG['show_fps']
+        self.show_memory = self.enabled and DEBUG_CONFIG['show_memory_usage']
+        self.show_grid_numbers = self.enabled and DEBUG_CONFIG['show_grid_numbers']
+        self.show_ai = self.enabled and DEBUG_CONFIG['show_ghost_ai_debug']
+        self.visible = self.show_fps or self.show_memory or self.show_ai
+
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self.frame_times = deque(maxlen=window)
+        self.sections: Dict[str, deque] = {}
+        self.frame_blocks = deque(maxlen=window)
+        self.ai_scores: List[str] = []
+
+        self.last_blocks = sys.getallocatedblocks()
+        self.last_refresh = 0.0
+        self.lines: List[str] = []
+        self.panel: Optional[pygame.Surface] = None
+        self.font: Optional[pygame.font.Font] = None
+
+    def record(self, section: str, seconds: float):
+        """Add time spent in a named section during the current frame"""
+        samples = self.sections.get(section)
+        if samples is None:
+            samples = self.sections[section] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def end_frame(self, frame_seconds: float):
+        self.frame_times.append(frame_seconds)
+        blocks = sys.getallocatedblocks()
+        self.frame_blocks.append(blocks - self.last_blocks)
+        self.last_blocks = blocks
+
+    def set_ai_scores(self, scores: List[str]):
+        self.ai_scores = scores
+
+    def _percentile(self, samples, fraction: float) -> float:
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def _refresh(self, fps: float):
+        lines = []
+        if self.show_fps and self.frame_times:
+            ms = [t * 1000 for t in self.frame_times]
+            lines.append(
+                f"FPS {fps:5.1f}  frame p50 {self._percentile(ms, 0.5):.2f} "
+                f"p95 {self._percentile(ms, 0.95):.2f} p99 {self._percentile(ms, 0.99):.2f} ms"
+            )
+            for name, samples in self.sections.items():
+                if samples:
+                    mean = sum(samples) / len(samples) * 1000
+                    lines.append(f"{name:<14} mean {mean:.3f} max {max(samples) * 1000:.3f} ms")
+        if self.show_memory:
+            rss = resident_memory_bytes()
+            rss_text = f"{rss / (1024 * 1024):.1f} MiB" if rss is not None else "n/a"
+            blocks = sum(self.frame_blocks) / len(self.frame_blocks) if self.frame_blocks else 0.0
+            lines.append(f"RSS {rss_text}  net blocks/frame {blocks:+.1f}")
+        if self.show_ai:
+            lines.extend(self.ai_scores)
+        self.lines = lines
+        self.panel = None
+
+    def draw(self, screen: pygame.Surface, fps: float) -> Optional[pygame.Rect]:
+        """Blit the overlay; returns the screen area it covers"""
+        if not self.visible:
+            return None
+        now = time.monotonic()
+        if now - self.last_refresh >= self.refresh_interval:
+            self.last_refresh = now
+            self._refresh(fps)
+        if not self.lines:
+            return None
+
+        if self.panel is None:
+            if self.font is None:
+                self.font = pygame.font.Font(None, 20)
+            rendered = [self.font.render(line, True, (255, 255, 0)) for line in self.lines]
+            width = max(s.get_width() for s in rendered) + 8
+            height = sum(s.get_height() for s in rendered) + 8
+            self.panel = pygame.Surface((width, height))
+            self.panel.fill((0, 0, 0))
+            y = 4
+            for surface in rendered:
+                self.panel.blit(surface, (4, y))
+                y += surface.get_height()
+
+        rect = self.panel.get_rect(topright=(screen.get_width() - 4, 54))
+        screen.blit(self.panel, rect)
+        return rect
@@ -0,0 +1,194 @@
+"""
+Progress Store - Crash-safe save data
+Append-only JSON-lines log plus a snapshot that is replaced atomically
+"""
+
+import copy
+import json
+import os
+import queue
+import threading
+from typing import Dict, Optional
+
+SAVE_VERSION = 1
+SNAPSHOT_NAME = 'progress.json'
+LOG_NAME = 'progress.log'
+
+
+def default_save_dir() -> str:
+    """GHOST_SAVE_DIR if set, app-private storage on Android, else ~/.ghost_catching_game"""
+    return (
+        os.environ.get('GHOST_SAVE_DIR') or os.environ.get('ANDROID_PRIVATE') or
+        os.path.join(os.path.expanduser('~'), '.ghost_catching_game')
+    )
+
+
+def empty_state() -> Dict:
+    return {
+        'version': SAVE_VERSION,
+        'seq': 0,
+        'current_level': 1,  # level of the last session
+        'unlocked_level': 1,  # furthest level unlocked; replaying older levels never lowers it
+        'total_score': 0,
+        'best_times': {},
+        'session': None,
+    }
+
+
+def apply_record(state: Dict, record: Dict):
+    """Fold one log record into a state dict"""
+    kind = record['t']
+    if kind == 'level':
+        state['session'] = {'level': record['level'], 'seed': record['seed'], 'cells': []}
+        state['current_level'] = record['level']
+    elif kind == 'turn':
+        if state['session'] is not None:
+            state['session']['cells'].append(record['cell'])
+    elif kind == 'undo':
+        if state['session'] is not None and state['session']['cells']:
+            state['session']['cells'].pop()
+    elif kind == 'progress':
+        state['current_level'] = record['level']
+        state['unlocked_level'] = max(state['unlocked_level'], record['level'])
+        state['total_score'] = record['score']
+        state['session'] = None
+    elif kind == 'best':
+        state['best_times'][str(record['level'])] = record['seconds']
+    state['seq'] = record['seq']
+
+
+class ProgressStore:
+    """
+    Saves progress as small records without ever blocking a frame
+
+    append() only stamps a sequence number and hands the record to a
+    writer thread, which appends it to the log and flushes it to the OS,
+    so a killed process loses at most the record being written. Every
+    compact_every records the writer folds the log into a snapshot
+    (temp file, fsync, os.replace) and starts a new log. The snapshot
+    stores the last sequence number it covers, so a crash between the
+    rename and the log truncation just replays records that are skipped.
+    """
+
+    def __init__(self, directory: Optional[str] = None, compact_every: int = 256):
+        self.directory = directory or default_save_dir()
+        self.snapshot_path = os.path.join(self.directory, SNAPSHOT_NAME)
+        self.log_path = os.path.join(self.directory, LOG_NAME)
+        self.compact_every = compact_every
+        self.state = empty_state()
+        self.seq = 0
+        self.queue: 'queue.Queue[Optional[Dict]]' = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.errors = 0
+
+    def load(self) -> Dict:
+        """Read the snapshot and replay the log; returns the state dict"""
+        state = empty_state()
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get('version') == SAVE_VERSION:
+                state.update(snapshot)
+                # Snapshots from before unlocked_level was kept separately
+                state['unlocked_level'] = snapshot.get('unlocked_level', state['current_level'])
+        except (OSError, ValueError):
+            pass
+
+        try:
+            with open(self.log_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b'\n'):
+                    raise ValueError
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid += len(line)
+            if record.get('seq', 0) > state['seq']:
+                apply_record(state, record)
+        if valid < len(data):
+            # Cut off a torn final line from a killed process, so new
+            # records don't get glued onto it
+            try:
+                with open(self.log_path, 'r+b') as f:
+                    f.truncate(valid)
+            except OSError:
+                pass
+
+        self.state = state
+        self.seq = state['seq']
+        return copy.deepcopy(state)
+
+    def start(self):
+        """Start the writer thread (load() first so sequence numbers continue)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._writer, name='progress-writer', daemon=True)
+            self.thread.start()
+
+    def append(self, kind: str, **fields):
+        """Queue one record for writing; never blocks on disk"""
+        self.seq += 1
+        fields['t'] = kind
+        fields['seq'] = self.seq
+        self.queue.put(fields)
+
+    def close(self):
+        """Write everything still queued and stop the writer thread"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def _open_log(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            return open(self.log_path, 'a', encoding='utf-8')
+        except OSError:
+            self.errors += 1
+            return None
+
+    def _writer(self):
+        state = copy.deepcopy(self.state)
+        pending = 0
+        log = self._open_log()
+        try:
+            while True:
+                record = self.queue.get()
+                if record is None:
+                    return
+                apply_record(state, record)
+                if log is None:
+                    continue
+                try:
+                    log.write(json.dumps(record, separators=(',', ':')) + '\n')
+                    log.flush()
+                except OSError:
+                    self.errors += 1
+                    continue
+
+                pending += 1
+                if pending >= self.compact_every and self.queue.empty():
+                    try:
+                        log.close()
+                        self._compact(state)
+                        pending = 0
+                    except OSError:
+                        self.errors += 1
+                    log = self._open_log()
+        finally:
+            if log is not None:
+                log.close()
+
+    def _compact(self, state: Dict):
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Truncate only after the snapshot is durable
+        open(self.log_path, 'w').close()
@@ -0,0 +1,80 @@
+"""
+Render Cache - Reuses rendered text, overlays and cell tiles
+Keeps static screens from allocating new surfaces every frame
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+import pygame
+
+
+class RenderCache:
+    """
+    Bounded LRU cache of pygame surfaces
+
+    Entries are keyed by everything that affects their pixels (text,
+    font, colour, size). The whole cache is dropped when the locale or
+    the screen resolution changes, since every entry may be stale then.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[Hashable, pygame.Surface]' = OrderedDict()
+        self.context: Optional[Tuple] = None
+        self.hits = 0
+        self.misses = 0
+
+    def set_context(self, locale: str, resolution: Tuple[int, int]):
+        """Invalidate everything if the locale or resolution changed"""
+        context = (locale, tuple(resolution))
+        if context != self.context:
+            self.context = context
+            self.clear()
+
+    def clear(self):
+        self.entries.clear()
+
+    def get(self, key: Hashable, build: Callable[[], pygame.Surface]) -> pygame.Surface:
+        """Return the cached surface for key, building it on a miss"""
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = build()
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def text(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Antialiased text rendered with font"""
+        return self.get(('text', font, text, color), lambda: font.render(text, True, color))
+
+    def overlay(self, size: Tuple[int, int], alpha: int, color: Tuple[int, int, int] = (0, 0, 0)) -> pygame.Surface:
+        """Solid translucent full-screen overlay"""
+        def build():
+            surface = pygame.Surface(size)
+            surface.set_alpha(alpha)
+            surface.fill(color)
+            return surface
+        return self.get(('overlay', tuple(size), alpha, color), build)
+
+    def tile(self, name: str, size: int, draw: Callable[[pygame.Surface], None]) -> pygame.Surface:
+        """Pre-rasterized cell sprite; draw paints it onto a transparent tile"""
+        def build():
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            draw(surface)
+            return surface
+        return self.get(('tile', name, size), build)
+
+    def get_stats(self) -> dict:
+        """Get cache hit/miss statistics"""
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
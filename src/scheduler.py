@@ -0,0 +1,67 @@
+"""
+Frame Scheduler - Decides when the main loop should wake up
+Ticks at full rate only while something is animating; otherwise the
+loop sleeps in pygame.event.wait until input arrives
+"""
+
+import time
+from typing import List
+
+import pygame
+
+from src.config import PERFORMANCE_CONFIG
+
+
+class FrameScheduler:
+    """
+    Event-driven replacement for a fixed clock.tick(FPS) loop
+
+    The game is turn-based, so most of the time nothing on screen changes
+    until the player taps. While idle, wait() blocks on the event queue
+    (with a timeout so periodic housekeeping still runs). Call animate()
+    whenever something starts moving; until it finishes, wait() polls
+    events and paces frames at PERFORMANCE_CONFIG['max_fps'].
+    """
+
+    def __init__(self, max_fps: int = PERFORMANCE_CONFIG['max_fps'], idle_timeout_ms: int = 500):
+        self.max_fps = max_fps
+        self.idle_timeout_ms = idle_timeout_ms
+        self.clock = pygame.time.Clock()
+        self.active_until = 0.0
+        self.idle_frames = 0
+        self.active_frames = 0
+
+    def animate(self, seconds: float):
+        """Keep ticking at full rate for at least the next seconds"""
+        self.active_until = max(self.active_until, time.monotonic() + seconds)
+
+    def is_animating(self) -> bool:
+        return time.monotonic() < self.active_until
+
+    def wait(self) -> List[pygame.event.Event]:
+        """Block until the next frame is due and return pending events"""
+        if self.is_animating():
+            self.active_frames += 1
+            self.clock.tick(self.max_fps)
+            return pygame.event.get()
+
+        self.idle_frames += 1
+        first = pygame.event.wait(self.idle_timeout_ms)
+        events = [] if first.type == pygame.NOEVENT else [first]
+        events.extend(pygame.event.get())
+        # Don't let the idle gap count as one long frame
+        self.clock.tick()
+        return events
+
+    def get_fps(self) -> float:
+        return self.clock.get_fps()
+
+
+def set_display_mode(size, flags: int = 0) -> pygame.Surface:
+    """Open the window, asking for vsync if PERFORMANCE_CONFIG enables it"""
+    if PERFORMANCE_CONFIG['enable_vsync']:
+        try:
+            return pygame.display.set_mode(size, flags, vsync=1)
+        except pygame.error:
+            pass
+    return pygame.display.set_mode(size, flags)
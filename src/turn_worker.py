@@ -0,0 +1,110 @@
+"""
+Turn Worker - Resolves turns off the render thread
+The ghosts' response to a placement is computed on a worker thread and
+handed back to the main loop, which then redraws only what changed
+"""
+
+import queue
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import pygame
+
+from src.engine import Journal, Position, TurnResult
+
+TURN_RESOLVED = pygame.USEREVENT + 1
+# GIL hand-off interval while a turn runs, so the render thread is not
+# kept waiting the default 5 ms each time it needs the interpreter back
+TURN_SWITCH_INTERVAL = 0.001
+
+
+@dataclass
+class ResolvedTurn:
+    journal: Journal
+    pos: Position
+    result: Optional[TurnResult]
+    seconds: float
+    error: Optional[BaseException] = None
+
+
+class TurnWorker:
+    """
+    One turn at a time on a background thread
+
+    submit() hands a placement to the worker and returns at once. While
+    the turn is in flight `busy` is True: the worker owns the level, so
+    the caller ignores board input and must not play, undo or replace
+    the level. The worker queues the resolved turn and posts
+    TURN_RESOLVED, which wakes an event loop idling in
+    pygame.event.wait; completed() then hands the turn back on the main
+    thread and clears busy. Frames keep coming at their normal pace
+    however long the AI takes; while busy, drawing must not read the
+    level either (Game.draw freezes the board view and the status bar).
+    """
+
+    def __init__(self):
+        self.requests: 'queue.Queue[Optional[Tuple[Journal, Position]]]' = queue.Queue()
+        self.results: 'queue.Queue[ResolvedTurn]' = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.busy = False
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._worker, name='turn-worker', daemon=True)
+            self.thread.start()
+
+    def submit(self, journal: Journal, pos: Position) -> bool:
+        """Resolve journal.play(pos) in the background; False if a turn is already in flight"""
+        if self.busy:
+            return False
+        self.start()
+        self.busy = True
+        self.requests.put((journal, pos))
+        return True
+
+    def _worker(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                return
+            journal, pos = request
+            switch_interval = sys.getswitchinterval()
+            sys.setswitchinterval(TURN_SWITCH_INTERVAL)
+            start = time.perf_counter()
+            try:
+                turn = ResolvedTurn(journal, pos, journal.play(pos), time.perf_counter() - start)
+            except Exception as e:
+                turn = ResolvedTurn(journal, pos, None, time.perf_counter() - start, e)
+            finally:
+                sys.setswitchinterval(switch_interval)
+            self.results.put(turn)
+            try:
+                pygame.event.post(pygame.event.Event(TURN_RESOLVED))
+            except pygame.error:
+                pass  # no display (headless); completed() still sees the turn
+
+    def completed(self, timeout: Optional[float] = None) -> List[ResolvedTurn]:
+        """Resolved turns, oldest first; with a timeout, wait that long for one"""
+        turns = []
+        if timeout is not None and self.busy:
+            try:
+                turns.append(self.results.get(timeout=timeout))
+            except queue.Empty:
+                return turns
+        while True:
+            try:
+                turns.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        if turns:
+            self.busy = False
+        return turns
+
+    def close(self):
+        if self.thread is not None:
+            self.requests.put(None)
+            self.thread.join(timeout=1.0)
+            self.thread = None
@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from src.ad_manager import INTERSTITIAL, REWARDED, AdManager, FakeAdProvider, _Slot
+from src.config import ADMOB_CONFIG
+
+FAST = dict(ADMOB_CONFIG, ad_load_timeout=0.05, ad_retry_backoff=0.02,
+            ad_max_retry_backoff=0.08, ad_max_age=60.0)
+
+
+def wait_for(predicate, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+@pytest.fixture
+def make_manager():
+    managers = []
+
+    def make(provider, **config):
+        manager = AdManager(provider, config=dict(FAST, **config))
+        managers.append(manager)
+        manager.start()
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.close()
+
+
+def test_prefetches_one_ad_of_each_kind(make_manager):
+    provider = FakeAdProvider()
+    manager = make_manager(provider)
+    assert wait_for(lambda: manager.is_ready(INTERSTITIAL) and manager.is_ready(REWARDED))
+    closed = []
+    assert manager.show_rewarded_video_ad(closed.append)
+    assert closed == [True]
+    assert wait_for(lambda: manager.is_ready(REWARDED))
+    assert provider.loads == 3
+
+
+class DeferredAdProvider(FakeAdProvider):
+    """Keeps shown ads open until the test closes them"""
+
+    def __init__(self):
+        super().__init__()
+        self.open = []
+
+    def show(self, kind, ad, on_closed):
+        self.shown += 1
+        self.open.append(on_closed)
+
+
+def test_show_returns_before_the_ad_closes(make_manager):
+    provider = DeferredAdProvider()
+    manager = make_manager(provider)
+    assert wait_for(lambda: manager.is_ready(INTERSTITIAL) and manager.is_ready(REWARDED))
+    closed = []
+    assert manager.show_rewarded_video_ad(closed.append)
+    assert manager.show_interstitial_ad()
+    assert closed == [] and manager.get_ad_stats()['ads_shown'] == 0
+    provider.open.pop(0)(True)
+    provider.open.pop(0)(True)
+    assert closed == [True]
+    assert manager.get_ad_stats()['ads_shown'] == 2 and manager.reward_earned
+
+
+def test_load_that_never_completes_times_out_and_is_retried(make_manager):
+    provider = FakeAdProvider(load_delay=None)
+    manager = make_manager(provider)
+    assert wait_for(lambda: manager.stats['timed_out'] >= 4)
+    assert provider.loads >= 4
+    assert not manager.is_ready(INTERSTITIAL)
+    assert not manager.show_interstitial_ad()
+    assert manager.stats['not_ready'] == 1
+
+
+def test_late_callback_after_timeout_is_ignored(make_manager):
+    provider = FakeAdProvider(load_delay=0.15)
+    manager = make_manager(provider, ad_retry_backoff=10.0, ad_max_retry_backoff=10.0)
+    assert wait_for(lambda: manager.stats['timed_out'] == 2)
+    time.sleep(0.2)
+    assert manager.stats['loaded'] == 0
+    assert not manager.is_ready(INTERSTITIAL)
+    assert not manager.is_ready(REWARDED)
+
+
+def test_backoff_doubles_up_to_the_cap():
+    manager = AdManager(FakeAdProvider(), config=FAST)
+    slot = _Slot()
+    delays = []
+    for _ in range(5):
+        manager._back_off(slot, 100.0)
+        delays.append(round(slot.retry_at - 100.0, 6))
+    assert delays == [0.02, 0.04, 0.08, 0.08, 0.08]
+
+
+def test_failed_loads_back_off_then_recover(make_manager):
+    provider = FakeAdProvider(fail_next=4)
+    manager = make_manager(provider)
+    assert wait_for(lambda: manager.is_ready(INTERSTITIAL) and manager.is_ready(REWARDED))
+    assert manager.stats['failed'] == 4
+    assert provider.loads == 6
+    assert all(slot.failures == 0 for slot in manager.slots.values())
+
+
+def test_stale_ads_expire_and_are_replaced(make_manager):
+    provider = FakeAdProvider()
+    manager = make_manager(provider, ad_max_age=0.05)
+    assert wait_for(lambda: manager.stats['expired'] >= 2 and manager.stats['loaded'] >= 4)
+    assert wait_for(lambda: manager.is_ready(INTERSTITIAL))
+    assert provider.shown == 0
@@ -0,0 +1,78 @@
+import json
+import time
+
+from src.analytics import Analytics, MemorySink
+from src.config import ANALYTICS_CONFIG
+
+
+class BatchSink(MemorySink):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def send(self, records):
+        self.batches.append(len(records))
+        super().send(records)
+
+
+def make(tmp_path, sink=None, **config):
+    return Analytics(dict(ANALYTICS_CONFIG, **config), directory=str(tmp_path), sink=sink)
+
+
+def test_full_buffer_drops_the_oldest_events(tmp_path):
+    analytics = make(tmp_path, buffer_size=4)
+    for level in range(1, 11):
+        analytics.emit('level_start', level, 0, 8, 8)
+    assert analytics.emitted == 10
+    assert analytics.dropped == 6
+    assert [record['level'] for record in analytics._drain()] == [7, 8, 9, 10]
+    assert analytics.dropped == 6
+
+
+def test_untracked_kinds_are_discarded(tmp_path):
+    analytics = make(tmp_path, track_ads_shown=False)
+    analytics.emit('ad_shown', 'rewarded', True)
+    analytics.emit('level_failed', 3, 12, 40.5)
+    assert analytics.emitted == 1
+    assert [record['event'] for record in analytics._drain()] == ['level_failed']
+
+
+def test_records_carry_wall_clock_stamps_and_named_fields(tmp_path):
+    analytics = make(tmp_path)
+    before = time.time()
+    analytics.emit('level_complete', 4, 9, 31.2, 880)
+    (record,) = analytics._drain()
+    assert before - 0.01 <= record['ts'] <= time.time() + 0.01
+    assert record == {'ts': record['ts'], 'event': 'level_complete',
+                      'level': 4, 'talismans': 9, 'seconds': 31.2, 'score': 880}
+
+
+def test_worker_writes_in_batches_to_spool_and_sink(tmp_path):
+    sink = BatchSink()
+    analytics = make(tmp_path, sink=sink, batch_size=3, flush_interval=60.0)
+    analytics.start((800, 600))
+    for level in range(1, 8):
+        analytics.emit('level_start', level, 0, 8, 8)
+    analytics.close()
+    # session_start + 7 levels + session_end, three at a time
+    assert sink.batches == [3, 3, 3]
+    assert [record['event'] for record in sink.records] == \
+        ['session_start'] + ['level_start'] * 7 + ['session_end']
+    assert [record['level'] for record in sink.records[1:8]] == list(range(1, 8))
+    with open(analytics.spool_path, encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == sink.records
+    assert analytics.written == 9 and analytics.dropped == 0
+
+
+def test_failing_sink_keeps_the_spool(tmp_path):
+    class BrokenSink:
+        def send(self, records):
+            raise ConnectionError('offline')
+
+    analytics = make(tmp_path, sink=BrokenSink(), flush_interval=60.0)
+    analytics.start()
+    analytics.emit('ad_not_ready', 'interstitial')
+    analytics.close()
+    assert analytics.sink_errors == 1
+    with open(analytics.spool_path, encoding='utf-8') as f:
+        assert [json.loads(line)['event'] for line in f] == ['session_start', 'ad_not_ready', 'session_end']
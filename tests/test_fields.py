@@ -0,0 +1,65 @@
+import random
+from collections import deque
+
+import pytest
+
+from src.engine import CellType, Level
+from src.engine.fields import UNREACHABLE
+from src.engine.grid import BLOCKED_TABLE
+
+
+def full_bfs(level: Level):
+    """Walking distance to the nearest pot, recomputed from scratch"""
+    grid = level.grid
+    dist = [UNREACHABLE] * grid.size
+    queue = deque()
+    for pos in level.pots:
+        index = grid.index(pos)
+        dist[index] = 0
+        queue.append(index)
+    while queue:
+        cell = queue.popleft()
+        for n in grid.neighbours(cell):
+            if dist[n] == UNREACHABLE and not BLOCKED_TABLE[grid.cells[n]]:
+                dist[n] = dist[cell] + 1
+                queue.append(n)
+    return dist
+
+
+@pytest.mark.parametrize('level_num', [1, 17, 33, 58, 61, 99])
+def test_block_and_swap_match_a_full_bfs(level_num):
+    level = Level(level_num)
+    fields = level.fields
+    assert fields.pot_path == full_bfs(level)
+    rng = random.Random(level_num)
+    free = [i for i in range(level.grid.size) if level.grid.cells[i] == CellType.EMPTY]
+    rng.shuffle(free)
+
+    history = []
+    for index in free[:60]:
+        before = list(fields.pot_path)
+        level.grid.cells[index] = CellType.TALISMAN
+        changes = fields.block(index)
+        assert fields.pot_path == full_bfs(level)
+        history.append((index, changes, before))
+
+    for index, changes, before in reversed(history):
+        level.grid.cells[index] = CellType.EMPTY
+        redo = fields.swap(changes)
+        assert fields.pot_path == before
+        # swap() hands back what it overwrote, so it also redoes
+        level.grid.cells[index] = CellType.TALISMAN
+        fields.swap(redo)
+        assert fields.pot_path == full_bfs(level)
+        level.grid.cells[index] = CellType.EMPTY
+        fields.swap(changes)
+
+
+def test_levels_sharing_a_layout_do_not_share_pot_path():
+    first = Level(40)
+    second = Level(40)
+    assert first.fields.score is second.fields.score
+    assert first.fields.pot_path is not second.fields.pot_path
+    index = next(i for i in range(first.grid.size) if first.grid.cells[i] == CellType.EMPTY)
+    first.place_talisman(first.grid.position(index))
+    assert second.fields.pot_path == full_bfs(second)
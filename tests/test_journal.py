@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from src.engine import CellType, Journal, Level
+
+
+def snapshot(level: Level) -> tuple:
+    """Everything a turn can change, for comparing states"""
+    return (
+        list(level.grid.cells),
+        level.blocked,
+        level.talisman_count,
+        level.ghost_mask,
+        [(ghost.pos, ghost.prev_pos) for ghost in level.ghosts],
+        list(level.fields.pot_path),
+    )
+
+
+def play_some(journal: Journal, turns: int, seed: int) -> list:
+    """Play random free cells; the state before each accepted turn"""
+    level = journal.level
+    rng = random.Random(seed)
+    states = []
+    for _ in range(turns):
+        free = [i for i in range(level.grid.size) if level.grid.cells[i] == CellType.EMPTY]
+        before = snapshot(level)
+        if journal.play(level.grid.position(rng.choice(free))).placed:
+            states.append(before)
+    return states
+
+
+@pytest.mark.parametrize('level_num', [5, 30, 70, 95])
+def test_undo_and_redo_restore_every_state(level_num):
+    level = Level(level_num)
+    assert len(level.ghosts) == (2 if level_num > 60 else 1)
+    journal = Journal(level)
+    states = play_some(journal, 12, level_num)
+    assert states
+    states.append(snapshot(level))
+
+    for before in reversed(states[:-1]):
+        assert journal.undo() is not None
+        assert snapshot(level) == before
+    assert not journal.can_undo()
+
+    for after in states[1:]:
+        assert journal.redo() is not None
+        assert snapshot(level) == after
+    assert not journal.can_redo()
+
+
+def test_new_turn_after_undo_drops_the_redo_history():
+    level = Level(70)
+    journal = Journal(level)
+    play_some(journal, 4, 1)
+    journal.undo()
+    assert journal.can_redo()
+    play_some(journal, 1, 2)
+    assert not journal.can_redo()
+    assert journal.redo() is None
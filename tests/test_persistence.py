@@ -0,0 +1,119 @@
+import json
+import os
+import time
+
+from src.persistence import LOG_NAME, SNAPSHOT_NAME, ProgressStore, apply_record, empty_state
+
+RECORDS = [
+    ('level', dict(level=1, seed=11)),
+    ('turn', dict(cell=4)),
+    ('turn', dict(cell=9)),
+    ('undo', {}),
+    ('turn', dict(cell=7)),
+    ('progress', dict(level=2, score=30)),
+    ('best', dict(level=1, seconds=12.5)),
+    ('level', dict(level=2, seed=22)),
+    ('turn', dict(cell=3)),
+]
+
+
+def write(directory, records, compact_every: int = 256) -> ProgressStore:
+    store = ProgressStore(str(directory), compact_every=compact_every)
+    store.load()
+    store.start()
+    for kind, fields in records:
+        store.append(kind, **fields)
+    store.close()
+    return store
+
+
+def expected(records) -> dict:
+    state = empty_state()
+    for seq, (kind, fields) in enumerate(records, 1):
+        apply_record(state, dict(fields, t=kind, seq=seq))
+    return state
+
+
+def test_log_replays_to_the_same_state(tmp_path):
+    write(tmp_path, RECORDS)
+    state = ProgressStore(str(tmp_path)).load()
+    assert state == expected(RECORDS)
+    assert state['session'] == {'level': 2, 'seed': 22, 'cells': [3]}
+    assert state['unlocked_level'] == 2
+
+
+def test_torn_final_line_is_dropped_and_cut_off(tmp_path):
+    write(tmp_path, RECORDS)
+    log_path = os.path.join(tmp_path, LOG_NAME)
+    intact = os.path.getsize(log_path)
+    with open(log_path, 'ab') as f:
+        f.write(b'{"cell":5,"t":"tu')
+
+    store = ProgressStore(str(tmp_path))
+    assert store.load() == expected(RECORDS)
+    assert os.path.getsize(log_path) == intact
+
+    # New records start on a line of their own and continue the sequence
+    store.start()
+    store.append('turn', cell=5)
+    store.close()
+    assert ProgressStore(str(tmp_path)).load() == expected(RECORDS + [('turn', dict(cell=5))])
+
+
+def test_compaction_folds_the_log_into_the_snapshot(tmp_path):
+    store = ProgressStore(str(tmp_path), compact_every=4)
+    store.load()
+    store.start()
+    for kind, fields in RECORDS[:4]:
+        store.append(kind, **fields)
+    # The writer compacts once it is idle
+    snapshot_path = os.path.join(tmp_path, SNAPSHOT_NAME)
+    deadline = time.monotonic() + 2.0
+    while not os.path.exists(snapshot_path) and time.monotonic() < deadline:
+        time.sleep(0.005)
+    for kind, fields in RECORDS[4:]:
+        store.append(kind, **fields)
+    store.close()
+
+    with open(os.path.join(tmp_path, SNAPSHOT_NAME), encoding='utf-8') as f:
+        snapshot = json.load(f)
+    assert snapshot['seq'] >= 4
+    with open(os.path.join(tmp_path, LOG_NAME), encoding='utf-8') as f:
+        logged = [json.loads(line)['seq'] for line in f]
+    assert all(seq > snapshot['seq'] for seq in logged)
+    assert ProgressStore(str(tmp_path)).load() == expected(RECORDS)
+
+
+def test_records_the_snapshot_covers_are_not_applied_twice(tmp_path):
+    # A crash after the snapshot was renamed into place but before the
+    # log was truncated leaves records on both sides
+    write(tmp_path, RECORDS)
+    covered = RECORDS[:5]
+    with open(os.path.join(tmp_path, SNAPSHOT_NAME), 'w', encoding='utf-8') as f:
+        json.dump(expected(covered), f)
+
+    state = ProgressStore(str(tmp_path)).load()
+    assert state == expected(RECORDS)
+    assert state['session']['cells'] == [3]
+
+
+def test_replaying_an_earlier_level_keeps_the_unlocked_level(tmp_path):
+    records = RECORDS + [
+        ('progress', dict(level=3, score=55)),
+        ('level', dict(level=1, seed=11)),
+        ('turn', dict(cell=2)),
+        ('progress', dict(level=2, score=70)),
+    ]
+    write(tmp_path, records)
+    state = ProgressStore(str(tmp_path)).load()
+    assert state['unlocked_level'] == 3
+    assert state['total_score'] == 70
+
+
+def test_snapshot_without_unlocked_level_uses_the_current_level(tmp_path):
+    old = expected(RECORDS[:6])
+    del old['unlocked_level']
+    os.makedirs(tmp_path, exist_ok=True)
+    with open(os.path.join(tmp_path, SNAPSHOT_NAME), 'w', encoding='utf-8') as f:
+        json.dump(old, f)
+    assert ProgressStore(str(tmp_path)).load()['unlocked_level'] == 2
@@ -0,0 +1,140 @@
+import random
+
+import pytest
+
+from src.config import MEGA_LEVEL_CONFIG
+from src.engine import CellType, Level, Outcome, Replay, ReplayError, replay_headless, replay_many, step
+from src.engine.replay import MAGIC, decode_varint, encode_varint
+
+
+def played_session(level_num: int, turns: int, seed: int) -> Replay:
+    """A replay recorded the way the game records one"""
+    level = Level(level_num)
+    replay = Replay.for_level(level)
+    rng = random.Random(seed)
+    for _ in range(turns):
+        free = [i for i in range(level.grid.size) if level.grid.cells[i] == CellType.EMPTY]
+        pos = level.grid.position(rng.choice(free))
+        if step(level, pos).placed:
+            replay.record(pos, level.ghost.pos)
+    return replay
+
+
+def forged_walk(level_num: int) -> Replay:
+    """Arbitrary far-away placements with a ghost path that walks straight into a pot"""
+    level = Level(level_num)
+    grid = level.grid
+    pot_path = level.fields.pot_path
+    ghost = grid.index(level.ghost.pos)
+    walk = []
+    while pot_path[ghost]:
+        ghost = next(n for n in level.board.moves(ghost, level.blocked) if pot_path[n] == pot_path[ghost] - 1)
+        walk.append(ghost)
+    near = level.board.neighbours(sum(1 << i for i in walk) | level.ghost_mask)
+    far = [i for i in range(grid.size) if grid.cells[i] == CellType.EMPTY and not near >> i & 1 and i not in walk]
+    return Replay(level.level_num, level.seed, level.width, level.height, far[:len(walk)],
+                  level.ghost_count, walk)
+
+
+def test_forged_lookahead_path_is_rejected():
+    replay = forged_walk(21)
+    assert replay.has_ghost_path
+    blob = replay.to_bytes()
+    (result,) = replay_many([blob])
+    assert not result.valid and result.rejected_turn == 0
+    assert result.score == 0
+    assert replay_headless(Replay.from_bytes(blob), rerun_ai=True).rejected_turn == 0
+
+
+def test_trusted_replay_follows_the_path_unchecked():
+    result = replay_headless(forged_walk(21), trusted=True)
+    assert result.valid and result.outcome == Outcome.WON
+
+
+def test_recorded_sessions_agree_with_the_rules():
+    for level_num in (5, 21, 37, 60, 75):
+        for seed in range(3):
+            replay = played_session(level_num, 30, seed)
+            blob = replay.to_bytes()
+            fast = replay_headless(Replay.from_bytes(blob))
+            rules = replay_headless(Replay.from_bytes(blob), rerun_ai=True)
+            assert fast.valid and rules.valid
+            assert (fast.outcome, fast.talismans, fast.score, fast.ghost_index) == \
+                (rules.outcome, rules.talismans, rules.score, rules.ghost_index)
+            assert replay_headless(Replay.from_bytes(blob), trusted=True) == fast
+
+
+def test_lookahead_replay_without_a_path_is_replayed_by_the_search():
+    replay = played_session(33, 25, 7)
+    expected = replay_headless(replay, rerun_ai=True)
+    replay.ghost_path = None
+    assert replay_headless(replay) == expected
+
+
+def test_oversized_board_header_is_rejected():
+    blob = Replay(1, 5, 60000, 60000, [], 1).to_bytes()
+    with pytest.raises(ReplayError, match='board size'):
+        Replay.from_bytes(blob)
+    mega = Replay(1, 5, MEGA_LEVEL_CONFIG['width'], MEGA_LEVEL_CONFIG['height'], [], 1).to_bytes()
+    assert Replay.from_bytes(mega).width == MEGA_LEVEL_CONFIG['width']
+
+
+@pytest.mark.parametrize('width,height', [(1, 1), (1, 2), (3, 3), (4, 2)])
+@pytest.mark.parametrize('level_num', [1, 30, 75])
+def test_tiny_board_header_replays_without_crashing(width, height, level_num):
+    blob = Replay(level_num, 5, width, height, [0, width * height - 1], 1).to_bytes()
+    result = replay_headless(Replay.from_bytes(blob))
+    assert result.talismans <= 2
+    assert result == replay_headless(Replay.from_bytes(blob), rerun_ai=True)
+
+
+@pytest.mark.parametrize('value,size', [(0, 1), (1, 1), (127, 1), (128, 2), (16383, 2), (16384, 3),
+                                        (2 ** 32, 5), (2 ** 64 - 1, 10)])
+def test_varint_round_trip(value, size):
+    out = bytearray(b'x')
+    encode_varint(value, out)
+    assert len(out) == 1 + size
+    assert decode_varint(bytes(out), 1) == (value, len(out))
+
+
+def test_varint_rejects_negative_and_truncated_values():
+    with pytest.raises(ReplayError):
+        encode_varint(-1, bytearray())
+    out = bytearray()
+    encode_varint(300, out)
+    with pytest.raises(ReplayError, match='truncated'):
+        decode_varint(bytes(out[:-1]), 0)
+
+
+@pytest.mark.parametrize('level_num', [3, 33, 80])
+def test_replay_bytes_round_trip(level_num):
+    replay = played_session(level_num, 20, level_num)
+    blob = replay.to_bytes()
+    assert blob[:2] == MAGIC
+    assert Replay.from_bytes(blob) == replay
+    replay.ghost_path = None
+    assert Replay.from_bytes(replay.to_bytes()) == replay
+
+
+def test_every_truncation_and_trailing_bytes_are_rejected():
+    blob = played_session(33, 10, 1).to_bytes()
+    for end in range(len(blob)):
+        with pytest.raises(ReplayError):
+            Replay.from_bytes(blob[:end])
+    with pytest.raises(ReplayError, match='trailing'):
+        Replay.from_bytes(blob + b'\x00')
+
+
+def test_older_versions_still_decode():
+    v1 = bytearray(MAGIC)
+    for value in (1, 7, 99, 20, 22, 2, 5, 6):  # no ghost count, no ghost path
+        encode_varint(value, v1)
+    replay = Replay.from_bytes(bytes(v1))
+    assert (replay.level_num, replay.seed, replay.placements) == (7, 99, [5, 6])
+    assert replay.ghost_count is None and not replay.has_ghost_path
+
+    v2 = bytearray(MAGIC)
+    for value in (2, 70, 99, 20, 22, 2, 1, 5):  # ghost count, no ghost path
+        encode_varint(value, v2)
+    replay = Replay.from_bytes(bytes(v2))
+    assert replay.ghost_count == 2 and replay.placements == [5]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the analytics backend
+
+Accepts the JSON-array batches HttpSink POSTs and appends each record
+as a line to a file, printing a running count. Point the game at it
+with ANALYTICS_CONFIG['sink_url'] = 'http://127.0.0.1:8765/events':
+
+    python3 tools/analytics_server.py --port 8765 --out /tmp/events.jsonl
+"""
+
+import argparse
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(out_path: str):
+    lock = threading.Lock()
+    received = [0]
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                records = json.loads(self.rfile.read(length))
+            except ValueError:
+                self.send_error(400, 'expected a JSON array')
+                return
+            with lock, open(out_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(record, separators=(',', ':')) + '\n' for record in records)
+                received[0] += len(records)
+                print(f"{received[0]} events ({len(records)} in last batch)", file=sys.stderr)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--out', default='events.jsonl', help='file the received events are appended to')
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.out))
+    print(f"listening on http://{args.host}:{args.port}/events", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
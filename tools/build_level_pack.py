@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Build levels/levels.json: one verified seed per level number
+
+Two passes over a process pool:
+
+1. Screen: generate every candidate seed and compute cheap features.
+   Candidates the ghost cannot possibly be walked into a pot from
+   (walking distance to the nearest pot above the talisman budget) or
+   that are trivially short are dropped. The rest are ranked by how
+   close their estimated difficulty (distance / max_talismans) sits to
+   the level's target on the difficulty curve.
+2. Verify: the best-ranked candidates of each level are played in rank
+   order. engine.Solver proves the minimum on one-ghost greedy levels;
+   lookahead and multi-ghost levels, and greedy ones it runs out of
+   nodes on, get engine.find_win, a heuristic search whose win is only
+   an upper bound. Each win is replayed before it counts; the first
+   verified candidate wins, and the pack records whether it is exact.
+
+Levels with no verified candidate are retried once with RETRY_FACTOR
+times the search budgets. If any level still has none, nothing is
+written and the build exits non-zero, so a pack never ships a level
+nobody has won.
+
+    python3 tools/build_level_pack.py --candidates 3000 --workers 16
+
+3000 candidates per level is ~300k boards; screening costs ~0.6 ms a
+board, so the run is bounded by verification on the hardest tier.
+"""
+
+import argparse
+import heapq
+import math
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.engine import Level, Outcome, Replay, SolveStatus, Solver, find_win, level_seed, replay_headless  # noqa: E402
+from src.level_pack import DEFAULT_PACK_PATH, LevelPack, PackEntry  # noqa: E402
+
+TARGET_START = 0.12  # estimated difficulty wanted at level 1 ...
+TARGET_END = 0.35  # ... rising linearly to the last level
+MIN_DISTANCE = 3  # ghost must start at least this many steps from a pot
+RETRY_FACTOR = 4  # search budgets for levels the first verify pass left without a win
+
+
+def target_difficulty(level_num: int, last_level: int = 99) -> float:
+    return TARGET_START + (TARGET_END - TARGET_START) * (level_num - 1) / max(1, last_level - 1)
+
+
+def screen(task: Tuple[int, int, int]) -> List[Tuple[float, int, int]]:
+    """Cheap features for candidates [first, last) of one level: (rank key, level, candidate)"""
+    level_num, first, last = task
+    target = target_difficulty(level_num)
+    results = []
+    for candidate in range(first, last):
+        level = Level(level_num, seed=level_seed(level_num, candidate))
+        distance = level.fields.pot_path[level.grid.index(level.ghost.pos)]
+        budget = math.ceil(level.max_talismans)
+        if distance < MIN_DISTANCE or distance > budget:
+            continue
+        results.append((abs(distance / level.max_talismans - target), level_num, candidate))
+    return results
+
+
+def verify(task: Tuple[int, int, int, int]) -> Optional[PackEntry]:
+    """Win one candidate, exactly where the Solver applies, and check the win by replaying it"""
+    level_num, candidate, node_limit, playout_limit = task
+    seed = level_seed(level_num, candidate)
+    level = Level(level_num, seed=seed)
+    layout = level.layout_bytes()
+
+    lower = 0
+    if Solver.supports(level):
+        result = Solver(level, node_limit).solve()
+        lower = result.lower_bound
+    if not Solver.supports(level) or result.status == SolveStatus.UNKNOWN:
+        result = find_win(level, playout_limit, lower_bound=lower)
+    if result.status not in (SolveStatus.SOLVED, SolveStatus.BOUNDED):
+        return None
+    placements = [level.grid.index(pos) for pos in result.placements]
+
+    replay = Replay.for_level(Level(level_num, seed=seed))
+    replay.placements = placements
+    check = replay_headless(replay)
+    if not check.valid or check.outcome != Outcome.WON:
+        return None
+    return PackEntry(level_num, seed, level.width, level.height, level.ghost_count,
+                     len(placements), result.status == SolveStatus.SOLVED, layout)
+
+
+def verify_level(task: Tuple[int, List[int], int, int]) -> Tuple[int, Optional[PackEntry]]:
+    """The best-ranked candidate of one level that verifies, if any"""
+    level_num, ranked, node_limit, playout_limit = task
+    for candidate in ranked:
+        entry = verify((level_num, candidate, node_limit, playout_limit))
+        if entry is not None:
+            return level_num, entry
+    return level_num, None
+
+
+def build(levels: List[int], candidates: int, verify_per_level: int, workers: int,
+          node_limit: int, playout_limit: int, chunk: int = 250) -> Tuple[LevelPack, List[int]]:
+    """The verified pack, and the levels for which no candidate verified"""
+    pack = LevelPack()
+    with multiprocessing.Pool(workers) as pool:
+        start = time.perf_counter()
+        tasks = [(n, first, min(first + chunk, candidates)) for n in levels for first in range(0, candidates, chunk)]
+        best: Dict[int, List[Tuple[float, int, int]]] = {n: [] for n in levels}
+        for results in pool.imap_unordered(screen, tasks):
+            for item in results:
+                heap = best[item[1]]
+                # Max-heap of the verify_per_level closest candidates
+                entry = (-item[0], -item[2], item[2])
+                if len(heap) < verify_per_level:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+        screened = len(levels) * candidates
+        print(f"screened {screened} candidates in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        ranked = {n: [c for _, _, c in sorted(heap, reverse=True)] for n, heap in best.items()}
+        missing = list(levels)
+        for factor in (1, RETRY_FACTOR):
+            start = time.perf_counter()
+            jobs = [(n, ranked[n], node_limit * factor, playout_limit * factor) for n in missing]
+            for n, entry in pool.imap_unordered(verify_level, jobs):
+                if entry is not None:
+                    pack.entries[n] = entry
+            missing = [n for n in missing if n not in pack.entries]
+            print(f"verified {len(jobs)} levels at {factor}x budget in {time.perf_counter() - start:.1f}s, "
+                  f"{len(missing)} without a win", file=sys.stderr)
+            if not missing:
+                break
+    return pack, missing
+
+
+def parse_levels(text: str) -> List[int]:
+    first, _, last = text.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--levels', default='1-99', help='level range, e.g. 1-99 or 42')
+    parser.add_argument('--candidates', type=int, default=3000, help='candidate seeds per level')
+    parser.add_argument('--verify', type=int, default=64, help='candidates per level to try, best-ranked first')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--node-limit', type=int, default=100000, help='exact Solver node limit per candidate')
+    parser.add_argument('--playout-limit', type=int, default=5000, help='win search playout turns per candidate')
+    parser.add_argument('--out', default=DEFAULT_PACK_PATH)
+    args = parser.parse_args(argv)
+
+    levels = parse_levels(args.levels)
+    pack, missing = build(levels, args.candidates, args.verify, args.workers, args.node_limit, args.playout_limit)
+    if missing:
+        print(f"no candidate verified for levels {missing}; try more --candidates or --verify, "
+              f"nothing written", file=sys.stderr)
+        sys.exit(1)
+    if os.path.exists(args.out) and len(levels) < 99:
+        # Partial rebuild: keep the other levels of the existing pack
+        existing = LevelPack.load(args.out)
+        existing.entries.update(pack.entries)
+        pack = existing
+    pack.save(args.out)
+    print(f"wrote {len(pack.entries)} levels to {args.out}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo difficulty calibration
+
+Plays every level many times with simulated players and proposes a
+max_talismans for each:
+
+- random: talismans on uniformly random free cells
+- greedy: blocks the square the ghost would step onto next unless
+  that step already brings it closer to a pot
+- search: a strong player. engine.Solver's proven minimum on one-ghost
+  greedy boards; elsewhere, or when the Solver runs out of nodes, the
+  best win engine.find_win found, which is only an upper bound. The
+  share of proven results is reported as exact_rate
+
+Each level samples --boards fresh boards, level_seed(level, k) for
+k < boards: the candidates the level pack builder picks from, so every
+policy gets one sample per board (the random player --random-runs).
+--source pack plays only the board players get, for a quick check; it
+is a single sample per policy and takes no --boards.
+
+Usage is sampled up to twice the current max_talismans so that it is
+seen past the cut-off, without changing the levels themselves: a game
+is the real one until the level's talismans run out and only then goes
+into overtime, up to the sampled budget. Lookahead ghosts plan against
+the budget left, so their overtime moves are a guess, but whether the
+level was won within max_talismans is exact. The search gets the
+sampled budget on levels whose ghosts ignore the budget; on lookahead
+levels it searches within the real one.
+
+One JSON object per level is streamed to stdout as soon as the level is
+done, in level order, followed by a summary line, so a sweep can be
+piped into a file or a CI log:
+
+    python3 tools/calibrate.py --boards 200 --workers 8 > calibration.jsonl
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.config import get_max_talismans  # noqa: E402
+from src.engine import (  # noqa: E402
+    CellType, Level, Outcome, SolveStatus, Solver, evaluate, find_win, iter_bits, level_seed, step,
+)
+from src.level_pack import LevelPack  # noqa: E402
+from tools.build_level_pack import parse_levels  # noqa: E402
+
+POLICIES = ('random', 'greedy', 'search')
+BUDGET_FACTOR = 2  # sample budget, as a multiple of the current max_talismans
+TARGET_START = 0.9  # greedy-player win rate wanted at level 1 ...
+TARGET_END = 0.5  # ... falling linearly to the last level
+
+
+def target_win_rate(level_num: int, last_level: int = 99) -> float:
+    return TARGET_START + (TARGET_END - TARGET_START) * (level_num - 1) / max(1, last_level - 1)
+
+
+@lru_cache(maxsize=1)
+def _pack() -> LevelPack:
+    return LevelPack.load()
+
+
+def _sample_level(level_num: int, candidate: Optional[int]) -> Level:
+    """The pack's board (candidate None) or fresh candidate board k"""
+    if candidate is None:
+        return _pack().new_level(level_num)
+    return Level(level_num, seed=level_seed(level_num, candidate))
+
+
+def sample_budget(level: Level) -> int:
+    return math.ceil(level.max_talismans * BUDGET_FACTOR)
+
+
+def _play(level: Level, choose, budget: int) -> Optional[int]:
+    """
+    Play choose(level) -> cell index until decided; talismans used on a
+    win. Out of talismans, the game goes on in overtime up to budget.
+    """
+    grid = level.grid
+    while True:
+        index = choose(level)
+        if index is None:
+            return None
+        result = step(level, grid.position(index))
+        if result.outcome == Outcome.WON:
+            return level.talisman_count
+        if result.outcome == Outcome.LOST and level.max_talismans < budget:
+            level.max_talismans = budget
+            if evaluate(level) == Outcome.IN_PROGRESS:
+                continue
+        if result.outcome != Outcome.IN_PROGRESS:
+            return None
+
+
+def _random_choice(rng: random.Random):
+    def choose(level: Level) -> Optional[int]:
+        cells = level.grid.cells
+        free = [index for index in range(level.grid.size) if cells[index] == CellType.EMPTY]
+        return rng.choice(free) if free else None
+    return choose
+
+
+def _greedy_choice(level: Level) -> Optional[int]:
+    """
+    Steer the first loose ghost one step at a time: if the square it
+    wants is not its step closest to a pot, block that square, otherwise
+    place the talisman away from every ghost
+    """
+    cells = level.grid.cells
+    score = level.fields.score
+    pot_path = level.fields.pot_path
+    ghost = next(iter_bits(level.ghost_mask))
+    moves = level.board.moves(ghost, level.blocked)
+    if moves:
+        wanted = max(moves, key=lambda m: score[m])
+        closest = min(moves, key=lambda m: pot_path[m] if pot_path[m] >= 0 else level.grid.size)
+        if wanted != closest and cells[wanted] == CellType.EMPTY:
+            return wanted
+    near = level.ghost_mask | level.board.neighbours(level.ghost_mask)
+    fallback = None
+    for index in range(level.grid.size - 1, -1, -1):
+        if cells[index] == CellType.EMPTY:
+            if not near >> index & 1:
+                return index
+            fallback = index
+    return fallback
+
+
+def _search_usage(level: Level, node_limit: int, playout_limit: int) -> Tuple[Optional[int], bool]:
+    """Talismans of the best win found (None if none), and whether that is the minimum"""
+    budget = sample_budget(level) if level.ai is None else None
+    lower = 0
+    if Solver.supports(level):
+        result = Solver(level, node_limit, budget).solve()
+        lower = result.lower_bound
+    if not Solver.supports(level) or result.status == SolveStatus.UNKNOWN:
+        result = find_win(level, playout_limit, budget, lower)
+    if result.status in (SolveStatus.SOLVED, SolveStatus.BOUNDED):
+        return result.talismans, result.status == SolveStatus.SOLVED
+    return None, result.status == SolveStatus.UNSOLVABLE
+
+
+def simulate(task: Tuple[int, List[Optional[int]], int, int, int]) -> Dict[str, list]:
+    """
+    Talismans used (None for a loss) per policy on the given boards,
+    plus whether each search result is exact
+    """
+    level_num, candidates, random_runs, node_limit, playout_limit = task
+    usage: Dict[str, list] = {policy: [] for policy in POLICIES}
+    usage['exact'] = []
+    for candidate in candidates:
+        for run in range(random_runs):
+            level = _sample_level(level_num, candidate)
+            rng = random.Random(f"{level_num}:{candidate}:{run}")
+            usage['random'].append(_play(level, _random_choice(rng), sample_budget(level)))
+        level = _sample_level(level_num, candidate)
+        usage['greedy'].append(_play(level, _greedy_choice, sample_budget(level)))
+        level = _sample_level(level_num, candidate)
+        used, exact = _search_usage(level, node_limit, playout_limit)
+        usage['search'].append(used)
+        usage['exact'].append(exact)
+    return usage
+
+
+def percentile(values: List[int], q: float) -> Optional[int]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def budget_for(usage: List[Optional[int]], win_rate: float) -> Optional[int]:
+    """Smallest budget at which at least win_rate of the samples are won"""
+    wins = sorted(used for used in usage if used is not None)
+    needed = math.ceil(win_rate * len(usage))
+    if needed > len(wins):
+        return None
+    return wins[needed - 1] if needed else 0
+
+
+def summarize(level_num: int, usage: Dict[str, list]) -> dict:
+    current = Level(level_num).max_talismans
+    budget = math.ceil(current)
+    policies = {}
+    for policy in POLICIES:
+        used = usage[policy]
+        wins = [u for u in used if u is not None and u <= budget]
+        scores = [max(0, current - u) for u in wins]
+        policies[policy] = {
+            'samples': len(used),
+            'win_rate': round(len(wins) / len(used), 4) if used else 0.0,
+            # Talismans used in the games won, at any budget up to the sampled one
+            'talismans': {q: percentile([u for u in used if u is not None], p)
+                          for q, p in (('p10', 0.1), ('p50', 0.5), ('p90', 0.9))},
+            'score': {'min': min(scores, default=None), 'p50': percentile(scores, 0.5),
+                      'max': max(scores, default=None)},
+        }
+    exact = usage['exact']
+    policies['search']['exact_rate'] = round(sum(exact) / len(exact), 4) if exact else 0.0
+
+    # A casual (greedy) player should win target of the boards; where no
+    # budget up to the sampled one gets them there, size it for a strong
+    # (search) player, and failing that for every board the search won
+    target = target_win_rate(level_num)
+    proposed, basis = budget_for(usage['greedy'], target), 'greedy'
+    if proposed is None:
+        proposed, basis = budget_for(usage['search'], target), 'search'
+    if proposed is None:
+        proposed, basis = max((u for u in usage['search'] if u is not None), default=None), 'search_max'
+    return {
+        'level': level_num,
+        'max_talismans': current,
+        'config_max_talismans': get_max_talismans(level_num),
+        'target_win_rate': round(target, 3),
+        'proposed_max_talismans': proposed,
+        'proposal_basis': basis,
+        'policies': policies,
+    }
+
+
+def calibrate(levels: List[int], boards: int, random_runs: int, workers: int, node_limit: int,
+              playout_limit: int, source: str = 'fresh', chunk: int = 25):
+    """Yield one summary per level, in level order, as levels complete"""
+    if source == 'pack':
+        tasks = [(n, [None], random_runs, node_limit, playout_limit) for n in levels]
+    else:
+        tasks = [(n, list(range(first, min(first + chunk, boards))), random_runs, node_limit, playout_limit)
+                 for n in levels for first in range(0, boards, chunk)]
+    remaining = Counter(task[0] for task in tasks)
+    with multiprocessing.Pool(workers) as pool:
+        pending: Dict[str, list] = {}
+        for (level_num, *_), usage in zip(tasks, pool.imap(simulate, tasks)):
+            for key, values in usage.items():
+                pending.setdefault(key, []).extend(values)
+            remaining[level_num] -= 1
+            if not remaining[level_num]:
+                yield summarize(level_num, pending)
+                pending = {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--levels', default='1-99', help='level range, e.g. 1-99 or 42')
+    parser.add_argument('--source', choices=['fresh', 'pack'], default='fresh',
+                        help="fresh boards per level, or only the level pack's board")
+    parser.add_argument('--boards', type=int, help='boards sampled per level (default 200; fresh only)')
+    parser.add_argument('--random-runs', type=int, default=5, help='random-policy games per board')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--node-limit', type=int, default=20000, help='exact Solver node limit per board')
+    parser.add_argument('--playout-limit', type=int, default=2000, help='win search playout turns per board')
+    args = parser.parse_args(argv)
+    if args.source == 'pack':
+        if args.boards is not None:
+            parser.error('--boards does not apply to --source pack, which has one board per level')
+        args.boards = 1
+    elif args.boards is None:
+        args.boards = 200
+    if args.boards < 1:
+        parser.error('--boards must be at least 1')
+
+    start = time.perf_counter()
+    levels = parse_levels(args.levels)
+    changed = 0
+    for summary in calibrate(levels, args.boards, args.random_runs, args.workers, args.node_limit,
+                             args.playout_limit, args.source):
+        proposed = summary['proposed_max_talismans']
+        if proposed is not None and proposed != math.ceil(summary['max_talismans']):
+            changed += 1
+        print(json.dumps(summary), flush=True)
+    print(json.dumps({
+        'summary': True,
+        'levels': len(levels),
+        'source': args.source,
+        'boards_per_level': args.boards,
+        'changed': changed,
+        'seconds': round(time.perf_counter() - start, 1),
+    }), flush=True)
+
+
+if __name__ == '__main__':
+    main()